@@ -46,6 +46,13 @@ class Settings(BaseSettings):
     DB_USER: str = os.getenv("DB_USER", "razaool")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
     
+    # Connection pool (see database.AsyncDatabase)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))  # Connections kept open
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # Extra connections under load
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Replace connections older than this (0 = never)
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"  # SELECT 1 before reuse
+    
     @property
     def DATABASE_URL(self) -> str:
         """Construct database URL"""
@@ -64,6 +71,15 @@ class Settings(BaseSettings):
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     CACHE_TTL: int = 3600  # 1 hour
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")  # "memory" or "redis"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))  # Memory backend LRU bound
+    DATA_VERSION_POLL_SECONDS: float = float(os.getenv("DATA_VERSION_POLL_SECONDS", "5"))  # data_version re-read interval
+    
+    # Memory-mapped trajectory store (written by scripts/publish_trajectory_store.py)
+    TRAJECTORY_STORE_DIR: str = os.getenv(
+        "TRAJECTORY_STORE_DIR",
+        str(Path(__file__).parent.parent / "data" / "processed" / "trajectory_store")
+    )
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 100
@@ -1,49 +1,76 @@
 """
 Database connection and utilities
+
+AsyncDatabase runs the routes' queries with psycopg 3 on an
+AsyncConnectionPool, so a request waiting on PostgreSQL yields the event
+loop to the others. The pool is sized by the DB_POOL_* settings in
+config.py, so a request pays for its queries, not for a TCP + auth
+handshake per query.
 """
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from contextlib import contextmanager
-from typing import Generator
+import asyncio
+from psycopg import AsyncClientCursor
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
 from config import settings
 
 
-class Database:
-    """Database connection manager"""
+class AsyncDatabase:
+    """
+    Async database access for the routes
+    
+    Queries keep psycopg2's %s placeholders: connections use client-side
+    parameter binding (AsyncClientCursor), so SQL written for psycopg2
+    runs unchanged. Rows are returned as dicts.
+    """
+    
+    _pool = None
+    _pool_lock = None
     
     @staticmethod
-    @contextmanager
-    def get_connection() -> Generator:
-        """
-        Context manager for database connections
-        
-        Usage:
-            with Database.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT * FROM players")
-        """
-        conn = None
-        try:
-            conn = psycopg2.connect(
-                host=settings.DB_HOST,
-                port=settings.DB_PORT,
-                database=settings.DB_NAME,
-                user=settings.DB_USER,
-                password=settings.DB_PASSWORD if settings.DB_PASSWORD else None,
-                cursor_factory=RealDictCursor  # Return dict instead of tuples
-            )
-            yield conn
-            conn.commit()
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            raise e
-        finally:
-            if conn:
-                conn.close()
+    async def get_pool() -> AsyncConnectionPool:
+        """The process-wide async pool (opened on first use)"""
+        if AsyncDatabase._pool is None:
+            if AsyncDatabase._pool_lock is None:
+                AsyncDatabase._pool_lock = asyncio.Lock()
+            async with AsyncDatabase._pool_lock:
+                if AsyncDatabase._pool is None:
+                    pool = AsyncConnectionPool(
+                        make_conninfo(
+                            host=settings.DB_HOST,
+                            port=settings.DB_PORT,
+                            dbname=settings.DB_NAME,
+                            user=settings.DB_USER,
+                            password=settings.DB_PASSWORD if settings.DB_PASSWORD else None,
+                        ),
+                        kwargs={"row_factory": dict_row, "cursor_factory": AsyncClientCursor},
+                        min_size=settings.DB_POOL_SIZE,
+                        max_size=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+                        timeout=settings.DB_POOL_TIMEOUT,
+                        max_lifetime=settings.DB_POOL_RECYCLE or float("inf"),
+                        check=AsyncConnectionPool.check_connection if settings.DB_POOL_PRE_PING else None,
+                        open=False,
+                    )
+                    await pool.open()
+                    AsyncDatabase._pool = pool
+        return AsyncDatabase._pool
+    
+    @staticmethod
+    async def close_pool():
+        """Close the pool (on shutdown)"""
+        if AsyncDatabase._pool is not None:
+            await AsyncDatabase._pool.close()
+            AsyncDatabase._pool = None
     
     @staticmethod
-    def execute_query(query: str, params: tuple = None) -> list:
+    def pool_stats() -> dict:
+        """Async pool metrics (psycopg_pool counters), empty before first use"""
+        if AsyncDatabase._pool is None:
+            return {}
+        return AsyncDatabase._pool.get_stats()
+    
+    @staticmethod
+    async def execute_query(query: str, params: tuple = None) -> list:
         """
         Execute a query and return results as list of dicts
         
@@ -54,13 +81,14 @@ class Database:
         Returns:
             List of dictionaries (one per row)
         """
-        with Database.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.fetchall()
+        pool = await AsyncDatabase.get_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
+                return await cur.fetchall()
     
     @staticmethod
-    def execute_one(query: str, params: tuple = None) -> dict:
+    async def execute_one(query: str, params: tuple = None) -> dict:
         """
         Execute a query and return single result
         
@@ -71,27 +99,40 @@ class Database:
         Returns:
             Dictionary or None
         """
-        with Database.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(query, params)
-                return cur.fetchone()
+        pool = await AsyncDatabase.get_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
+                return await cur.fetchone()
     
     @staticmethod
-    def test_connection() -> bool:
+    async def execute_rows(query: str, params: tuple = None) -> tuple:
+        """
+        Execute a query and return plain tuple rows (no per-row dicts)
+        
+        For large results that are serialized directly (utils.fast_json).
+        
+        Args:
+            query: SQL query
+            params: Query parameters
+            
+        Returns:
+            (column names, list of tuples)
+        """
+        pool = await AsyncDatabase.get_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor(row_factory=tuple_row) as cur:
+                await cur.execute(query, params)
+                rows = await cur.fetchall()
+                return [column.name for column in cur.description], rows
+    
+    @staticmethod
+    async def test_connection() -> bool:
         """Test database connection"""
         try:
-            with Database.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1")
-                    return True
+            await AsyncDatabase.execute_one("SELECT 1")
+            return True
         except Exception as e:
             print(f"Database connection failed: {e}")
             return False
 
-
-# Dependency for FastAPI routes
-def get_db():
-    """Dependency to get database connection in FastAPI routes"""
-    with Database.get_connection() as conn:
-        yield conn
-
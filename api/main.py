@@ -3,12 +3,17 @@ Tennis Career Tracker API - Main Application
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.openapi.docs import get_swagger_ui_html
+from datetime import date
+import re
 import time
 
 from config import settings
-from database import Database
+from database import AsyncDatabase
+from utils.cache import cache_stats, etag_matches, get_data_version, make_etag
+from services.ranking_engine import engine_stats, get_ranking_engine
+from services.trajectory_store import store_stats
 
 # Import routes
 from routes import players, rankings, dashboard, predict, h2h
@@ -33,6 +38,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
@@ -47,6 +53,50 @@ async def add_process_time_header(request: Request, call_next):
     return response
 
 
+# Endpoints whose output changes without a data version bump
+ETAG_EXCLUDED_PATHS = {"/api/dashboard/stat-of-day", "/api/dashboard/trending"}
+
+# Endpoints that depend on today's date (active cutoffs, ages, recent
+# windows): their tag changes daily. Matches the @cached(daily=True) routes.
+DAILY_ETAG_PATHS = re.compile(
+    r"^/api/(dashboard/top10|rankings/current|players/?|players/[^/]+|predict/match)$"
+)
+
+
+# Conditional GET middleware
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """
+    ETag / If-None-Match for the read endpoints
+    
+    The tag is derived from the data version and the request itself, so a
+    revalidation is answered with 304 before the route (or the database)
+    is touched. Responses carry Cache-Control: no-cache, which lets the
+    browser keep them but makes it revalidate on every use.
+    """
+    if (request.method != "GET" or not request.url.path.startswith("/api/")
+            or request.url.path in ETAG_EXCLUDED_PATHS):
+        return await call_next(request)
+    
+    version = await get_data_version()
+    if version is None:
+        return await call_next(request)
+    
+    day = str(date.today()) if DAILY_ETAG_PATHS.match(request.url.path) else ""
+    etag = make_etag(version, request.url.path, request.url.query,
+                     request.headers.get("accept", ""), day)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
+
 # Custom dark mode docs
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
@@ -138,12 +188,12 @@ async def health_check():
     
     Returns API status and database connectivity
     """
-    db_connected = Database.test_connection()
+    db_connected = await AsyncDatabase.test_connection()
     
     # Get basic stats
     if db_connected:
         try:
-            stats = Database.execute_one("""
+            stats = await AsyncDatabase.execute_one("""
                 SELECT 
                     (SELECT COUNT(*) FROM players) as total_players,
                     (SELECT COUNT(*) FROM matches) as total_matches,
@@ -158,6 +208,10 @@ async def health_check():
         "status": "healthy" if db_connected else "unhealthy",
         "database": "connected" if db_connected else "disconnected",
         "api_version": settings.API_VERSION,
+        "pool": AsyncDatabase.pool_stats(),
+        "cache": cache_stats(),
+        "trajectory_store": store_stats(),
+        "ranking_engine": engine_stats(),
         "stats": {
             "total_players": stats.get("total_players") if stats else None,
             "total_matches": stats.get("total_matches") if stats else None,
@@ -199,8 +253,14 @@ async def startup_event():
     print(f"🔗 Docs available at: http://localhost:8000/docs")
     
     # Test database connection
-    if Database.test_connection():
+    if await AsyncDatabase.test_connection():
         print("✅ Database connection successful")
+        
+        # Warm the ranking engine so the first rankings request doesn't build it
+        try:
+            await get_ranking_engine()
+        except Exception as e:
+            print(f"⚠️  Ranking engine not loaded: {e}")
     else:
         print("❌ Database connection failed")
 
@@ -210,6 +270,7 @@ async def startup_event():
 async def shutdown_event():
     """Run on API shutdown"""
     print("👋 Shutting down Tennis Career Tracker API...")
+    await AsyncDatabase.close_pool()
 
 
 if __name__ == "__main__":
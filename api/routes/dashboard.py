@@ -1,14 +1,18 @@
 """
 Dashboard endpoints - quick summary data for homepage
 """
+import asyncio
 from fastapi import APIRouter, HTTPException
 from datetime import date
-from database import Database
+from database import AsyncDatabase
+from services.ranking_engine import active_since, get_ranking_engine
+from utils.cache import cached
 
 router = APIRouter()
 
 
 @router.get("/top10", response_model=dict)
+@cached(daily=True)
 async def get_top10():
     """
     Get current top 10 players (for homepage widget)
@@ -16,29 +20,15 @@ async def get_top10():
     Returns quick summary with flag emojis for visual appeal
     """
     
-    query = """
-        SELECT 
-            ROW_NUMBER() OVER (ORDER BY plr.elo_rating DESC) as rank,
-            p.name,
-            p.country,
-            plr.elo_rating,
-            plr.form_index,
-            plr.last_match
-        FROM players p
-        INNER JOIN player_latest_ratings plr ON p.player_id = plr.player_id
-        WHERE plr.last_match >= CURRENT_DATE - INTERVAL '6 months'
-          AND plr.elo_rating IS NOT NULL
-        ORDER BY plr.elo_rating DESC
-        LIMIT 10
-    """
-    
     try:
-        top10 = Database.execute_query(query)
+        # Pre-sorted in memory (see services/ranking_engine.py)
+        engine = await get_ranking_engine()
+        positions = engine.ranked("elo", on_or_after=active_since())
+        columns = ["rank", "name", "country", "elo_rating", "form_index", "last_match"]
+        rows = engine.page(positions, columns[1:], 10)
+        top10 = [dict(zip(columns, row)) for row in rows]
         
-        # Get as_of date
-        date_query = "SELECT MAX(last_match) as last_date FROM player_latest_ratings"
-        date_result = Database.execute_one(date_query)
-        as_of = date_result['last_date'] if date_result else date.today()
+        as_of = engine.as_of() or date.today()
         
         return {
             "as_of": str(as_of),
@@ -85,7 +75,6 @@ async def get_stat_of_day():
             ORDER BY plr.elo_rating DESC
             LIMIT 1
         """
-        top_elo = Database.execute_one(query1)
         
         # Query 2: Highest peak ELO of all time
         query2 = """
@@ -97,7 +86,6 @@ async def get_stat_of_day():
             ORDER BY peak_elo DESC
             LIMIT 1
         """
-        peak_elo = Database.execute_one(query2)
         
         # Query 3: Best current form (active players)
         query3 = """
@@ -109,20 +97,18 @@ async def get_stat_of_day():
             ORDER BY plr.form_index DESC
             LIMIT 1
         """
-        best_form = Database.execute_one(query3)
         
         # Query 4: Most Grand Slam matches played
         query4 = """
             SELECT p.name, COUNT(DISTINCT pr.match_id) as gs_count
             FROM players p
             JOIN player_ratings pr ON p.player_id = pr.player_id
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             WHERE m.tournament_tier = 'Grand Slam'
             GROUP BY p.name
             ORDER BY gs_count DESC
             LIMIT 1
         """
-        most_gs = Database.execute_one(query4)
         
         # Query 5: Highest big match rating
         query5 = """
@@ -134,11 +120,9 @@ async def get_stat_of_day():
             ORDER BY plr.big_match_rating DESC
             LIMIT 1
         """
-        big_match = Database.execute_one(query5)
         
         # Query 6: Total matches tracked
         query6 = "SELECT COUNT(*) as total FROM matches"
-        total_matches = Database.execute_one(query6)
         
         # Query 7: Most career wins
         query7 = """
@@ -149,7 +133,14 @@ async def get_stat_of_day():
             ORDER BY wins DESC
             LIMIT 1
         """
-        most_wins = Database.execute_one(query7)
+        
+        # The queries are independent: run them concurrently, each on its
+        # own pooled connection
+        (top_elo, peak_elo, best_form, most_gs,
+         big_match, total_matches, most_wins) = await asyncio.gather(
+            *(AsyncDatabase.execute_one(q)
+              for q in (query1, query2, query3, query4, query5, query6, query7))
+        )
         
         # Build stat list with actual data
         stats = []
@@ -1,14 +1,17 @@
 """
 Head-to-head endpoints for player rivalries
 """
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from database import Database
+from database import AsyncDatabase
+from utils.cache import cached
 
 router = APIRouter()
 
 
 @router.get("/{player1}/{player2}", response_model=dict)
+@cached()
 async def get_head_to_head(
     player1: str,
     player2: str,
@@ -37,8 +40,64 @@ async def get_head_to_head(
         WHERE name IN (%s, %s)
     """
     
+    # Both queries below resolve the ids themselves so they don't have to
+    # wait for player_query, and find the rivalry by its canonical pair key
+    ids_cte = """
+        WITH ids AS (
+            SELECT (SELECT player_id FROM players WHERE name = %s) as p1_id,
+                   (SELECT player_id FROM players WHERE name = %s) as p2_id
+        )
+    """
+    
+    # Maintained totals per surface and tier (one short index range)
+    summary_query = ids_cte + """
+        SELECT 
+            s.surface,
+            s.tournament_tier,
+            s.matches,
+            CASE WHEN s.player_low_id = ids.p1_id THEN s.low_wins ELSE s.high_wins END as player1_wins,
+            CASE WHEN s.player_low_id = ids.p1_id THEN s.high_wins ELSE s.low_wins END as player2_wins
+        FROM h2h_summary s
+        JOIN ids ON s.player_low_id = LEAST(ids.p1_id, ids.p2_id)
+                AND s.player_high_id = GREATEST(ids.p1_id, ids.p2_id)
+    """
+    
+    # All H2H matches
+    matches_query = ids_cte + """
+        SELECT 
+            m.date,
+            m.tournament_name,
+            m.tournament_tier,
+            m.surface,
+            m.round,
+            m.score,
+            CASE 
+                WHEN m.winner_id = ids.p1_id THEN %s
+                ELSE %s
+            END as winner
+        FROM matches m
+        JOIN ids ON m.player_low_id = LEAST(ids.p1_id, ids.p2_id)
+                AND m.player_high_id = GREATEST(ids.p1_id, ids.p2_id)
+    """
+    
+    summary_params = [player1, player2]
+    params = [player1, player2, player1, player2]
+    
+    if surface:
+        summary_query += " WHERE s.surface = %s"
+        summary_params.append(surface)
+        matches_query += " WHERE m.surface = %s"
+        params.append(surface)
+    
+    matches_query += " ORDER BY m.date DESC"
+    
     try:
-        players = Database.execute_query(player_query, (player1, player2))
+        # All three queries run concurrently on separate pooled connections
+        players, summary, matches = await asyncio.gather(
+            AsyncDatabase.execute_query(player_query, (player1, player2)),
+            AsyncDatabase.execute_query(summary_query, tuple(summary_params)),
+            AsyncDatabase.execute_query(matches_query, tuple(params)),
+        )
         
         if len(players) != 2:
             raise HTTPException(
@@ -46,38 +105,7 @@ async def get_head_to_head(
                 detail=f"One or both players not found: '{player1}', '{player2}'"
             )
         
-        p1_id = next(p['player_id'] for p in players if p['name'] == player1)
-        p2_id = next(p['player_id'] for p in players if p['name'] == player2)
-        
-        # Build query for all H2H matches
-        matches_query = """
-            SELECT 
-                m.date,
-                m.tournament_name,
-                m.tournament_tier,
-                m.surface,
-                m.round,
-                m.score,
-                CASE 
-                    WHEN m.winner_id = %s THEN %s
-                    ELSE %s
-                END as winner
-            FROM matches m
-            WHERE ((m.player1_id = %s AND m.player2_id = %s)
-                OR (m.player1_id = %s AND m.player2_id = %s))
-        """
-        
-        params = [p1_id, player1, player2, p1_id, p2_id, p2_id, p1_id]
-        
-        if surface:
-            matches_query += " AND m.surface = %s"
-            params.append(surface)
-        
-        matches_query += " ORDER BY m.date DESC"
-        
-        matches = Database.execute_query(matches_query, tuple(params))
-        
-        if not matches:
+        if not summary:
             return {
                 "player1": player1,
                 "player2": player2,
@@ -87,33 +115,21 @@ async def get_head_to_head(
                 "message": "These players have never faced each other"
             }
         
-        # Calculate stats
-        p1_wins = sum(1 for m in matches if m['winner'] == player1)
-        p2_wins = sum(1 for m in matches if m['winner'] == player2)
+        # Totals, and the per-surface and per-tier sums of the summary rows
+        total = sum(row['matches'] for row in summary)
+        p1_wins = sum(row['player1_wins'] for row in summary)
+        p2_wins = sum(row['player2_wins'] for row in summary)
         
-        # Surface breakdown
         surface_breakdown = {}
-        for match in matches:
-            surf = match['surface'] or 'unknown'
-            if surf not in surface_breakdown:
-                surface_breakdown[surf] = {'total': 0, 'player1_wins': 0, 'player2_wins': 0}
-            surface_breakdown[surf]['total'] += 1
-            if match['winner'] == player1:
-                surface_breakdown[surf]['player1_wins'] += 1
-            else:
-                surface_breakdown[surf]['player2_wins'] += 1
-        
-        # Tournament tier breakdown
         tier_breakdown = {}
-        for match in matches:
-            tier = match['tournament_tier'] or 'Other'
-            if tier not in tier_breakdown:
-                tier_breakdown[tier] = {'total': 0, 'player1_wins': 0, 'player2_wins': 0}
-            tier_breakdown[tier]['total'] += 1
-            if match['winner'] == player1:
-                tier_breakdown[tier]['player1_wins'] += 1
-            else:
-                tier_breakdown[tier]['player2_wins'] += 1
+        for row in summary:
+            for breakdown, key in ((surface_breakdown, row['surface']),
+                                   (tier_breakdown, row['tournament_tier'])):
+                if key not in breakdown:
+                    breakdown[key] = {'total': 0, 'player1_wins': 0, 'player2_wins': 0}
+                breakdown[key]['total'] += row['matches']
+                breakdown[key]['player1_wins'] += row['player1_wins']
+                breakdown[key]['player2_wins'] += row['player2_wins']
         
         # Most recent match
         latest_match = matches[0] if matches else None
@@ -121,12 +137,12 @@ async def get_head_to_head(
         return {
             "player1": player1,
             "player2": player2,
-            "total_matches": len(matches),
+            "total_matches": total,
             "player1_wins": p1_wins,
             "player2_wins": p2_wins,
             "win_percentage": {
-                "player1": round((p1_wins / len(matches)) * 100, 1),
-                "player2": round((p2_wins / len(matches)) * 100, 1)
+                "player1": round((p1_wins / total) * 100, 1),
+                "player2": round((p2_wins / total) * 100, 1)
             },
             "surface_breakdown": surface_breakdown,
             "tier_breakdown": tier_breakdown,
@@ -147,6 +163,7 @@ async def get_head_to_head(
 
 
 @router.get("/{player1}/{player2}/timeline", response_model=dict)
+@cached()
 async def get_head_to_head_timeline(
     player1: str,
     player2: str
@@ -165,16 +182,20 @@ async def get_head_to_head_timeline(
     player2 = player2.replace("%20", " ").replace("+", " ")
     
     try:
-        # Get H2H matches with ratings
+        # Get H2H matches with ratings. Player 2's ELO comes from player 1's
+        # rating row (opponent before - delta, ELO is zero-sum), so only one
+        # rating row per match is read.
         query = """
-            WITH h2h_matches AS (
+            WITH ids AS (
+                SELECT (SELECT player_id FROM players WHERE name = %s) as p1_id,
+                       (SELECT player_id FROM players WHERE name = %s) as p2_id
+            ),
+            h2h_matches AS (
                 SELECT m.match_id, m.date, m.tournament_name, m.round, m.score,
                        m.winner_id, m.player1_id, m.player2_id
                 FROM matches m
-                WHERE ((m.player1_id = (SELECT player_id FROM players WHERE name = %s)
-                        AND m.player2_id = (SELECT player_id FROM players WHERE name = %s))
-                    OR (m.player1_id = (SELECT player_id FROM players WHERE name = %s)
-                        AND m.player2_id = (SELECT player_id FROM players WHERE name = %s)))
+                JOIN ids ON m.player_low_id = LEAST(ids.p1_id, ids.p2_id)
+                        AND m.player_high_id = GREATEST(ids.p1_id, ids.p2_id)
             )
             SELECT 
                 h.date,
@@ -184,18 +205,16 @@ async def get_head_to_head_timeline(
                 CASE WHEN h.winner_id = (SELECT player_id FROM players WHERE name = %s)
                      THEN %s ELSE %s END as winner,
                 pr1.elo_rating as player1_elo,
-                pr2.elo_rating as player2_elo
+                pr1.opponent_elo_pre_match - pr1.elo_delta as player2_elo
             FROM h2h_matches h
-            LEFT JOIN player_ratings pr1 ON pr1.match_id = h.match_id 
+            LEFT JOIN player_ratings pr1 ON pr1.match_id = h.match_id AND pr1.date = h.date
                 AND pr1.player_id = (SELECT player_id FROM players WHERE name = %s)
-            LEFT JOIN player_ratings pr2 ON pr2.match_id = h.match_id 
-                AND pr2.player_id = (SELECT player_id FROM players WHERE name = %s)
             ORDER BY h.date ASC
         """
         
-        timeline = Database.execute_query(
+        timeline = await AsyncDatabase.execute_query(
             query, 
-            (player1, player2, player2, player1, player1, player1, player2, player1, player2)
+            (player1, player2, player1, player1, player2, player1)
         )
         
         if not timeline:
@@ -1,9 +1,17 @@
 """
 Player endpoints - OPTIMIZED VERSION
 """
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from datetime import date as date_cls
+from fastapi import APIRouter, Header, HTTPException, Query
 from typing import Optional
-from database import Database
+from database import AsyncDatabase
+from utils.cache import cached
+from utils.downsample import downsample_rows
+from services.ranking_engine import active_since, get_ranking_engine
+from services.trajectory_store import get_trajectory_store
+from utils.fast_json import FastJSONResponse
+from utils.formats import FORMAT_PATTERN, negotiate, respond, table
 from models.player import PlayerSummary, PlayerDetail
 from config import settings
 
@@ -11,6 +19,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=dict)
+@cached(daily=True)
 async def list_players(
     limit: int = Query(default=100, le=settings.MAX_PAGE_SIZE),
     offset: int = Query(default=0, ge=0),
@@ -28,88 +37,41 @@ async def list_players(
     - **sort_by**: Sort field (elo, name, matches)
     """
     
-    # Fast query using materialized view with actual stats
-    query = """
-        WITH player_stats AS (
-            SELECT 
-                pr.player_id,
-                COUNT(DISTINCT pr.match_id) as total_matches,
-                COUNT(DISTINCT CASE 
-                    WHEN m.tournament_tier = 'Grand Slam' 
-                    THEN pr.match_id 
-                END) as gs_matches
-            FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
-            GROUP BY pr.player_id
-        ),
-        peak_elos AS (
-            SELECT 
-                player_id,
-                MAX(elo_rating) as peak_elo
-            FROM player_ratings
-            WHERE elo_rating IS NOT NULL
-            GROUP BY player_id
-        )
-        SELECT 
-            p.name,
-            plr.elo_rating as current_elo,
-            COALESCE(pe.peak_elo, plr.elo_rating) as peak_elo,
-            COALESCE(ps.total_matches, 0) as career_matches,
-            COALESCE(ps.gs_matches, 0) as grand_slams,
-            CASE 
-                WHEN plr.last_match >= CURRENT_DATE - INTERVAL '6 months' 
-                THEN true 
-                ELSE false 
-            END as is_active,
-            plr.last_match
-        FROM players p
-        INNER JOIN player_latest_ratings plr ON p.player_id = plr.player_id
-        LEFT JOIN player_stats ps ON p.player_id = ps.player_id
-        LEFT JOIN peak_elos pe ON p.player_id = pe.player_id
-        WHERE 1=1
-    """
-    
-    params = []
+    # Sort order: "matches" falls back to ELO
+    sort_key = "list_name" if sort_by == "name" else "list_elo"
     
-    # Add filters
-    if active is not None:
-        if active:
-            query += " AND plr.last_match >= CURRENT_DATE - INTERVAL '6 months'"
-        else:
-            query += " AND plr.last_match < CURRENT_DATE - INTERVAL '6 months'"
-    
-    if min_elo:
-        query += " AND plr.elo_rating >= %s"
-        params.append(min_elo)
-    
-    # Add sorting
-    sort_column = {
-        "elo": "plr.elo_rating",
-        "name": "p.name",
-        "matches": "plr.elo_rating"  # Fallback to ELO
-    }.get(sort_by, "plr.elo_rating")
-    
-    query += f" ORDER BY {sort_column} DESC NULLS LAST"
-    
-    # Add pagination
-    query += " LIMIT %s OFFSET %s"
-    params.extend([limit, offset])
-    
-    # Execute query
     try:
-        players = Database.execute_query(query, tuple(params))
+        # Filtered and paginated in memory (see services/ranking_engine.py)
+        engine = await get_ranking_engine()
+        cutoff = active_since()
+        positions = engine.ranked(
+            sort_key,
+            on_or_after=cutoff if active else None,
+            before=cutoff if active is False else None,
+            min_elo=min_elo or None
+        )
+        window = positions[offset:offset + limit]
         
-        # Get total count (simple)
-        count_query = """
-            SELECT COUNT(DISTINCT pr.player_id) as total 
-            FROM player_ratings pr
-            WHERE pr.elo_rating IS NOT NULL
-        """
-        total_result = Database.execute_one(count_query)
-        total = total_result['total'] if total_result else 0
+        is_active = (engine.columns["last_match"][window] >= cutoff).tolist()
+        players = [
+            {
+                "name": name,
+                "current_elo": elo,
+                "peak_elo": peak if peak is not None else elo,
+                "career_matches": matches,
+                "grand_slams": slams,
+                "is_active": active_now,
+                "last_match": last_match
+            }
+            for (name, elo, peak, matches, slams, last_match), active_now in zip(
+                engine.rows(window, ["name", "elo_rating", "peak_elo", "career_matches",
+                                     "grand_slams", "last_match"]),
+                is_active
+            )
+        ]
         
         return {
-            "total": total,
+            "total": engine.elo_rated_count(),
             "limit": limit,
             "offset": offset,
             "players": players
@@ -119,6 +81,7 @@ async def list_players(
 
 
 @router.get("/{player_name}", response_model=dict)
+@cached(daily=True)
 async def get_player(player_name: str):
     """
     Get complete player profile
@@ -129,43 +92,9 @@ async def get_player(player_name: str):
     # Decode name
     player_name = player_name.replace("%20", " ").replace("+", " ")
     
-    # Fast query using materialized view
-    query = """
-        WITH player_info AS (
-            SELECT player_id FROM players WHERE name = %s
-        ),
-        peak_ratings AS (
-            SELECT 
-                MAX(elo_rating) as peak_elo,
-                MAX(tsr_rating) as peak_tsr,
-                MAX(glicko2_rating) as peak_glicko2
-            FROM player_ratings
-            WHERE player_id = (SELECT player_id FROM player_info)
-        ),
-        match_count AS (
-            SELECT COUNT(*) as total_matches
-            FROM player_ratings
-            WHERE player_id = (SELECT player_id FROM player_info)
-        ),
-        win_loss_stats AS (
-            SELECT 
-                COUNT(*) as total_matches,
-                SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
-                SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
-            FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
-            JOIN player_info pi ON pi.player_id = pr.player_id
-        ),
-        year_2025_stats AS (
-            SELECT 
-                COUNT(*) as total_matches_2025,
-                SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins_2025,
-                SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses_2025
-            FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
-            JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = 2025
-        )
+    # Profile + latest ratings, peaks, career and 2025 record are independent
+    # queries: they run concurrently on separate pooled connections
+    profile_query = """
         SELECT 
             p.name,
             EXTRACT(YEAR FROM CURRENT_DATE) - EXTRACT(YEAR FROM p.date_of_birth) as age,
@@ -181,33 +110,56 @@ async def get_player(player_name: str):
             plr.tsr_uncertainty,
             plr.glicko2_rating as current_glicko2,
             plr.glicko2_rd,
-            pr.peak_elo,
-            pr.peak_tsr,
-            pr.peak_glicko2,
             plr.form_index,
             plr.big_match_rating,
-            plr.tournament_success_score,
-            wls.total_matches,
-            wls.wins,
-            wls.losses,
-            y25.total_matches_2025,
-            y25.wins_2025,
-            y25.losses_2025
+            plr.tournament_success_score
         FROM players p
-        JOIN player_info pi ON true
-        LEFT JOIN player_latest_ratings plr ON plr.player_id = pi.player_id
-        LEFT JOIN peak_ratings pr ON true
-        LEFT JOIN win_loss_stats wls ON true
-        LEFT JOIN year_2025_stats y25 ON true
-        WHERE p.player_id = pi.player_id
+        LEFT JOIN player_latest_ratings plr ON plr.player_id = p.player_id
+        WHERE p.name = %s
+    """
+    
+    peak_query = """
+        SELECT 
+            MAX(elo_rating) as peak_elo,
+            MAX(tsr_rating) as peak_tsr,
+            MAX(glicko2_rating) as peak_glicko2
+        FROM player_ratings
+        WHERE player_id = (SELECT player_id FROM players WHERE name = %s)
+    """
+    
+    career_query = """
+        SELECT 
+            COUNT(*) as total_matches,
+            SUM(CASE WHEN m.winner_id = pr.player_id THEN 1 ELSE 0 END) as wins,
+            SUM(CASE WHEN m.winner_id != pr.player_id THEN 1 ELSE 0 END) as losses
+        FROM player_ratings pr
+        JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
+        WHERE pr.player_id = (SELECT player_id FROM players WHERE name = %s)
+    """
+    
+    year_2025_query = """
+        SELECT 
+            COUNT(*) as total_matches_2025,
+            SUM(CASE WHEN m.winner_id = pr.player_id THEN 1 ELSE 0 END) as wins_2025,
+            SUM(CASE WHEN m.winner_id != pr.player_id THEN 1 ELSE 0 END) as losses_2025
+        FROM player_ratings pr
+        JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
+        WHERE pr.player_id = (SELECT player_id FROM players WHERE name = %s)
+          AND m.date >= '2025-01-01' AND m.date < '2026-01-01'
+          AND pr.date >= '2025-01-01' AND pr.date < '2026-01-01'
     """
     
     try:
-        player = Database.execute_one(query, (player_name,))
+        profile, peaks, career, year_2025 = await asyncio.gather(
+            *(AsyncDatabase.execute_one(q, (player_name,))
+              for q in (profile_query, peak_query, career_query, year_2025_query))
+        )
         
-        if not player:
+        if not profile:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
         
+        player = {**profile, **peaks, **career, **year_2025}
+        
         # Calculate win percentage
         total = player['total_matches'] or 0
         wins = player['wins'] or 0
@@ -266,6 +218,7 @@ async def get_player(player_name: str):
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -287,9 +240,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -302,7 +256,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
@@ -330,6 +287,7 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
 
 
 @router.get("/{player_name}/titles", response_model=dict)
+@cached()
 async def get_player_titles(player_name: str):
     """
     Get all tournament titles won by player, organized by tier
@@ -359,7 +317,7 @@ async def get_player_titles(player_name: str):
     """
     
     try:
-        titles = Database.execute_query(query, (player_name,))
+        titles = await AsyncDatabase.execute_query(query, (player_name,))
         
         if not titles:
             return {
@@ -405,6 +363,7 @@ async def get_player_titles(player_name: str):
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -426,9 +385,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -441,7 +401,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
@@ -468,12 +431,16 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/compare/trajectory", response_model=dict)
+@router.get("/compare/trajectory", response_model=dict, response_class=FastJSONResponse)
+@cached()
 async def compare_player_trajectories(
     players: str = Query(..., description="Comma-separated player names (e.g., 'Carlos Alcaraz,Jannik Sinner')"),
     start_date: Optional[str] = Query(default=None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(default=None, description="End date (YYYY-MM-DD)"),
-    rating_system: str = Query(default="elo", regex="^(elo|tsr|glicko2)$")
+    rating_system: str = Query(default="elo", regex="^(elo|tsr|glicko2)$"),
+    max_points: Optional[int] = Query(default=None, ge=10, le=5000),
+    format: Optional[str] = Query(default=None, regex=FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None)
 ):
     """
     Compare multiple players' trajectories over a specific date range
@@ -482,6 +449,10 @@ async def compare_player_trajectories(
     - **start_date**: Optional start date (YYYY-MM-DD)
     - **end_date**: Optional end date (YYYY-MM-DD)
     - **rating_system**: Rating system to use (elo, tsr, glicko2)
+    - **max_points**: Thin each player's trajectory to at most this many
+      points, keeping its shape (see utils/downsample.py)
+    - **format**: json (default), columnar or msgpack; also read from Accept
+      (see utils/formats.py). Columnar trajectories omit the name column.
     
     Examples:
     - Compare Alcaraz vs Sinner in 2024-2025
@@ -489,6 +460,8 @@ async def compare_player_trajectories(
     - Compare NextGen from 2023 onwards
     """
     
+    fmt = negotiate(format, accept)
+    
     # Parse player names
     player_names = [p.strip() for p in players.split(',')]
     
@@ -498,13 +471,13 @@ async def compare_player_trajectories(
     # Build column selection based on rating system
     if rating_system == "elo":
         rating_col = "elo_rating"
-        extra_cols = ""
+        extra_cols = []
     elif rating_system == "tsr":
         rating_col = "tsr_rating"
-        extra_cols = ", tsr_uncertainty, tsr_smoothed"
+        extra_cols = ["tsr_uncertainty", "tsr_smoothed"]
     else:  # glicko2
         rating_col = "glicko2_rating"
-        extra_cols = ", glicko2_rd, glicko2_volatility"
+        extra_cols = ["glicko2_rd", "glicko2_volatility"]
     
     # Build query with date filters
     query = f"""
@@ -513,7 +486,7 @@ async def compare_player_trajectories(
             pr.career_match_number as match_number,
             pr.date,
             pr.{rating_col} as rating
-            {extra_cols}
+            {"".join(f", pr.{c}" for c in extra_cols)}
         FROM player_ratings pr
         JOIN players p ON pr.player_id = p.player_id
         WHERE p.name = ANY(%s)
@@ -533,20 +506,43 @@ async def compare_player_trajectories(
     query += " ORDER BY p.name, pr.career_match_number ASC"
     
     try:
-        data = Database.execute_query(query, tuple(params))
+        store = await get_trajectory_store()
+        if store is not None:
+            # Same rows from the memory-mapped store, no query
+            columns = ["name", "match_number", "date", "rating"] + extra_cols
+            store_columns = ["career_match_number", "date", rating_col] + extra_cols
+            rows = []
+            for name in sorted(set(player_names)):
+                points = store.rows(name, store_columns, start_date=start_date,
+                                    end_date=end_date, not_null=rating_col) or []
+                rows.extend((name,) + point for point in points)
+        else:
+            # Tuple rows straight into the encoder (see utils/formats.py)
+            columns, rows = await AsyncDatabase.execute_rows(query, tuple(params))
         
-        if not data:
+        if not rows:
             raise HTTPException(status_code=404, detail="No data found for specified players and date range")
         
-        # Group by player
+        # Group by player (rows are ordered by name)
         players_data = {}
-        for row in data:
-            name = row['name']
+        for row in rows:
+            name = row[0]
             if name not in players_data:
                 players_data[name] = []
             players_data[name].append(row)
         
-        return {
+        if max_points:
+            match_index, rating_index = columns.index("match_number"), columns.index("rating")
+            for name, trajectory in players_data.items():
+                players_data[name] = downsample_rows(trajectory, match_index, [rating_index], max_points)
+        
+        # Columnar trajectories drop the (repeated) name column
+        if fmt != "json":
+            players_data = {name: [row[1:] for row in trajectory]
+                            for name, trajectory in players_data.items()}
+        point_columns = columns if fmt == "json" else columns[1:]
+        
+        return respond({
             "rating_system": rating_system,
             "date_range": {
                 "start": start_date,
@@ -556,11 +552,11 @@ async def compare_player_trajectories(
                 {
                     "name": name,
                     "data_points": len(trajectory),
-                    "trajectory": trajectory
+                    "trajectory": table(point_columns, trajectory, fmt)
                 }
                 for name, trajectory in players_data.items()
             ]
-        }
+        }, fmt)
     except HTTPException:
         raise
     except Exception as e:
@@ -568,6 +564,7 @@ async def compare_player_trajectories(
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -589,9 +586,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -604,7 +602,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
@@ -632,6 +633,7 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
 
 
 @router.get("/{player_name}/titles", response_model=dict)
+@cached()
 async def get_player_titles(player_name: str):
     """
     Get all tournament titles won by player, organized by tier
@@ -661,7 +663,7 @@ async def get_player_titles(player_name: str):
     """
     
     try:
-        titles = Database.execute_query(query, (player_name,))
+        titles = await AsyncDatabase.execute_query(query, (player_name,))
         
         if not titles:
             return {
@@ -707,6 +709,7 @@ async def get_player_titles(player_name: str):
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -728,9 +731,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -743,7 +747,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
@@ -770,11 +777,91 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/{player_name}/trajectory", response_model=dict)
+# Rating columns whose shape downsampling preserves, per system
+TRAJECTORY_RATING_COLUMNS = {
+    "elo": ["elo_rating"],
+    "tsr": ["tsr_rating"],
+    "glicko2": ["glicko2_rating"],
+    "all": ["elo_rating", "tsr_rating", "glicko2_rating"],
+}
+
+
+# Columns per system, in response order; the ones a system doesn't use are
+# returned as NULL
+TRAJECTORY_COLUMNS = ["elo_rating", "tsr_rating", "tsr_uncertainty", "tsr_smoothed",
+                      "glicko2_rating", "glicko2_rd"]
+TRAJECTORY_SYSTEM_COLUMNS = {
+    "elo": (["elo_rating", "tsr_rating", "glicko2_rating"], {"elo_rating"}),
+    "tsr": (["elo_rating", "tsr_rating", "tsr_uncertainty", "tsr_smoothed", "glicko2_rating"],
+            {"tsr_rating", "tsr_uncertainty", "tsr_smoothed"}),
+    "glicko2": (["elo_rating", "tsr_rating", "glicko2_rating", "glicko2_rd"],
+                {"glicko2_rating", "glicko2_rd"}),
+    "all": (TRAJECTORY_COLUMNS, set(TRAJECTORY_COLUMNS)),
+}
+
+
+@cached()
+async def load_trajectory(player_name: str, system: str, limit: Optional[int],
+                          max_points: Optional[int]) -> tuple:
+    """
+    A player's trajectory rows, downsampled to max_points if given
+    
+    Read from the memory-mapped trajectory store when one is published for
+    the current data version, else from player_ratings. Cached per player /
+    system / size independently of the response format, so the
+    downsampling runs once per data version.
+    
+    Returns:
+        (column names, tuple rows, total matches before downsampling)
+    """
+    rating_columns, selected = TRAJECTORY_SYSTEM_COLUMNS[system]
+    columns = ["match_number", "date"] + rating_columns
+    
+    store = await get_trajectory_store()
+    if store is not None:
+        rows = store.rows(
+            player_name,
+            ["career_match_number", "date"] + [c if c in selected else None for c in rating_columns],
+            limit=limit
+        ) or []
+    else:
+        select = ", ".join(c if c in selected else f"NULL as {c}" for c in rating_columns)
+        query = f"""
+            SELECT 
+                career_match_number as match_number,
+                date,
+                {select}
+            FROM player_ratings
+            WHERE player_id = (SELECT player_id FROM players WHERE name = %s)
+            ORDER BY career_match_number ASC
+        """
+        
+        params = [player_name]
+        
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
+        
+        columns, rows = await AsyncDatabase.execute_rows(query, tuple(params))
+    
+    total = len(rows)
+    
+    if max_points:
+        rating_indices = [columns.index(c) for c in TRAJECTORY_RATING_COLUMNS[system]]
+        rows = downsample_rows(rows, columns.index("match_number"), rating_indices, max_points)
+    
+    return columns, rows, total
+
+
+@router.get("/{player_name}/trajectory", response_model=dict, response_class=FastJSONResponse)
+@cached()
 async def get_player_trajectory(
     player_name: str,
     system: str = Query(default="all", regex="^(all|elo|tsr|glicko2)$"),
-    limit: Optional[int] = Query(default=None, le=5000)
+    limit: Optional[int] = Query(default=None, le=5000),
+    max_points: Optional[int] = Query(default=None, ge=10, le=5000),
+    format: Optional[str] = Query(default=None, regex=FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None)
 ):
     """
     Get player's complete career trajectory for charting
@@ -782,48 +869,118 @@ async def get_player_trajectory(
     - **player_name**: Player name (URL-encoded)
     - **system**: Rating system (all, elo, tsr, glicko2)
     - **limit**: Limit data points (useful for large careers)
+    - **max_points**: Thin the whole career to at most this many points,
+      keeping its shape (LTTB per rating system, see utils/downsample.py)
+    - **format**: json (default), columnar or msgpack; also read from Accept
+      (see utils/formats.py)
+    """
+    
+    fmt = negotiate(format, accept)
+    
+    # Decode name
+    player_name = player_name.replace("%20", " ").replace("+", " ")
+    
+    try:
+        # Tuple rows straight into the encoder (see utils/formats.py)
+        columns, rows, total = await load_trajectory(
+            player_name=player_name, system=system, limit=limit, max_points=max_points
+        )
+        
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"No data found for player '{player_name}'")
+        
+        return respond({
+            "player": player_name,
+            "total_matches": total,
+            "data_points": table(columns, rows, fmt)
+        }, fmt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/{player_name}/rank-history", response_model=dict, response_class=FastJSONResponse)
+@cached()
+async def get_player_rank_history(
+    player_name: str,
+    rating_system: str = Query(default="elo", regex="^(elo|tsr|glicko2)$"),
+    date: Optional[str] = Query(default=None, description="Also return the rank on this date (YYYY-MM-DD)"),
+    format: Optional[str] = Query(default=None, regex=FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Get a player's weekly rank over their career
+    
+    - **player_name**: Player name (URL-encoded)
+    - **rating_system**: Rating system (elo, tsr, glicko2)
+    - **date**: Optional date to look up the rank on
+    - **format**: json (default), columnar or msgpack; also read from Accept
+      (see utils/formats.py)
+    
+    Returns the runs of weeks at one rank (end_date exclusive, null while
+    current) within the top 100, plus weeks at #1 and in the top 10.
+    Precomputed by scripts/ranking_snapshots.py.
     """
     
+    fmt = negotiate(format, accept)
+    
     # Decode name
     player_name = player_name.replace("%20", " ").replace("+", " ")
     
-    # Build column selection based on system
-    if system == "elo":
-        columns = "elo_rating, NULL as tsr_rating, NULL as glicko2_rating"
-    elif system == "tsr":
-        columns = "NULL as elo_rating, tsr_rating, tsr_uncertainty, tsr_smoothed, NULL as glicko2_rating"
-    elif system == "glicko2":
-        columns = "NULL as elo_rating, NULL as tsr_rating, glicko2_rating, glicko2_rd"
-    else:  # all
-        columns = "elo_rating, tsr_rating, tsr_uncertainty, tsr_smoothed, glicko2_rating, glicko2_rd"
+    try:
+        on = date_cls.fromisoformat(date) if date is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {date}")
     
-    query = f"""
+    summary_query = """
         SELECT 
-            career_match_number as match_number,
-            date,
-            {columns}
-        FROM player_ratings
-        WHERE player_id = (SELECT player_id FROM players WHERE name = %s)
-        ORDER BY career_match_number ASC
+            p.name,
+            COALESCE(wt.weeks_at_no1, 0) as weeks_at_no1,
+            COALESCE(wt.weeks_in_top10, 0) as weeks_in_top10,
+            wt.best_rank
+        FROM players p
+        LEFT JOIN weeks_at_top wt ON wt.player_id = p.player_id AND wt.rating_system = %s
+        WHERE p.name = %s
     """
     
-    params = [player_name]
-    
-    if limit:
-        query += " LIMIT %s"
-        params.append(limit)
+    intervals_query = """
+        SELECT 
+            ri.start_date,
+            ri.end_date,
+            ri.rank
+        FROM rank_intervals ri
+        JOIN players p ON ri.player_id = p.player_id
+        WHERE p.name = %s AND ri.rating_system = %s
+        ORDER BY ri.start_date
+    """
     
     try:
-        trajectory = Database.execute_query(query, tuple(params))
+        summary, (columns, rows) = await asyncio.gather(
+            AsyncDatabase.execute_one(summary_query, (rating_system, player_name)),
+            AsyncDatabase.execute_rows(intervals_query, (player_name, rating_system))
+        )
         
-        if not trajectory:
-            raise HTTPException(status_code=404, detail=f"No data found for player '{player_name}'")
+        if not summary:
+            raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
         
-        return {
-            "player": player_name,
-            "total_matches": len(trajectory),
-            "data_points": trajectory
+        result = {
+            "player": summary['name'],
+            "rating_system": rating_system,
+            "weeks_at_no1": summary['weeks_at_no1'],
+            "weeks_in_top10": summary['weeks_in_top10'],
+            "best_rank": summary['best_rank'],
         }
+        
+        if on is not None:
+            # A player has few intervals: find the one covering the date
+            result["rank_on_date"] = next(
+                (rank for start, end, rank in rows if start <= on and (end is None or on < end)),
+                None
+            )
+        
+        result["history"] = table(columns, rows, fmt)
+        return respond(result, fmt)
     except HTTPException:
         raise
     except Exception as e:
@@ -831,6 +988,7 @@ async def get_player_trajectory(
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -852,9 +1010,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -867,7 +1026,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
@@ -895,6 +1057,7 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
 
 
 @router.get("/{player_name}/titles", response_model=dict)
+@cached()
 async def get_player_titles(player_name: str):
     """
     Get all tournament titles won by player, organized by tier
@@ -924,7 +1087,7 @@ async def get_player_titles(player_name: str):
     """
     
     try:
-        titles = Database.execute_query(query, (player_name,))
+        titles = await AsyncDatabase.execute_query(query, (player_name,))
         
         if not titles:
             return {
@@ -970,6 +1133,7 @@ async def get_player_titles(player_name: str):
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -991,9 +1155,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -1006,7 +1171,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
@@ -1034,6 +1202,7 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
 
 
 @router.get("/{player_name}/recent", response_model=dict)
+@cached()
 async def get_recent_matches(
     player_name: str,
     limit: int = Query(default=20, le=100, description="Number of recent matches")
@@ -1045,6 +1214,9 @@ async def get_recent_matches(
     - **limit**: Number of recent matches (max 100)
     
     Returns recent match results with opponents, tournaments, scores
+    and ELO before/after each match. Both players' ELOs come from the
+    player's own rating row (opponent after = opponent before - elo_delta,
+    ELO being zero-sum), so the opponent's rating row is never joined.
     """
     
     # Decode name
@@ -1063,22 +1235,19 @@ async def get_recent_matches(
                     WHEN m.winner_id = p.player_id THEN 'Won'
                     ELSE 'Lost'
                 END as result,
-                CASE 
-                    WHEN m.player1_id = p.player_id THEN p2.name
-                    ELSE p1.name
-                END as opponent,
+                opp.name as opponent,
                 pr.elo_rating as player_elo,
-                CASE 
-                    WHEN m.player1_id = p.player_id THEN pr2.elo_rating
-                    ELSE pr1.elo_rating
-                END as opponent_elo
+                pr.elo_pre_match as player_elo_before,
+                pr.elo_delta as elo_change,
+                pr.opponent_elo_pre_match - pr.elo_delta as opponent_elo,
+                pr.opponent_elo_pre_match as opponent_elo_before
             FROM matches m
             JOIN players p ON (p.player_id = m.player1_id OR p.player_id = m.player2_id)
-            LEFT JOIN players p1 ON m.player1_id = p1.player_id
-            LEFT JOIN players p2 ON m.player2_id = p2.player_id
-            LEFT JOIN player_ratings pr ON pr.match_id = m.match_id AND pr.player_id = p.player_id
-            LEFT JOIN player_ratings pr1 ON pr1.match_id = m.match_id AND pr1.player_id = m.player1_id
-            LEFT JOIN player_ratings pr2 ON pr2.match_id = m.match_id AND pr2.player_id = m.player2_id
+            LEFT JOIN players opp ON opp.player_id = CASE 
+                WHEN m.player1_id = p.player_id THEN m.player2_id
+                ELSE m.player1_id
+            END
+            LEFT JOIN player_ratings pr ON pr.match_id = m.match_id AND pr.date = m.date AND pr.player_id = p.player_id
             WHERE p.name = %s
             ORDER BY m.date DESC
             LIMIT %s
@@ -1087,7 +1256,7 @@ async def get_recent_matches(
     """
     
     try:
-        matches = Database.execute_query(query, (player_name, limit))
+        matches = await AsyncDatabase.execute_query(query, (player_name, limit))
         
         if not matches:
             raise HTTPException(status_code=404, detail=f"No matches found for player '{player_name}'")
@@ -1115,6 +1284,7 @@ async def get_recent_matches(
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -1136,9 +1306,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -1151,7 +1322,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
@@ -1179,6 +1353,7 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
 
 
 @router.get("/{player_name}/titles", response_model=dict)
+@cached()
 async def get_player_titles(player_name: str):
     """
     Get all tournament titles won by player, organized by tier
@@ -1208,7 +1383,7 @@ async def get_player_titles(player_name: str):
     """
     
     try:
-        titles = Database.execute_query(query, (player_name,))
+        titles = await AsyncDatabase.execute_query(query, (player_name,))
         
         if not titles:
             return {
@@ -1254,6 +1429,7 @@ async def get_player_titles(player_name: str):
 
 
 @router.get("/{player_name}/current-year", response_model=dict)
+@cached()
 async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     Get player's current year (2025) match statistics
@@ -1275,9 +1451,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
                 SUM(CASE WHEN m.winner_id = pi.player_id THEN 1 ELSE 0 END) as wins,
                 SUM(CASE WHEN m.winner_id != pi.player_id THEN 1 ELSE 0 END) as losses
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             JOIN player_info pi ON pi.player_id = pr.player_id
-            WHERE EXTRACT(YEAR FROM m.date) = %s
+            WHERE m.date >= %s AND m.date < %s
+              AND pr.date >= %s AND pr.date < %s  -- Both tables prune to the year's partitions
         )
         SELECT 
             p.name,
@@ -1290,7 +1467,10 @@ async def get_player_current_year_stats(player_name: str, year: int = 2025):
     """
     
     try:
-        result = Database.execute_one(query, (player_name, year))
+        year_start, year_end = date_cls(year, 1, 1), date_cls(year + 1, 1, 1)
+        result = await AsyncDatabase.execute_one(
+            query, (player_name, year_start, year_end, year_start, year_end)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
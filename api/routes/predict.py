@@ -2,7 +2,8 @@
 Match prediction endpoints - MVP version
 """
 from fastapi import APIRouter, HTTPException, Query
-from database import Database
+from database import AsyncDatabase
+from utils.cache import cached
 import math
 
 router = APIRouter()
@@ -14,6 +15,7 @@ def calculate_win_probability(elo_diff: float) -> float:
 
 
 @router.get("/match", response_model=dict)
+@cached(daily=True)
 async def predict_match(
     player1: str = Query(..., description="First player name"),
     player2: str = Query(..., description="Second player name"),
@@ -40,9 +42,10 @@ async def predict_match(
                 SUM(CASE WHEN m.winner_id = pr.player_id THEN 1 ELSE 0 END) as surface_wins,
                 AVG(pr.elo_rating) as avg_surface_elo
             FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
+            JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
             WHERE m.surface = %s
               AND pr.date >= CURRENT_DATE - INTERVAL '2 years'
+              AND m.date >= CURRENT_DATE - INTERVAL '2 years'  -- Lets matches prune too
             GROUP BY pr.player_id
             HAVING COUNT(*) >= 5  -- At least 5 matches on surface
         )
@@ -69,7 +72,7 @@ async def predict_match(
     """
     
     try:
-        players = Database.execute_query(query, (surface, player1, player2))
+        players = await AsyncDatabase.execute_query(query, (surface, player1, player2))
         
         if len(players) < 2:
             raise HTTPException(
@@ -1,21 +1,29 @@
 """
 Rankings endpoints
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from typing import Optional
 from datetime import date
-from database import Database
+import numpy as np
+from database import AsyncDatabase
+from services.ranking_engine import active_since, get_ranking_engine
+from utils.cache import cached
+from utils.fast_json import FastJSONResponse
+from utils.formats import FORMAT_PATTERN, negotiate, respond, table
 from config import settings
 
 router = APIRouter()
 
 
-@router.get("/current", response_model=dict)
+@router.get("/current", response_model=dict, response_class=FastJSONResponse)
+@cached(daily=True)
 async def get_current_rankings(
     limit: int = Query(default=100, le=500),
     offset: int = Query(default=0, ge=0),
     system: str = Query(default="elo", regex="^(elo|tsr|glicko2)$"),
-    active: Optional[bool] = True
+    active: Optional[bool] = True,
+    format: Optional[str] = Query(default=None, regex=FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None)
 ):
     """
     Get current rankings
@@ -24,61 +32,43 @@ async def get_current_rankings(
     - **offset**: Pagination offset
     - **system**: Rating system (elo, tsr, glicko2)
     - **active**: Only active players (default: true)
+    - **format**: json (default), columnar or msgpack; also read from Accept
+      (see utils/formats.py)
     """
     
-    # Select rating column based on system
-    rating_column = {
-        "elo": "plr.elo_rating",
-        "tsr": "plr.tsr_rating",
-        "glicko2": "plr.glicko2_rating"
-    }.get(system, "plr.elo_rating")
-    
-    query = f"""
-        SELECT 
-            ROW_NUMBER() OVER (ORDER BY {rating_column} DESC) as rank,
-            p.name,
-            plr.elo_rating as elo,
-            plr.tsr_rating as tsr,
-            plr.tsr_uncertainty as uncertainty,
-            plr.glicko2_rating as glicko2,
-            plr.form_index as form,
-            plr.last_match
-        FROM players p
-        INNER JOIN player_latest_ratings plr ON p.player_id = plr.player_id
-        WHERE {rating_column} IS NOT NULL
-    """
-    
-    params = []
-    
-    if active:
-        query += " AND plr.last_match >= CURRENT_DATE - INTERVAL '6 months'"
-    
-    query += f" ORDER BY {rating_column} DESC LIMIT %s OFFSET %s"
-    params.extend([limit, offset])
+    fmt = negotiate(format, accept)
     
     try:
-        rankings = Database.execute_query(query, tuple(params))
-        
-        # Get last match date for "as_of_date"
-        last_match_query = "SELECT MAX(last_match) as last_date FROM player_latest_ratings"
-        last_match_result = Database.execute_one(last_match_query)
-        as_of_date = last_match_result['last_date'] if last_match_result else date.today()
+        # Pre-sorted in memory (see services/ranking_engine.py)
+        engine = await get_ranking_engine()
+        positions = engine.ranked(system, on_or_after=active_since() if active else None)
+        columns = ["rank", "name", "elo", "tsr", "uncertainty", "glicko2", "form", "last_match"]
+        rows = engine.page(
+            positions,
+            ["name", "elo_rating", "tsr_rating", "tsr_uncertainty", "glicko2_rating",
+             "form_index", "last_match"],
+            limit, offset
+        )
+        as_of_date = engine.as_of() or date.today()
         
-        return {
+        return respond({
             "as_of_date": str(as_of_date),
             "system": system,
-            "total_ranked": len(rankings),
-            "rankings": rankings
-        }
+            "total_ranked": len(rows),
+            "rankings": table(columns, rows, fmt)
+        }, fmt)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/surface/{surface}", response_model=dict)
+@router.get("/surface/{surface}", response_model=dict, response_class=FastJSONResponse)
+@cached()
 async def get_surface_rankings(
     surface: str,
     limit: int = Query(default=100, le=500),
-    active_only: bool = Query(default=True, description="Filter to active players only (played in 2025)")
+    active_only: bool = Query(default=True, description="Filter to active players only (played in 2025)"),
+    format: Optional[str] = Query(default=None, regex=FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None)
 ):
     """
     Get rankings for specific surface (clay, grass, hard)
@@ -86,63 +76,82 @@ async def get_surface_rankings(
     - **surface**: Surface type (clay, grass, hard)
     - **limit**: Number of players to return (max 500)
     - **active_only**: Show only active players (played in 2025) - default: True
+    - **format**: json (default), columnar or msgpack; also read from Accept
+      (see utils/formats.py)
     
     Returns top players by surface-specific ELO rating
     """
     
+    fmt = negotiate(format, accept)
+    
     # Validate surface
     if surface not in ['clay', 'grass', 'hard']:
         raise HTTPException(status_code=400, detail="Surface must be: clay, grass, or hard")
     
-    # Map surface to column name
-    surface_column = f"elo_{surface}"
+    try:
+        # Latest rating row per player, pre-sorted by surface ELO in memory
+        # (see services/ranking_engine.py)
+        engine = await get_ranking_engine()
+        positions = engine.ranked(
+            surface, on_or_after=np.datetime64("2025-01-01") if active_only else None
+        )
+        columns = ["rank", "name", "surface_rating", "overall_elo", "total_matches", "last_match"]
+        rows = engine.page(
+            positions,
+            ["name", f"elo_{surface}", "elo_rating", "career_match_number", "last_match"],
+            limit
+        )
+        
+        return respond({
+            "surface": surface,
+            "active_only": active_only,
+            "total_ranked": len(rows),
+            "rankings": table(columns, rows, fmt)
+        }, fmt)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/player/{player_name}", response_model=dict)
+@cached()
+async def get_player_rank(player_name: str):
+    """
+    A player's current rank in every rating system and on every surface
     
-    # Build query with optional active filter
-    date_filter = "AND pr.date >= '2025-01-01'" if active_only else ""
+    - **player_name**: Player name (URL-encoded)
     
-    query = f"""
-        WITH latest_ratings AS (
-            SELECT 
-                player_id,
-                MAX(career_match_number) as max_match
-            FROM player_ratings
-            GROUP BY player_id
-        )
-        SELECT 
-            ROW_NUMBER() OVER (ORDER BY pr.{surface_column} DESC) as rank,
-            p.name,
-            pr.{surface_column} as surface_rating,
-            pr.elo_rating as overall_elo,
-            pr.career_match_number as total_matches,
-            pr.date as last_match
-        FROM player_ratings pr
-        JOIN latest_ratings lr ON pr.player_id = lr.player_id 
-            AND pr.career_match_number = lr.max_match
-        JOIN players p ON pr.player_id = p.player_id
-        WHERE pr.{surface_column} IS NOT NULL
-            {date_filter}
-        ORDER BY pr.{surface_column} DESC
-        LIMIT %s
+    Ranks are among all rated players (active or not); on surfaces, by the
+    surface ELO of each player's latest rating row. null = unrated.
     """
     
+    # Decode name
+    player_name = player_name.replace("%20", " ").replace("+", " ")
+    
     try:
-        rankings = Database.execute_query(query, (limit,))
-        
-        return {
-            "surface": surface,
-            "active_only": active_only,
-            "total_ranked": len(rankings),
-            "rankings": rankings
-        }
+        engine = await get_ranking_engine()
+        ranks = engine.rank_of(player_name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    
+    if ranks is None:
+        raise HTTPException(status_code=404, detail=f"Player '{player_name}' not found")
+    
+    return {
+        "player": player_name,
+        "ranks": {system: ranks[system] for system in ("elo", "tsr", "glicko2")},
+        "surface_ranks": {surface: ranks[surface] for surface in ("clay", "grass", "hard")},
+        "total_ranked": {key: engine.ranked_count(key) for key in ranks}
+    }
 
 
-@router.get("/historical", response_model=dict)
+@router.get("/historical", response_model=dict, response_class=FastJSONResponse)
+@cached()
 async def get_historical_rankings(
     date: str = Query(..., description="Date in YYYY-MM-DD format"),
     limit: int = Query(default=10, le=100),
-    rating_system: str = Query(default="elo", regex="^(elo|tsr|glicko2)$")
+    rating_system: str = Query(default="elo", regex="^(elo|tsr|glicko2)$"),
+    format: Optional[str] = Query(default=None, regex=FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None)
 ):
     """
     Get rankings at a specific historical date
@@ -150,56 +159,112 @@ async def get_historical_rankings(
     - **date**: Date in YYYY-MM-DD format (e.g., "2010-01-01")
     - **limit**: Number of players (max 100)
     - **rating_system**: Rating system (elo, tsr, glicko2)
+    - **format**: json (default), columnar or msgpack; also read from Accept
+      (see utils/formats.py)
     
-    Returns: Top N players as of that date
+    Returns: Top N players of the latest weekly snapshot on or before that
+    date (players with a rated match in the preceding 52 weeks; see
+    scripts/ranking_snapshots.py)
     """
     
-    # Select rating column
-    rating_col = {
-        "elo": "elo_rating",
-        "tsr": "tsr_rating",
-        "glicko2": "glicko2_rating"
-    }.get(rating_system, "elo_rating")
+    fmt = negotiate(format, accept)
     
-    query = f"""
-        WITH ratings_on_date AS (
-            SELECT 
-                pr.player_id,
-                pr.{rating_col} as rating,
-                pr.career_match_number,
-                pr.date,
-                ROW_NUMBER() OVER (PARTITION BY pr.player_id ORDER BY pr.date DESC, pr.career_match_number DESC) as rn
-            FROM player_ratings pr
-            WHERE pr.date <= %s
-                AND pr.{rating_col} IS NOT NULL
-        )
+    # Primary-key read of one precomputed snapshot
+    query = """
         SELECT 
-            ROW_NUMBER() OVER (ORDER BY rod.rating DESC) as rank,
+            rs.rank,
             p.name,
-            rod.rating,
-            rod.date as last_match_before_date,
-            rod.career_match_number as total_matches
-        FROM ratings_on_date rod
-        JOIN players p ON rod.player_id = p.player_id
-        WHERE rod.rn = 1
-        ORDER BY rod.rating DESC
-        LIMIT %s
+            rs.rating,
+            rs.last_match as last_match_before_date,
+            rs.career_match_number as total_matches,
+            rs.snapshot_date
+        FROM ranking_snapshots rs
+        JOIN players p ON rs.player_id = p.player_id
+        WHERE rs.rating_system = %s
+            AND rs.snapshot_date = (
+                SELECT MAX(snapshot_date)
+                FROM ranking_snapshots
+                WHERE rating_system = %s AND snapshot_date <= %s
+            )
+            AND rs.rank <= %s
+        ORDER BY rs.rank
     """
     
     try:
-        rankings = Database.execute_query(query, (date, limit))
+        columns, rows = await AsyncDatabase.execute_rows(
+            query, (rating_system, rating_system, date, limit)
+        )
         
-        if not rankings:
+        if not rows:
             raise HTTPException(status_code=404, detail=f"No rating data available for date: {date}")
         
-        return {
+        # Same snapshot date on every row
+        snapshot_date = rows[0][-1]
+        columns, rows = columns[:-1], [row[:-1] for row in rows]
+        
+        return respond({
             "date": date,
+            "snapshot_date": str(snapshot_date),
             "rating_system": rating_system,
-            "total_ranked": len(rankings),
-            "rankings": rankings
-        }
+            "total_ranked": len(rows),
+            "rankings": table(columns, rows, fmt)
+        }, fmt)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+
+@router.get("/weeks-at-top", response_model=dict, response_class=FastJSONResponse)
+@cached()
+async def get_weeks_at_top(
+    rating_system: str = Query(default="elo", regex="^(elo|tsr|glicko2)$"),
+    sort_by: str = Query(default="no1", regex="^(no1|top10)$"),
+    limit: int = Query(default=20, le=100),
+    format: Optional[str] = Query(default=None, regex=FORMAT_PATTERN),
+    accept: Optional[str] = Header(default=None)
+):
+    """
+    Most weeks at #1 (or in the top 10) of the weekly rankings
+    
+    - **rating_system**: Rating system (elo, tsr, glicko2)
+    - **sort_by**: no1 (weeks at #1) or top10 (weeks in the top 10)
+    - **limit**: Number of players (max 100)
+    - **format**: json (default), columnar or msgpack; also read from Accept
+      (see utils/formats.py)
+    
+    Precomputed by scripts/ranking_snapshots.py
+    """
+    
+    fmt = negotiate(format, accept)
+    
+    sort_column, tie_column = {
+        "no1": ("weeks_at_no1", "weeks_in_top10"),
+        "top10": ("weeks_in_top10", "weeks_at_no1")
+    }[sort_by]
+    
+    query = f"""
+        SELECT 
+            ROW_NUMBER() OVER (ORDER BY wt.{sort_column} DESC, wt.{tie_column} DESC) as rank,
+            p.name,
+            wt.weeks_at_no1,
+            wt.weeks_in_top10,
+            wt.best_rank
+        FROM weeks_at_top wt
+        JOIN players p ON wt.player_id = p.player_id
+        WHERE wt.rating_system = %s AND wt.{sort_column} > 0
+        ORDER BY wt.{sort_column} DESC, wt.{tie_column} DESC
+        LIMIT %s
+    """
+    
+    try:
+        columns, rows = await AsyncDatabase.execute_rows(query, (rating_system, limit))
+        
+        return respond({
+            "rating_system": rating_system,
+            "sort_by": sort_by,
+            "total_ranked": len(rows),
+            "players": table(columns, rows, fmt)
+        }, fmt)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -0,0 +1,252 @@
+"""
+In-memory ranking engine
+
+Current, surface and top-10 rankings and the player list are all orderings
+of the same ~30k player_latest_ratings rows. Instead of re-sorting them
+on every request, the engine loads those rows into NumPy arrays once per
+data version and pre-sorts an index per sort key. A request is then a boolean
+filter over a pre-sorted index plus a slice - microseconds, no query.
+
+Loaded lazily on first use (and warmed at startup); rebuilt when the data
+version changes. Requests arriving during a rebuild wait for it rather
+than serve the previous version under the new version's cache keys.
+"""
+import asyncio
+import time
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from database import AsyncDatabase
+from utils.cache import get_data_version
+
+# Latest rating row per player (maintained in player_latest_ratings)
+LATEST_QUERY = """
+    SELECT
+        p.player_id,
+        p.name,
+        p.country,
+        plr.elo_rating,
+        plr.tsr_rating,
+        plr.tsr_uncertainty,
+        plr.glicko2_rating,
+        plr.form_index,
+        plr.last_match,
+        plr.elo_clay,
+        plr.elo_grass,
+        plr.elo_hard,
+        plr.career_match_number
+    FROM players p
+    JOIN player_latest_ratings plr ON plr.player_id = p.player_id
+    ORDER BY p.player_id
+"""
+
+# Career aggregates for the player list
+CAREER_QUERY = """
+    SELECT
+        pr.player_id,
+        MAX(pr.elo_rating) as peak_elo,
+        COUNT(DISTINCT pr.match_id) as career_matches,
+        COUNT(DISTINCT pr.match_id) FILTER (WHERE m.tournament_tier = 'Grand Slam') as grand_slams
+    FROM player_ratings pr
+    JOIN matches m ON pr.match_id = m.match_id AND pr.date = m.date
+    GROUP BY pr.player_id
+"""
+
+FLOAT_COLUMNS = ["elo_rating", "tsr_rating", "tsr_uncertainty", "glicko2_rating", "form_index",
+                 "elo_clay", "elo_grass", "elo_hard", "peak_elo"]
+DATE_COLUMNS = ["last_match"]
+INT_COLUMNS = ["career_match_number", "career_matches", "grand_slams"]
+
+# Sort keys with a pre-sorted index (descending, NULLs excluded)
+SORT_KEYS = {
+    "elo": "elo_rating",
+    "tsr": "tsr_rating",
+    "glicko2": "glicko2_rating",
+    "clay": "elo_clay",
+    "grass": "elo_grass",
+    "hard": "elo_hard",
+}
+
+# "Active" as the SQL used it: last match within CURRENT_DATE - 6 months
+ACTIVE_MONTHS = 6
+
+
+def active_since() -> np.datetime64:
+    return np.datetime64(date.today() - relativedelta(months=ACTIVE_MONTHS), "D")
+
+
+class RankingEngine:
+    """Latest ratings of every rated player, as columns with sorted indexes"""
+    
+    def __init__(self, data_version, latest: tuple, career: tuple):
+        self.data_version = data_version
+        latest_columns, latest_rows = latest
+        career_columns, career_rows = career
+        
+        values = dict(zip(latest_columns, zip(*latest_rows))) if latest_rows else {
+            column: () for column in latest_columns
+        }
+        self.player_id = np.array(values["player_id"], dtype=np.int64)
+        self.name = np.array(values["name"], dtype=object)
+        self.country = np.array(values["country"], dtype=object)
+        self.columns = {}
+        for column in FLOAT_COLUMNS + DATE_COLUMNS + INT_COLUMNS:
+            if column in values:
+                self.columns[column] = self._array(column, values[column])
+        
+        # Career aggregates, aligned to player_id (rows are ordered by it)
+        n = len(self.player_id)
+        self.columns["peak_elo"] = np.full(n, np.nan)
+        self.columns["career_matches"] = np.zeros(n, dtype=np.int64)
+        self.columns["grand_slams"] = np.zeros(n, dtype=np.int64)
+        if career_rows and n:
+            career = dict(zip(career_columns, zip(*career_rows)))
+            ids = np.array(career["player_id"], dtype=np.int64)
+            pos = np.searchsorted(self.player_id, ids).clip(max=n - 1)
+            known = self.player_id[pos] == ids
+            for column in ("peak_elo", "career_matches", "grand_slams"):
+                self.columns[column][pos[known]] = self._array(column, career[column])[known]
+        
+        self.position = {name: i for i, name in enumerate(self.name.tolist())}
+        
+        self.order = {}
+        for key, column in SORT_KEYS.items():
+            ratings = self.columns[column]
+            order = np.argsort(-ratings, kind="stable")
+            self.order[key] = order[~np.isnan(ratings[order])]
+        
+        # Player list order: ELO first, NULL ELOs last; and by name (descending)
+        elo = self.columns["elo_rating"]
+        self.order["list_elo"] = np.argsort(np.where(np.isnan(elo), np.inf, -elo), kind="stable")
+        self.order["list_name"] = np.argsort(self.name, kind="stable")[::-1]
+        
+        # Rank of every player per key (0 = unranked), for rank-of-player
+        self.rank = {}
+        for key in SORT_KEYS:
+            rank = np.zeros(n, dtype=np.int64)
+            rank[self.order[key]] = np.arange(1, len(self.order[key]) + 1)
+            self.rank[key] = rank
+    
+    @staticmethod
+    def _array(column, values):
+        if column in FLOAT_COLUMNS:
+            return np.array(values, dtype=np.float64)  # None -> NaN
+        if column in DATE_COLUMNS:
+            return np.array([v if v is not None else "NaT" for v in values], dtype="datetime64[D]")
+        return np.array([v if v is not None else 0 for v in values], dtype=np.int64)
+    
+    def __len__(self):
+        return len(self.player_id)
+    
+    def as_of(self):
+        """Most recent last_match (the rankings' as-of date)"""
+        last_match = self.columns["last_match"]
+        valid = last_match[~np.isnat(last_match)]
+        return valid.max().item() if len(valid) else None
+    
+    def ranked(self, key: str, on_or_after: Optional[np.datetime64] = None,
+               before: Optional[np.datetime64] = None, min_elo: Optional[float] = None) -> np.ndarray:
+        """
+        Player positions in key order, optionally filtered
+        
+        Args:
+            key: SORT_KEYS entry, "list_elo" or "list_name"
+            on_or_after, before: Keep players whose last match is in range
+                (NULL dates never match, as in SQL)
+            min_elo: Only players with elo_rating >= min_elo
+        """
+        order = self.order[key]
+        keep = np.ones(len(order), dtype=bool)
+        if on_or_after is not None:
+            keep &= self.columns["last_match"][order] >= on_or_after
+        if before is not None:
+            keep &= self.columns["last_match"][order] < before
+        if min_elo is not None:
+            keep &= self.columns["elo_rating"][order] >= min_elo
+        return order if keep.all() else order[keep]
+    
+    def rows(self, positions: np.ndarray, columns: list) -> list:
+        """
+        Tuple rows for positions
+        
+        Args:
+            columns: Engine columns ("name", "country", or any loaded column)
+        """
+        values = []
+        for column in columns:
+            if column == "name":
+                values.append(self.name[positions].tolist())
+            elif column == "country":
+                values.append(self.country[positions].tolist())
+            else:
+                array = self.columns[column][positions]
+                if array.dtype.kind == "f":
+                    values.append(np.where(np.isnan(array), None, array).tolist())
+                else:
+                    values.append(array.tolist())  # NaT -> None
+        return list(zip(*values)) if values else []
+    
+    def page(self, positions: np.ndarray, columns: list, limit: int, offset: int = 0) -> list:
+        """
+        Rows limit..offset of a ranking, each prefixed with its rank
+        (offset + 1, offset + 2, ... as ROW_NUMBER() before LIMIT/OFFSET)
+        """
+        window = positions[offset:offset + limit]
+        ranks = range(offset + 1, offset + 1 + len(window))
+        return [(rank,) + row for rank, row in zip(ranks, self.rows(window, columns))]
+    
+    def ranked_count(self, key: str) -> int:
+        """Players with a rating for key"""
+        return len(self.order[key])
+    
+    def elo_rated_count(self) -> int:
+        """Players with any ELO rating in their history"""
+        return int((~np.isnan(self.columns["peak_elo"])).sum())
+    
+    def rank_of(self, name: str) -> Optional[dict]:
+        """A player's rank per sort key (None where unrated), or None if unknown"""
+        i = self.position.get(name)
+        if i is None:
+            return None
+        return {key: int(rank[i]) or None for key, rank in self.rank.items()}
+
+
+_engine = None
+_lock = None
+
+
+async def get_ranking_engine() -> RankingEngine:
+    """
+    The engine for the current data version (built on first use / change)
+    
+    If the data version can't be read, the loaded engine is served as is.
+    """
+    global _engine, _lock
+    
+    version = await get_data_version()
+    if _engine is not None and (version is None or _engine.data_version == version):
+        return _engine
+    
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _engine is None or (version is not None and _engine.data_version != version):
+            start = time.perf_counter()
+            latest, career = await asyncio.gather(
+                AsyncDatabase.execute_rows(LATEST_QUERY),
+                AsyncDatabase.execute_rows(CAREER_QUERY),
+            )
+            _engine = await asyncio.to_thread(RankingEngine, version, latest, career)
+            print(f"📈 Ranking engine loaded: {len(_engine):,} players, data version {version} "
+                  f"({time.perf_counter() - start:.1f}s)")
+    return _engine
+
+
+def engine_stats() -> dict:
+    """Which data version the engine holds"""
+    if _engine is None:
+        return {"loaded": False}
+    return {"loaded": True, "data_version": _engine.data_version, "players": len(_engine)}
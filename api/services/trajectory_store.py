@@ -0,0 +1,168 @@
+"""
+Memory-mapped trajectory store
+
+Serves player trajectories from the read-only arrays that
+scripts/publish_trajectory_store.py writes, instead of querying
+player_ratings. Every column is np.load()ed with mmap_mode='r': opening
+the store reads only the manifest, a trajectory is a slice of each column
+(no copy), and the OS page cache is shared by all API workers.
+
+The store is used only while its data version equals the database's (see
+utils.cache.get_data_version); a newer version is picked up automatically
+once published, and until then callers fall back to Postgres.
+"""
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config import settings
+from utils.cache import get_data_version
+
+
+class TrajectoryStore:
+    """One published store version, memory-mapped"""
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / "manifest.json") as f:
+            manifest = json.load(f)
+        
+        self.data_version = manifest["data_version"]
+        self.players = manifest["players"]  # name -> dense index
+        self.offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+        self.columns = {
+            column: np.load(self.path / f"{column}.npy", mmap_mode="r")
+            for column in manifest["columns"]
+        }
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.players
+    
+    def arrays(self, name: str, limit: Optional[int] = None) -> Optional[dict]:
+        """
+        A player's rows as {column: array view}, or None for unknown players
+        
+        Args:
+            name: Player name
+            limit: Only the first limit matches of the career
+        """
+        index = self.players.get(name)
+        if index is None:
+            return None
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        if limit:
+            end = min(end, start + limit)
+        return {column: values[start:end] for column, values in self.columns.items()}
+    
+    def rows(self, name: str, columns: list, limit: Optional[int] = None,
+             start_date: Optional[str] = None, end_date: Optional[str] = None,
+             not_null: Optional[str] = None) -> Optional[list]:
+        """
+        A player's trajectory as tuple rows, like a query would return them
+        
+        Args:
+            name: Player name
+            columns: Store column per output column; None for a NULL column
+            limit: Only the first limit matches of the career
+            start_date, end_date: Optional inclusive date range (YYYY-MM-DD)
+            not_null: Skip rows where this column is NULL
+        
+        Returns:
+            List of tuples (NaN ratings become None), or None for unknown players
+        """
+        arrays = self.arrays(name, limit)
+        if arrays is None:
+            return None
+        
+        # Dates are sorted within a career: the range is a contiguous slice
+        dates = arrays["date"]
+        lo = np.searchsorted(dates, np.datetime64(start_date, "D")) if start_date else 0
+        hi = np.searchsorted(dates, np.datetime64(end_date, "D"), side="right") if end_date else len(dates)
+        arrays = {column: values[lo:hi] for column, values in arrays.items()}
+        if not_null is not None:
+            present = ~np.isnan(arrays[not_null])
+            if not present.all():
+                arrays = {column: values[present] for column, values in arrays.items()}
+        n = hi - lo if not_null is None else len(arrays["date"])
+        
+        values = []
+        for column in columns:
+            if column is None:
+                values.append([None] * n)
+                continue
+            array = arrays[column]
+            if array.dtype.kind == "f":
+                missing = np.isnan(array)
+                if missing.any():
+                    values.append(np.where(missing, None, array).tolist())
+                    continue
+            values.append(array.tolist())  # datetime64[D] -> datetime.date
+        
+        return list(zip(*values))
+
+
+_store = None
+_checked = (None, 0.0)  # (data version, monotonic time) of the last look at CURRENT
+_lock = None
+
+
+def _open_current() -> Optional[TrajectoryStore]:
+    root = Path(settings.TRAJECTORY_STORE_DIR)
+    try:
+        current = (root / "CURRENT").read_text().strip()
+        return TrajectoryStore(root / current)
+    except FileNotFoundError:
+        return None  # Nothing published yet
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Trajectory store unavailable: {e}")
+        return None
+
+
+async def get_trajectory_store() -> Optional[TrajectoryStore]:
+    """
+    The store matching the current data version, or None (use Postgres)
+    
+    While no store for the current version is mapped, CURRENT is re-read
+    at most every DATA_VERSION_POLL_SECONDS (the pipeline publishes right
+    after bumping the version).
+    """
+    global _store, _checked, _lock
+    
+    version = await get_data_version()
+    if version is None:
+        return None
+    if _store is not None and _store.data_version == version:
+        return _store
+    
+    checked_version, checked_at = _checked
+    if (checked_version == version
+            and time.monotonic() - checked_at < settings.DATA_VERSION_POLL_SECONDS):
+        return None
+    
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _store is None or _store.data_version != version:
+            store = await asyncio.to_thread(_open_current)
+            if store is not None:
+                _store = store
+            _checked = (version, time.monotonic())
+    
+    return _store if _store is not None and _store.data_version == version else None
+
+
+def store_stats() -> dict:
+    """Which store version is mapped"""
+    if _store is None:
+        return {"loaded": False}
+    return {
+        "loaded": True,
+        "path": str(_store.path),
+        "data_version": _store.data_version,
+        "players": len(_store.players),
+        "rows": int(_store.offsets[-1]) if len(_store.offsets) else 0,
+    }
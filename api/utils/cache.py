@@ -0,0 +1,265 @@
+"""
+Response cache for read endpoints
+
+Ratings only change when the rating scripts run, and every run bumps the
+single-row data_version table. Cache keys include that version, so after a
+rebuild every old entry simply stops being looked up (and ages out of the
+LRU / expires in Redis) - no explicit invalidation needed.
+
+The version itself is polled at most every DATA_VERSION_POLL_SECONDS, so a
+cache hit usually costs no database round trip at all.
+
+Usage:
+    @router.get("/current")
+    @cached()
+    async def get_current_rankings(...):
+        ...
+
+Backends (CACHE_BACKEND in config.py):
+    memory - bounded in-process LRU with per-entry TTL (default)
+    redis  - shared across workers; needs the redis package and server
+"""
+import asyncio
+import functools
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import NamedTuple
+
+from fastapi.responses import Response
+
+from config import settings
+from database import AsyncDatabase
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ImportError:  # Optional dependency
+    redis_asyncio = None
+    RedisError = Exception
+
+
+class MemoryCache:
+    """Bounded LRU cache with per-entry expiry (thread-safe)"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+    
+    async def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    async def set(self, key: str, value, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """
+    Redis-backed cache; values are pickled, expiry is Redis' own TTL
+    
+    An unreachable Redis degrades to cache misses instead of failing requests.
+    """
+    
+    PREFIX = "tct:"
+    
+    def __init__(self, host: str, port: int):
+        self._client = redis_asyncio.Redis(host=host, port=port)
+    
+    async def get(self, key: str):
+        try:
+            raw = await self._client.get(self.PREFIX + key)
+        except RedisError:
+            return None
+        return pickle.loads(raw) if raw is not None else None
+    
+    async def set(self, key: str, value, ttl: int):
+        try:
+            await self._client.set(self.PREFIX + key, pickle.dumps(value), ex=ttl)
+        except RedisError:
+            pass
+    
+    def size(self) -> int:
+        return -1  # Not tracked locally
+
+
+def _make_backend():
+    if settings.CACHE_BACKEND == "redis":
+        if redis_asyncio is not None:
+            return RedisCache(settings.REDIS_HOST, settings.REDIS_PORT)
+        print("⚠️  CACHE_BACKEND=redis but the redis package is not installed - using memory cache")
+    return MemoryCache(settings.CACHE_MAX_ENTRIES)
+
+
+_backend = _make_backend()
+_stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+# Last polled data version: (version, polled_at)
+_version = (None, 0.0)
+_version_lock = None
+
+
+async def get_data_version():
+    """
+    Current data version, polled at most every DATA_VERSION_POLL_SECONDS
+    
+    Returns:
+        The version, or None if it can't be read (callers must not cache)
+    """
+    global _version, _version_lock
+    
+    version, polled_at = _version
+    if time.monotonic() - polled_at < settings.DATA_VERSION_POLL_SECONDS:
+        return version
+    
+    if _version_lock is None:
+        _version_lock = asyncio.Lock()
+    async with _version_lock:
+        # Another request may have refreshed it while we waited
+        version, polled_at = _version
+        if time.monotonic() - polled_at < settings.DATA_VERSION_POLL_SECONDS:
+            return version
+        try:
+            row = await AsyncDatabase.execute_one("SELECT version FROM data_version")
+            version = row["version"] if row else None
+        except Exception as e:
+            print(f"⚠️  Could not read data version: {e}")
+            version = None
+        _version = (version, time.monotonic())
+        return version
+
+
+def cache_key(name: str, version, params: dict) -> str:
+    """Key for one endpoint call: endpoint, data version and parameters"""
+    args = ",".join(f"{k}={params[k]!r}" for k in sorted(params))
+    return f"{name}:v{version}:{args}"
+
+
+def make_etag(version, path: str, query: str, accept: str = "", day: str = "") -> str:
+    """
+    Strong ETag for one GET request under a given data version
+    
+    The query string is normalized (parameters sorted) so equivalent URLs
+    share a tag; Accept is included because it can select the format. Pass
+    day (today's date) for responses that also depend on the calendar.
+    """
+    params = "&".join(sorted(query.split("&"))) if query else ""
+    digest = hashlib.sha1(f"{path}?{params}|{accept}|{day}".encode()).hexdigest()[:16]
+    return f'"v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header value matches etag"""
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+class CachedResponse(NamedTuple):
+    """
+    The payload of a Response returned by an endpoint
+    
+    Cached instead of the Response itself: a Response carries per-request
+    state (FastAPI sets .background on it), so one instance must not be
+    handed to several requests, and pickling it for Redis ties entries to
+    Starlette internals. Each hit builds a new Response from this.
+    """
+    body: bytes
+    status_code: int
+    media_type: str
+    headers: tuple  # (name, value) pairs other than Content-Length / Content-Type
+
+
+def _to_cache(value):
+    """What to store for an endpoint's return value"""
+    if not isinstance(value, Response):
+        return value
+    headers = tuple(
+        (name.decode("latin-1"), header.decode("latin-1"))
+        for name, header in value.raw_headers
+        if name not in (b"content-length", b"content-type")
+    )
+    return CachedResponse(bytes(value.body), value.status_code, value.media_type, headers)
+
+
+def _from_cache(value):
+    """Rebuild the endpoint's return value from a stored entry"""
+    if not isinstance(value, CachedResponse):
+        return value
+    return Response(
+        content=value.body,
+        status_code=value.status_code,
+        headers=dict(value.headers),
+        media_type=value.media_type,
+    )
+
+
+def cached(ttl: int = None, daily: bool = False):
+    """
+    Cache an async endpoint's return value per data version and arguments
+    
+    Endpoints must be called with keyword arguments only (as FastAPI does).
+    Exceptions (404s etc.) are never cached. Response return values are
+    stored as their encoded payload (CachedResponse).
+    
+    Args:
+        ttl: Seconds to keep an entry (default: CACHE_TTL)
+        daily: Also key on today's date, for endpoints whose output depends
+            on it ("active" cutoffs, ages, CURRENT_DATE windows)
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            version = await get_data_version()
+            if version is None:
+                _stats["bypassed"] += 1
+                return await func(**kwargs)
+            
+            key = cache_key(name, f"{version}@{date.today()}" if daily else version, kwargs)
+            value = await _backend.get(key)
+            if value is not None:
+                _stats["hits"] += 1
+                return _from_cache(value)
+            
+            _stats["misses"] += 1
+            value = await func(**kwargs)
+            await _backend.set(key, _to_cache(value), ttl or settings.CACHE_TTL)
+            return value
+        
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters and backend info"""
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        "backend": type(_backend).__name__,
+        "entries": _backend.size(),
+        "data_version": _version[0],
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None,
+    }
@@ -0,0 +1,108 @@
+"""
+Trajectory downsampling (Largest-Triangle-Three-Buckets)
+
+A career can have 1500+ rating points, more than a chart can draw. LTTB
+keeps the first and last point and, from each of max_points - 2 equal
+buckets in between, the point forming the largest triangle with the point
+kept from the previous bucket and the mean of the next bucket. Peaks,
+troughs and the end of the career survive; a plain LIMIT would cut the
+career off instead.
+
+Reference: Steinarsson, "Downsampling Time Series for Visual
+Representation" (2013).
+"""
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps (sorted, always including both ends)
+    
+    Args:
+        x: Strictly increasing x values (e.g. career match numbers)
+        y: Values to preserve the shape of
+        max_points: Number of points to keep (< 3 keeps the ends only)
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1])[:max(max_points, 1)]
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    
+    kept = np.empty(max_points, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    for b in range(max_points - 2):
+        start, end = edges[b], edges[b + 1]
+        
+        # Mean of the next bucket (the last point for the final bucket)
+        if b + 2 < len(edges):
+            next_start, next_end = edges[b + 1], edges[b + 2]
+            cx = x[next_start:next_end].mean()
+            cy = y[next_start:next_end].mean()
+        else:
+            cx, cy = x[n - 1], y[n - 1]
+        
+        # Twice the triangle area (a, i, c) for every i in the bucket
+        area = np.abs((x[a] - cx) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        kept[b + 1] = a
+    
+    return kept
+
+
+def downsample_rows(rows: list, x_index: int, y_indices: list, max_points: int) -> list:
+    """
+    Downsample tuple rows, preserving the shape of each y column
+    
+    LTTB runs on each y column's (one per rating system) non-NULL points
+    with the same per-column budget, and the union of the kept rows is
+    returned in order. The budget is the largest whose union still fits in
+    max_points - systems mostly peak together, so their picks overlap.
+    
+    Args:
+        rows: Tuple rows ordered by the x column
+        x_index: Position of the x column (career match number)
+        y_indices: Positions of the rating columns to preserve
+        max_points: Upper bound on the rows returned
+    """
+    if len(rows) <= max_points or not y_indices:
+        return rows
+    
+    x = np.array([row[x_index] for row in rows], dtype=np.float64)
+    series = []
+    for y_index in y_indices:
+        y = np.array([row[y_index] for row in rows], dtype=np.float64)  # NULL -> nan
+        present = np.flatnonzero(~np.isnan(y))
+        if len(present):
+            series.append((present, x[present], y[present]))
+    if not series:
+        return rows[:max_points]
+    
+    def kept_rows(budget):
+        keep = np.zeros(len(rows), dtype=bool)
+        for present, xs, ys in series:
+            keep[present[lttb_indices(xs, ys, budget)]] = True
+        return np.flatnonzero(keep)
+    
+    # Binary search the per-column budget; budget max_points // columns
+    # always fits
+    low, high = max(max_points // len(series), 3), max_points
+    best = kept_rows(low)
+    while low < high:
+        mid = (low + high + 1) // 2
+        kept = kept_rows(mid)
+        if len(kept) <= max_points:
+            low, best = mid, kept
+        else:
+            high = mid - 1
+    
+    return [rows[i] for i in best]
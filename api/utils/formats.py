@@ -0,0 +1,84 @@
+"""
+Response formats for row-heavy endpoints (trajectories, rankings)
+
+    json      - the default: a list of {column: value} objects per table
+    columnar  - JSON with one array per column ({column: [values]}), so
+                keys are not repeated for every point
+    msgpack   - the columnar shape encoded as MessagePack (needs the msgpack
+                package); dates are ISO strings as in JSON
+
+Chosen with ?format= or, failing that, the Accept header
+(application/msgpack, application/vnd.tct.columnar+json).
+
+Usage:
+    fmt = negotiate(format, accept)
+    columns, rows = await AsyncDatabase.execute_rows(query, params)
+    return respond({"rankings": table(columns, rows, fmt)}, fmt)
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from utils.fast_json import FastJSONResponse, encode_default, records
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+FORMAT_PATTERN = "^(json|columnar|msgpack)$"
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.tct.columnar+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class MsgPackResponse(Response):
+    """MessagePack-encoded response"""
+    
+    media_type = MSGPACK_MEDIA_TYPES[0]
+    
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, default=encode_default, use_bin_type=True)
+
+
+def negotiate(format: Optional[str], accept: Optional[str]) -> str:
+    """
+    Response format from an explicit ?format= or the Accept header
+    
+    Raises:
+        HTTPException 406 if MessagePack is asked for but not installed
+    """
+    if format is None:
+        accept = (accept or "").lower()
+        if any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+            format = "msgpack"
+        elif COLUMNAR_MEDIA_TYPE in accept:
+            format = "columnar"
+        else:
+            format = "json"
+    
+    if format == "msgpack" and msgpack is None:
+        raise HTTPException(status_code=406, detail="MessagePack responses need the msgpack package")
+    return format
+
+
+def columnar(columns, rows) -> dict:
+    """Tuple rows as {column: [values]}"""
+    if not rows:
+        return {column: [] for column in columns}
+    return {column: list(values) for column, values in zip(columns, zip(*rows))}
+
+
+def table(columns, rows, fmt: str):
+    """Tuple rows in the shape of format fmt"""
+    return records(columns, rows) if fmt == "json" else columnar(columns, rows)
+
+
+def respond(content, fmt: str) -> Response:
+    """Encode content for format fmt"""
+    if fmt == "msgpack":
+        return MsgPackResponse(content)
+    if fmt == "columnar":
+        return FastJSONResponse(content, media_type=COLUMNAR_MEDIA_TYPE)
+    return FastJSONResponse(content)
@@ -13,6 +13,8 @@ BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
 PROCESSED_DATA_DIR = DATA_DIR / "processed"
+CHECKPOINT_DIR = PROCESSED_DATA_DIR / "checkpoints"
+TRAJECTORY_STORE_DIR = PROCESSED_DATA_DIR / "trajectory_store"  # Read by the API (mmap)
 
 # Create directories if they don't exist
 RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -6,6 +6,7 @@ from psycopg2.extras import RealDictCursor
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
+import io
 import logging
 from pathlib import Path
 
@@ -14,6 +15,46 @@ from config import DB_CONFIG, DATABASE_URL, BASE_DIR
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows buffered in memory per COPY into a staging table
+COPY_CHUNK_SIZE = 100000
+
+# Rows fetched per round trip by named (server-side) cursors
+STREAM_ITERSIZE = 20000
+
+# player_latest_ratings column -> player_ratings column it is copied from
+LATEST_RATING_COLUMNS = {
+    'match_id': 'match_id',
+    'career_match_number': 'career_match_number',
+    'last_match': 'date',
+    'elo_rating': 'elo_rating',
+    'elo_clay': 'elo_clay',
+    'elo_grass': 'elo_grass',
+    'elo_hard': 'elo_hard',
+    'tsr_rating': 'tsr_rating',
+    'tsr_uncertainty': 'tsr_uncertainty',
+    'glicko2_rating': 'glicko2_rating',
+    'glicko2_rd': 'glicko2_rd',
+    'glicko2_clay': 'glicko2_clay',
+    'glicko2_grass': 'glicko2_grass',
+    'glicko2_hard': 'glicko2_hard',
+    'form_index': 'form_index',
+    'big_match_rating': 'big_match_rating',
+    'tournament_success_score': 'tournament_success_score',
+}
+
+
+def _copy_value(value):
+    """Format one value for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return (value.replace('\\', '\\\\')
+                     .replace('\t', '\\t')
+                     .replace('\n', '\\n')
+                     .replace('\r', '\\r'))
+    # str() rather than repr() so NumPy scalars format as plain numbers
+    return str(value)
+
 
 class DatabaseManager:
     """Manages database connections and operations"""
@@ -28,11 +69,18 @@ class DatabaseManager:
         return psycopg2.connect(**self.config)
     
     @contextmanager
-    def get_cursor(self, dict_cursor=True):
-        """Context manager for database cursor"""
+    def get_cursor(self, dict_cursor=True, name=None):
+        """
+        Context manager for database cursor.
+        
+        Pass a name to get a server-side cursor: iterating it streams the
+        result STREAM_ITERSIZE rows at a time instead of loading it all.
+        """
         conn = self.get_connection()
         cursor_factory = RealDictCursor if dict_cursor else None
-        cursor = conn.cursor(cursor_factory=cursor_factory)
+        cursor = conn.cursor(name=name, cursor_factory=cursor_factory)
+        if name is not None:
+            cursor.itersize = STREAM_ITERSIZE
         try:
             yield cursor
             conn.commit()
@@ -103,6 +151,24 @@ class DatabaseManager:
             cursor.execute(schema_sql)
             logger.info("Database schema created successfully")
     
+    def apply_migrations(self, migrations_dir='database/migrations'):
+        """
+        Run every migration file in name order.
+        
+        Migrations are idempotent (ADD COLUMN IF NOT EXISTS, ...), so they
+        are simply re-run on every call; schema.sql already includes them
+        for fresh databases.
+        """
+        migrations_path = BASE_DIR / migrations_dir
+        
+        for migration_file in sorted(migrations_path.glob('*.sql')):
+            with open(migration_file, 'r') as f:
+                migration_sql = f.read()
+            
+            with self.get_cursor(dict_cursor=False) as cursor:
+                cursor.execute(migration_sql)
+            logger.info(f"Applied migration {migration_file.name}")
+    
     def reset_database(self):
         """Drop and recreate all tables"""
         logger.warning("Resetting database - all data will be lost!")
@@ -181,6 +247,252 @@ class DatabaseManager:
             logger.info(f"Inserted {inserted_count} matches")
             return inserted_count
     
+    def bulk_update(self, table, key_columns, value_columns, rows, chunk_size=COPY_CHUNK_SIZE):
+        """
+        Set value_columns on existing rows, matched on key_columns.
+        
+        Rows are streamed with COPY into a temporary staging table and
+        applied with a single UPDATE ... FROM, so millions of rows cost one
+        statement instead of one round trip each.
+        
+        Args:
+            table: Target table
+            key_columns: Columns identifying a row (e.g. ('rating_id',))
+            value_columns: Columns to overwrite
+            rows: Iterable of tuples ordered as key_columns + value_columns
+            chunk_size: Rows buffered in memory per COPY
+        
+        Returns:
+            Number of rows updated
+        """
+        set_clause = ', '.join(f"{c} = s.{c}" for c in value_columns)
+        match_clause = ' AND '.join(f"t.{c} = s.{c}" for c in key_columns)
+        
+        with self.get_cursor(dict_cursor=False) as cursor:
+            staged = self._copy_to_staging(cursor, table, list(key_columns) + list(value_columns),
+                                           rows, chunk_size)
+            if not staged:
+                return 0
+            cursor.execute(f"""
+                UPDATE {table} t
+                SET {set_clause}
+                FROM _bulk_staging s
+                WHERE {match_clause}
+            """)
+            updated = cursor.rowcount
+        
+        logger.debug(f"Bulk updated {updated:,} {table} rows")
+        return updated
+    
+    def bulk_upsert(self, table, key_columns, value_columns, rows, chunk_size=COPY_CHUNK_SIZE):
+        """
+        Insert rows, or overwrite value_columns where key_columns conflict.
+        
+        Same staging approach as bulk_update, applied with a single
+        INSERT ... SELECT ... ON CONFLICT. key_columns must be covered by a
+        unique constraint on the target table.
+        
+        Returns:
+            Number of rows inserted or updated
+        """
+        columns = list(key_columns) + list(value_columns)
+        column_list = ', '.join(columns)
+        update_clause = ', '.join(f"{c} = EXCLUDED.{c}" for c in value_columns)
+        
+        with self.get_cursor(dict_cursor=False) as cursor:
+            staged = self._copy_to_staging(cursor, table, columns, rows, chunk_size)
+            if not staged:
+                return 0
+            cursor.execute(f"""
+                INSERT INTO {table} ({column_list})
+                SELECT {column_list} FROM _bulk_staging
+                ON CONFLICT ({', '.join(key_columns)})
+                DO UPDATE SET {update_clause}
+            """)
+            written = cursor.rowcount
+        
+        logger.debug(f"Bulk upserted {written:,} {table} rows")
+        return written
+    
+    def bulk_replace(self, table, columns, rows, chunk_size=COPY_CHUNK_SIZE):
+        """
+        Replace the whole contents of table with rows, atomically.
+        
+        Rows are staged with COPY as in bulk_update; the DELETE and INSERT
+        run in the same transaction, so readers see either the old rows or
+        the new ones, never an empty table.
+        
+        Returns:
+            Number of rows inserted
+        """
+        column_list = ', '.join(columns)
+        
+        with self.get_cursor(dict_cursor=False) as cursor:
+            self._copy_to_staging(cursor, table, list(columns), rows, chunk_size)
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(f"""
+                INSERT INTO {table} ({column_list})
+                SELECT {column_list} FROM _bulk_staging
+            """)
+            written = cursor.rowcount
+        
+        logger.debug(f"Bulk replaced {table} with {written:,} rows")
+        return written
+    
+    def delete_redated_ratings(self, since=None):
+        """
+        Delete rating rows whose date no longer matches their match's date.
+        
+        player_ratings is keyed on (player_id, match_id, date) because it is
+        partitioned by date, so re-rating a match whose date was corrected
+        writes a new row instead of overwriting the old one. Call this after
+        writing a run's ratings to drop the stale copies.
+        
+        Args:
+            since: Only check matches on or after this date (None = all)
+        
+        Returns:
+            Number of rows deleted
+        """
+        date_filter, params = "", ()
+        if since is not None:
+            # since <= the old and the new date of every re-dated match, so
+            # both tables can be pruned to the partitions from since on
+            date_filter = "AND m.date >= %s AND pr.date >= %s"
+            params = (str(since), str(since))
+        with self.get_cursor(dict_cursor=False) as cursor:
+            cursor.execute(f"""
+                DELETE FROM player_ratings pr
+                USING matches m
+                WHERE pr.match_id = m.match_id
+                  AND pr.date <> m.date
+                  {date_filter}
+            """, params)
+            deleted = cursor.rowcount
+        
+        if deleted:
+            logger.info(f"Deleted {deleted:,} rating rows left behind by re-dated matches")
+        return deleted
+    
+    def _copy_to_staging(self, cursor, table, columns, rows, chunk_size):
+        """
+        Create _bulk_staging shaped like table's columns and COPY rows into it.
+        
+        The staging table is temporary (never WAL-logged) and dropped when
+        the transaction commits.
+        
+        Returns:
+            Number of rows staged
+        """
+        column_list = ', '.join(columns)
+        cursor.execute(f"""
+            CREATE TEMP TABLE _bulk_staging ON COMMIT DROP AS
+            SELECT {column_list} FROM {table} WITH NO DATA
+        """)
+        
+        copy_sql = f"COPY _bulk_staging ({column_list}) FROM STDIN"
+        staged = 0
+        buffer = io.StringIO()
+        buffered = 0
+        
+        for row in rows:
+            buffer.write('\t'.join(_copy_value(v) for v in row))
+            buffer.write('\n')
+            buffered += 1
+            
+            if buffered >= chunk_size:
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+                staged += buffered
+                buffer = io.StringIO()
+                buffered = 0
+        
+        if buffered:
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+            staged += buffered
+        
+        if staged:
+            cursor.execute("ANALYZE _bulk_staging")
+        return staged
+    
+    def refresh_latest_ratings(self, player_ids=None):
+        """
+        Bring player_latest_ratings up to date with player_ratings.
+        
+        Each player's row is copied from their latest rating row (highest
+        career_match_number). Only the given players are recomputed - pass
+        the players a run wrote ratings for - or every player if omitted.
+        Rows are upserted in place and unchanged rows are skipped, so
+        readers are never blocked and never see a half-refreshed table.
+        
+        Args:
+            player_ids: Iterable of player ids, or None for all players
+        
+        Returns:
+            Number of rows inserted, updated or deleted
+        """
+        targets = list(LATEST_RATING_COLUMNS)
+        sources = ', '.join(source if source == target else f"{source} as {target}"
+                            for target, source in LATEST_RATING_COLUMNS.items())
+        update_clause = ', '.join(f"{c} = EXCLUDED.{c}" for c in targets)
+        changed_clause = (f"({', '.join(f'player_latest_ratings.{c}' for c in targets)}) "
+                          f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in targets)})")
+        
+        if player_ids is None:
+            insert_filter, delete_filter, params = "", "", ()
+        else:
+            player_ids = [int(player_id) for player_id in player_ids]
+            if not player_ids:
+                return 0
+            insert_filter = "WHERE player_id = ANY(%s)"
+            delete_filter = "plr.player_id = ANY(%s) AND"
+            params = (player_ids,)
+        
+        with self.get_cursor(dict_cursor=False) as cursor:
+            cursor.execute(f"""
+                INSERT INTO player_latest_ratings (player_id, {', '.join(targets)})
+                SELECT DISTINCT ON (player_id) player_id, {sources}
+                FROM player_ratings
+                {insert_filter}
+                ORDER BY player_id, career_match_number DESC NULLS LAST
+                ON CONFLICT (player_id) DO UPDATE
+                SET {update_clause}, updated_at = CURRENT_TIMESTAMP
+                WHERE {changed_clause}
+            """, params)
+            refreshed = cursor.rowcount
+            
+            # Players left without any rating row
+            cursor.execute(f"""
+                DELETE FROM player_latest_ratings plr
+                WHERE {delete_filter} NOT EXISTS (
+                    SELECT 1 FROM player_ratings pr WHERE pr.player_id = plr.player_id
+                )
+            """, params)
+            refreshed += cursor.rowcount
+        
+        scope = "all players" if player_ids is None else f"{len(player_ids):,} players"
+        logger.info(f"Refreshed latest ratings for {scope} ({refreshed:,} rows changed)")
+        return refreshed
+    
+    def bump_data_version(self):
+        """
+        Mark the ratings data as changed (invalidates API caches).
+        
+        Returns:
+            The new version
+        """
+        with self.get_cursor() as cursor:
+            cursor.execute("""
+                UPDATE data_version
+                SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                RETURNING version
+            """)
+            version = cursor.fetchone()['version']
+        
+        logger.info(f"Data version is now {version}")
+        return version
+    
     def get_database_stats(self):
         """Get statistics about the database"""
         stats = {}
@@ -208,6 +520,7 @@ def init_database():
         db.execute_schema()
     else:
         logger.info("Database schema already exists")
+        db.apply_migrations()
     
     # Print stats
     stats = db.get_database_stats()
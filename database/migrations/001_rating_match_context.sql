@@ -0,0 +1,18 @@
+-- Match context columns on player_ratings (see schema.sql).
+-- Filled by scripts/calculate_elo.py / scripts/rating_pipeline.py; run a
+-- full ELO rebuild (--full) after applying to populate existing rows.
+
+ALTER TABLE player_ratings
+    ADD COLUMN IF NOT EXISTS opponent_id INT REFERENCES players(player_id),
+    ADD COLUMN IF NOT EXISTS elo_pre_match FLOAT,
+    ADD COLUMN IF NOT EXISTS elo_delta FLOAT,
+    ADD COLUMN IF NOT EXISTS opponent_elo_pre_match FLOAT;
+
+-- Glicko-2 columns were added to schema.sql without a migration
+ALTER TABLE player_ratings
+    ADD COLUMN IF NOT EXISTS glicko2_rating FLOAT,
+    ADD COLUMN IF NOT EXISTS glicko2_rd FLOAT,
+    ADD COLUMN IF NOT EXISTS glicko2_volatility FLOAT,
+    ADD COLUMN IF NOT EXISTS glicko2_clay FLOAT,
+    ADD COLUMN IF NOT EXISTS glicko2_grass FLOAT,
+    ADD COLUMN IF NOT EXISTS glicko2_hard FLOAT;
@@ -0,0 +1,9 @@
+-- Data version counter (see schema.sql)
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- Only one row
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_version (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
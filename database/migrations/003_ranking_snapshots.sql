@@ -0,0 +1,13 @@
+-- Weekly ranking snapshots (see schema.sql).
+-- Filled by scripts/ranking_snapshots.py (and every rating pipeline run).
+
+CREATE TABLE IF NOT EXISTS ranking_snapshots (
+    rating_system VARCHAR(10) NOT NULL,  -- elo, tsr, glicko2
+    snapshot_date DATE NOT NULL,
+    rank SMALLINT NOT NULL,
+    player_id INT NOT NULL REFERENCES players(player_id),
+    rating FLOAT NOT NULL,
+    last_match DATE,  -- Date of the rating
+    career_match_number INT,
+    PRIMARY KEY (rating_system, snapshot_date, rank)
+);
@@ -0,0 +1,21 @@
+-- Rank intervals and weeks at the top (see schema.sql).
+-- Filled by scripts/ranking_snapshots.py (and every rating pipeline run).
+
+CREATE TABLE IF NOT EXISTS rank_intervals (
+    rating_system VARCHAR(10) NOT NULL,
+    player_id INT NOT NULL REFERENCES players(player_id),
+    start_date DATE NOT NULL,
+    end_date DATE,
+    rank SMALLINT NOT NULL,
+    PRIMARY KEY (rating_system, player_id, start_date)
+);
+
+-- Weeks at #1 and in the top 10 per player, from rank_intervals
+CREATE TABLE IF NOT EXISTS weeks_at_top (
+    rating_system VARCHAR(10) NOT NULL,
+    player_id INT NOT NULL REFERENCES players(player_id),
+    weeks_at_no1 INT NOT NULL DEFAULT 0,
+    weeks_in_top10 INT NOT NULL DEFAULT 0,
+    best_rank SMALLINT,
+    PRIMARY KEY (rating_system, player_id)
+);
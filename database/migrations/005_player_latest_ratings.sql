@@ -0,0 +1,53 @@
+-- player_latest_ratings as a managed table (see schema.sql), replacing
+-- the materialized view of the same name. Populated here once; kept up to
+-- date by DatabaseManager.refresh_latest_ratings.
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = 'player_latest_ratings') THEN
+        DROP MATERIALIZED VIEW player_latest_ratings;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS player_latest_ratings (
+    player_id INT PRIMARY KEY REFERENCES players(player_id),
+    match_id INT,
+    career_match_number INT,
+    last_match DATE,
+    elo_rating FLOAT,
+    elo_clay FLOAT,
+    elo_grass FLOAT,
+    elo_hard FLOAT,
+    tsr_rating FLOAT,
+    tsr_uncertainty FLOAT,
+    glicko2_rating FLOAT,
+    glicko2_rd FLOAT,
+    glicko2_clay FLOAT,
+    glicko2_grass FLOAT,
+    glicko2_hard FLOAT,
+    form_index FLOAT,
+    big_match_rating FLOAT,
+    tournament_success_score FLOAT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_latest_elo ON player_latest_ratings(elo_rating DESC);
+CREATE INDEX IF NOT EXISTS idx_latest_last_match ON player_latest_ratings(last_match);
+
+-- Initial fill (later runs refresh incrementally)
+INSERT INTO player_latest_ratings (
+    player_id, match_id, career_match_number, last_match,
+    elo_rating, elo_clay, elo_grass, elo_hard,
+    tsr_rating, tsr_uncertainty,
+    glicko2_rating, glicko2_rd, glicko2_clay, glicko2_grass, glicko2_hard,
+    form_index, big_match_rating, tournament_success_score
+)
+SELECT DISTINCT ON (player_id)
+    player_id, match_id, career_match_number, date,
+    elo_rating, elo_clay, elo_grass, elo_hard,
+    tsr_rating, tsr_uncertainty,
+    glicko2_rating, glicko2_rd, glicko2_clay, glicko2_grass, glicko2_hard,
+    form_index, big_match_rating, tournament_success_score
+FROM player_ratings
+WHERE NOT EXISTS (SELECT 1 FROM player_latest_ratings)
+ORDER BY player_id, career_match_number DESC NULLS LAST;
@@ -0,0 +1,77 @@
+-- Range-partition matches and player_ratings by year of date (see
+-- schema.sql). Rewrites both tables: the old heap tables are renamed, their
+-- rows copied into new partitioned tables, then dropped. Run it once in a
+-- maintenance window; afterwards the guard below makes it a no-op.
+--
+-- Keys change with the partition key: matches (match_id, date),
+-- player_ratings (rating_id, date) and UNIQUE (player_id, match_id, date).
+-- player_ratings.match_id loses its foreign key to matches.
+
+DO $$
+DECLARE
+    y INT;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'matches'::regclass
+    ) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE player_ratings RENAME TO player_ratings_unpartitioned;
+    ALTER TABLE matches RENAME TO matches_unpartitioned;
+
+    CREATE TABLE matches (LIKE matches_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (date);
+    CREATE TABLE player_ratings (LIKE player_ratings_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (date);
+
+    FOR y IN 1968..2035 LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF matches FOR VALUES FROM (%L) TO (%L)',
+                       'matches_' || y, make_date(y, 1, 1), make_date(y + 1, 1, 1));
+        EXECUTE format('CREATE TABLE %I PARTITION OF player_ratings FOR VALUES FROM (%L) TO (%L)',
+                       'player_ratings_' || y, make_date(y, 1, 1), make_date(y + 1, 1, 1));
+    END LOOP;
+    CREATE TABLE matches_default PARTITION OF matches DEFAULT;
+    CREATE TABLE player_ratings_default PARTITION OF player_ratings DEFAULT;
+
+    INSERT INTO matches SELECT * FROM matches_unpartitioned;
+    INSERT INTO player_ratings SELECT * FROM player_ratings_unpartitioned;
+
+    -- The SERIAL sequences belong to the old tables; keep them alive
+    ALTER SEQUENCE matches_match_id_seq OWNED BY NONE;
+    ALTER SEQUENCE player_ratings_rating_id_seq OWNED BY NONE;
+    DROP TABLE player_ratings_unpartitioned;
+    DROP TABLE matches_unpartitioned;
+    ALTER SEQUENCE matches_match_id_seq OWNED BY matches.match_id;
+    ALTER SEQUENCE player_ratings_rating_id_seq OWNED BY player_ratings.rating_id;
+
+    ALTER TABLE matches ADD PRIMARY KEY (match_id, date);
+    ALTER TABLE matches ADD FOREIGN KEY (tournament_tier) REFERENCES tournament_tiers(tier_name);
+    ALTER TABLE matches ADD FOREIGN KEY (player1_id) REFERENCES players(player_id);
+    ALTER TABLE matches ADD FOREIGN KEY (player2_id) REFERENCES players(player_id);
+    ALTER TABLE matches ADD FOREIGN KEY (winner_id) REFERENCES players(player_id);
+
+    ALTER TABLE player_ratings ADD PRIMARY KEY (rating_id, date);
+    ALTER TABLE player_ratings ADD UNIQUE (player_id, match_id, date);
+    ALTER TABLE player_ratings ADD FOREIGN KEY (player_id) REFERENCES players(player_id);
+    ALTER TABLE player_ratings ADD FOREIGN KEY (opponent_id) REFERENCES players(player_id);
+
+    CREATE INDEX idx_matches_date ON matches(date);
+    CREATE INDEX idx_matches_player1 ON matches(player1_id);
+    CREATE INDEX idx_matches_player2 ON matches(player2_id);
+    CREATE INDEX idx_matches_winner ON matches(winner_id);
+    CREATE INDEX idx_matches_surface ON matches(surface);
+    CREATE INDEX idx_matches_tournament ON matches(tournament_name);
+    CREATE INDEX idx_matches_tier ON matches(tournament_tier);
+    CREATE INDEX idx_matches_date_surface ON matches(date, surface);
+    CREATE INDEX idx_matches_player1_date ON matches(player1_id, date);
+    CREATE INDEX idx_matches_player2_date ON matches(player2_id, date);
+
+    CREATE INDEX idx_ratings_player_date ON player_ratings(player_id, date);
+    CREATE INDEX idx_ratings_player_match_num ON player_ratings(player_id, career_match_number);
+    CREATE INDEX idx_ratings_date ON player_ratings(date);
+
+    ANALYZE matches;
+    ANALYZE player_ratings;
+END $$;
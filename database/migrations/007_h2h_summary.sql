@@ -0,0 +1,91 @@
+-- Canonical player-pair key on matches and the h2h_summary table (see
+-- schema.sql). Adding the generated columns rewrites matches once; the
+-- summary is filled here when empty and kept current by a trigger.
+
+ALTER TABLE matches
+    ADD COLUMN IF NOT EXISTS player_low_id INT GENERATED ALWAYS AS (LEAST(player1_id, player2_id)) STORED,
+    ADD COLUMN IF NOT EXISTS player_high_id INT GENERATED ALWAYS AS (GREATEST(player1_id, player2_id)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_matches_pair ON matches(player_low_id, player_high_id, date);
+
+CREATE TABLE IF NOT EXISTS h2h_summary (
+    player_low_id INT REFERENCES players(player_id),
+    player_high_id INT REFERENCES players(player_id),
+    surface VARCHAR(20),  -- 'unknown' where the match has none
+    tournament_tier VARCHAR(50),  -- 'Other' where the match has none
+    matches INT NOT NULL,
+    low_wins INT NOT NULL,  -- Wins of player_low_id
+    high_wins INT NOT NULL,  -- Wins of player_high_id
+    
+    PRIMARY KEY (player_low_id, player_high_id, surface, tournament_tier)
+);
+
+-- Add delta (1 or -1) matches to a pair's totals
+CREATE OR REPLACE FUNCTION h2h_summary_add(p1 INT, p2 INT, winner INT, surf VARCHAR, tier VARCHAR, delta INT)
+RETURNS VOID AS $$
+BEGIN
+    IF p1 IS NULL OR p2 IS NULL THEN
+        RETURN;
+    END IF;
+    
+    INSERT INTO h2h_summary AS s (player_low_id, player_high_id, surface, tournament_tier,
+                                  matches, low_wins, high_wins)
+    VALUES (LEAST(p1, p2), GREATEST(p1, p2), COALESCE(surf, 'unknown'), COALESCE(tier, 'Other'),
+            delta,
+            CASE WHEN winner = LEAST(p1, p2) THEN delta ELSE 0 END,
+            CASE WHEN winner = GREATEST(p1, p2) THEN delta ELSE 0 END)
+    ON CONFLICT (player_low_id, player_high_id, surface, tournament_tier) DO UPDATE
+    SET matches = s.matches + EXCLUDED.matches,
+        low_wins = s.low_wins + EXCLUDED.low_wins,
+        high_wins = s.high_wins + EXCLUDED.high_wins;
+    
+    IF delta < 0 THEN
+        DELETE FROM h2h_summary
+        WHERE player_low_id = LEAST(p1, p2) AND player_high_id = GREATEST(p1, p2)
+          AND surface = COALESCE(surf, 'unknown') AND tournament_tier = COALESCE(tier, 'Other')
+          AND matches <= 0;
+    END IF;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION maintain_h2h_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND (OLD.player1_id, OLD.player2_id, OLD.winner_id, OLD.surface, OLD.tournament_tier)
+           IS NOT DISTINCT FROM
+           (NEW.player1_id, NEW.player2_id, NEW.winner_id, NEW.surface, NEW.tournament_tier) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM h2h_summary_add(OLD.player1_id, OLD.player2_id, OLD.winner_id,
+                                OLD.surface, OLD.tournament_tier, -1);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM h2h_summary_add(NEW.player1_id, NEW.player2_id, NEW.winner_id,
+                                NEW.surface, NEW.tournament_tier, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS maintain_h2h_summary ON matches;
+CREATE TRIGGER maintain_h2h_summary AFTER INSERT OR UPDATE OR DELETE ON matches
+    FOR EACH ROW EXECUTE FUNCTION maintain_h2h_summary();
+
+-- Totals for the matches already loaded
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM h2h_summary) THEN
+        INSERT INTO h2h_summary (player_low_id, player_high_id, surface, tournament_tier,
+                                 matches, low_wins, high_wins)
+        SELECT player_low_id, player_high_id,
+               COALESCE(surface, 'unknown'), COALESCE(tournament_tier, 'Other'),
+               COUNT(*),
+               COUNT(*) FILTER (WHERE winner_id = player_low_id),
+               COUNT(*) FILTER (WHERE winner_id = player_high_id)
+        FROM matches
+        WHERE player1_id IS NOT NULL AND player2_id IS NOT NULL
+        GROUP BY 1, 2, 3, 4;
+    END IF;
+END $$;
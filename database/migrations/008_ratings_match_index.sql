@@ -0,0 +1,6 @@
+-- Index player_ratings by (match_id, date) (see schema.sql), so the
+-- "match has no rating row yet" probe in
+-- rating_checkpoints.earliest_pending_date is an index lookup per match
+-- instead of an anti-join against the whole table.
+
+CREATE INDEX IF NOT EXISTS idx_ratings_match ON player_ratings(match_id, date);
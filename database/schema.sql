@@ -3,9 +3,15 @@
 
 -- Drop existing tables (for clean setup)
 DROP TABLE IF EXISTS player_ratings CASCADE;
+DROP TABLE IF EXISTS player_latest_ratings CASCADE;
 DROP TABLE IF EXISTS matches CASCADE;
 DROP TABLE IF EXISTS players CASCADE;
 DROP TABLE IF EXISTS tournament_tiers CASCADE;
+DROP TABLE IF EXISTS data_version CASCADE;
+DROP TABLE IF EXISTS ranking_snapshots CASCADE;
+DROP TABLE IF EXISTS rank_intervals CASCADE;
+DROP TABLE IF EXISTS weeks_at_top CASCADE;
+DROP TABLE IF EXISTS h2h_summary CASCADE;
 
 -- Players table
 CREATE TABLE players (
@@ -41,9 +47,12 @@ INSERT INTO tournament_tiers (tier_name, weight, importance_score, description)
     ('Challenger', 0.8, 30, 'Challenger tour events'),
     ('ITF', 0.6, 20, 'ITF tournaments');
 
--- Matches table (core data)
+-- Matches table (core data), range-partitioned by year of date (see
+-- "Yearly partitions" below). The partition key must be part of every
+-- unique key, so the primary key is (match_id, date); match_id alone is
+-- still unique in practice (one sequence).
 CREATE TABLE matches (
-    match_id SERIAL PRIMARY KEY,
+    match_id SERIAL,
     
     -- Match identification
     tourney_id VARCHAR(50),  -- From Tennis Abstract
@@ -62,6 +71,11 @@ CREATE TABLE matches (
     player2_id INT REFERENCES players(player_id),
     winner_id INT REFERENCES players(player_id),
     
+    -- Canonical pair key: the same for both orderings of the two players,
+    -- so a rivalry is one index lookup instead of an OR of two
+    player_low_id INT GENERATED ALWAYS AS (LEAST(player1_id, player2_id)) STORED,
+    player_high_id INT GENERATED ALWAYS AS (GREATEST(player1_id, player2_id)) STORED,
+    
     -- Rankings at time of match
     player1_rank INT,
     player2_rank INT,
@@ -91,8 +105,9 @@ CREATE TABLE matches (
     -- Constraints
     CONSTRAINT different_players CHECK (player1_id != player2_id),
     CONSTRAINT valid_winner CHECK (winner_id IN (player1_id, player2_id)),
-    CONSTRAINT valid_surface CHECK (surface IN ('clay', 'grass', 'hard', 'carpet', 'none'))
-);
+    CONSTRAINT valid_surface CHECK (surface IN ('clay', 'grass', 'hard', 'carpet', 'none')),
+    PRIMARY KEY (match_id, date)
+) PARTITION BY RANGE (date);
 
 -- Create indexes for matches table
 CREATE INDEX idx_matches_date ON matches(date);
@@ -105,12 +120,16 @@ CREATE INDEX idx_matches_tier ON matches(tournament_tier);
 CREATE INDEX idx_matches_date_surface ON matches(date, surface);
 CREATE INDEX idx_matches_player1_date ON matches(player1_id, date);
 CREATE INDEX idx_matches_player2_date ON matches(player2_id, date);
+CREATE INDEX idx_matches_pair ON matches(player_low_id, player_high_id, date);
 
--- Player ratings table (output of Bayesian model)
+-- Player ratings table (output of Bayesian model), partitioned like
+-- matches. date is the match's date, so (player_id, match_id, date) is as
+-- unique as (player_id, match_id) was. match_id has no foreign key: a
+-- reference to partitioned matches would have to include the date.
 CREATE TABLE player_ratings (
-    rating_id SERIAL PRIMARY KEY,
+    rating_id SERIAL,
     player_id INT REFERENCES players(player_id),
-    match_id INT REFERENCES matches(match_id),
+    match_id INT,
     
     -- Timeline
     date DATE NOT NULL,
@@ -141,18 +160,81 @@ CREATE TABLE player_ratings (
     elo_grass FLOAT,
     elo_hard FLOAT,
     
+    -- Match context (overall ELO), so readers need no self-join for the opponent
+    opponent_id INT REFERENCES players(player_id),
+    elo_pre_match FLOAT,  -- elo_rating before this match
+    elo_delta FLOAT,  -- elo_rating - elo_pre_match
+    opponent_elo_pre_match FLOAT,  -- Opponent's elo_rating before this match
+    
+    -- Glicko-2 ratings (separate system, see scripts/calculate_glicko2.py)
+    glicko2_rating FLOAT,
+    glicko2_rd FLOAT,
+    glicko2_volatility FLOAT,
+    glicko2_clay FLOAT,
+    glicko2_grass FLOAT,
+    glicko2_hard FLOAT,
+    
     -- Metadata
     calculated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     model_version VARCHAR(20),  -- Track model iterations
     
-    -- Unique constraint
-    UNIQUE (player_id, match_id)
-);
+    -- Unique constraints
+    PRIMARY KEY (rating_id, date),
+    UNIQUE (player_id, match_id, date)
+) PARTITION BY RANGE (date);
 
 -- Create indexes for player_ratings table
 CREATE INDEX idx_ratings_player_date ON player_ratings(player_id, date);
 CREATE INDEX idx_ratings_player_match_num ON player_ratings(player_id, career_match_number);
 CREATE INDEX idx_ratings_date ON player_ratings(date);
+CREATE INDEX idx_ratings_match ON player_ratings(match_id, date);
+
+-- Yearly partitions: matches_<year> and player_ratings_<year> for
+-- 1968-2035, plus default partitions for any other date. Queries that
+-- bound date (date >= ..., not EXTRACT(YEAR FROM date)) only touch the
+-- partitions in range. scripts/maintain_partitions.py adds later years
+-- and freezes closed ones.
+DO $$
+BEGIN
+    FOR y IN 1968..2035 LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF matches FOR VALUES FROM (%L) TO (%L)',
+                       'matches_' || y, make_date(y, 1, 1), make_date(y + 1, 1, 1));
+        EXECUTE format('CREATE TABLE %I PARTITION OF player_ratings FOR VALUES FROM (%L) TO (%L)',
+                       'player_ratings_' || y, make_date(y, 1, 1), make_date(y + 1, 1, 1));
+    END LOOP;
+END $$;
+
+CREATE TABLE matches_default PARTITION OF matches DEFAULT;
+CREATE TABLE player_ratings_default PARTITION OF player_ratings DEFAULT;
+
+-- Latest rating row per player (highest career_match_number), for the
+-- API's current-ratings lookups. A plain table rather than a materialized
+-- view: DatabaseManager.refresh_latest_ratings upserts only the players a
+-- run touched, without blocking readers.
+CREATE TABLE player_latest_ratings (
+    player_id INT PRIMARY KEY REFERENCES players(player_id),
+    match_id INT,
+    career_match_number INT,
+    last_match DATE,
+    elo_rating FLOAT,
+    elo_clay FLOAT,
+    elo_grass FLOAT,
+    elo_hard FLOAT,
+    tsr_rating FLOAT,
+    tsr_uncertainty FLOAT,
+    glicko2_rating FLOAT,
+    glicko2_rd FLOAT,
+    glicko2_clay FLOAT,
+    glicko2_grass FLOAT,
+    glicko2_hard FLOAT,
+    form_index FLOAT,
+    big_match_rating FLOAT,
+    tournament_success_score FLOAT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_latest_elo ON player_latest_ratings(elo_rating DESC);
+CREATE INDEX idx_latest_last_match ON player_latest_ratings(last_match);
 
 -- Player career summary table (for quick lookups)
 CREATE TABLE player_career_stats (
@@ -202,6 +284,52 @@ CREATE INDEX idx_career_peak_rating ON player_career_stats(peak_tsr_rating DESC)
 CREATE INDEX idx_career_win_pct ON player_career_stats(win_percentage DESC);
 CREATE INDEX idx_career_slam_titles ON player_career_stats(grand_slam_titles DESC);
 
+-- Weekly top-100 per rating system, as of the end of each week (Sunday)
+-- with rating changes. Rebuilt by scripts/ranking_snapshots.py; serves
+-- /api/rankings/historical with one primary-key read.
+CREATE TABLE ranking_snapshots (
+    rating_system VARCHAR(10) NOT NULL,  -- elo, tsr, glicko2
+    snapshot_date DATE NOT NULL,
+    rank SMALLINT NOT NULL,
+    player_id INT NOT NULL REFERENCES players(player_id),
+    rating FLOAT NOT NULL,
+    last_match DATE,  -- Date of the rating
+    career_match_number INT,
+    PRIMARY KEY (rating_system, snapshot_date, rank)
+);
+
+-- Runs of weeks a player spent at one rank in the weekly top 100:
+-- [start_date, end_date), dated by week-ending Sundays; end_date is NULL
+-- while the run is current. Rebuilt by scripts/ranking_snapshots.py.
+CREATE TABLE rank_intervals (
+    rating_system VARCHAR(10) NOT NULL,
+    player_id INT NOT NULL REFERENCES players(player_id),
+    start_date DATE NOT NULL,
+    end_date DATE,
+    rank SMALLINT NOT NULL,
+    PRIMARY KEY (rating_system, player_id, start_date)
+);
+
+-- Weeks at #1 and in the top 10 per player, from rank_intervals
+CREATE TABLE weeks_at_top (
+    rating_system VARCHAR(10) NOT NULL,
+    player_id INT NOT NULL REFERENCES players(player_id),
+    weeks_at_no1 INT NOT NULL DEFAULT 0,
+    weeks_in_top10 INT NOT NULL DEFAULT 0,
+    best_rank SMALLINT,
+    PRIMARY KEY (rating_system, player_id)
+);
+
+-- Data version (single row), bumped whenever ratings are rewritten.
+-- API caches key their entries on it, so a rebuild invalidates them.
+CREATE TABLE data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- Only one row
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_version (id) VALUES (TRUE);
+
 -- Create a view for easy player lookup with stats
 CREATE VIEW player_overview AS
 SELECT 
@@ -243,6 +371,73 @@ CREATE TRIGGER update_players_updated_at BEFORE UPDATE ON players
 CREATE TRIGGER update_career_stats_updated_at BEFORE UPDATE ON player_career_stats
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Head-to-head totals per player pair, surface and tier, so a rivalry
+-- summary is read instead of counted from its matches. Kept current by
+-- the trigger below on every insert, update or delete of a match.
+CREATE TABLE h2h_summary (
+    player_low_id INT REFERENCES players(player_id),
+    player_high_id INT REFERENCES players(player_id),
+    surface VARCHAR(20),  -- 'unknown' where the match has none
+    tournament_tier VARCHAR(50),  -- 'Other' where the match has none
+    matches INT NOT NULL,
+    low_wins INT NOT NULL,  -- Wins of player_low_id
+    high_wins INT NOT NULL,  -- Wins of player_high_id
+    
+    PRIMARY KEY (player_low_id, player_high_id, surface, tournament_tier)
+);
+
+-- Add delta (1 or -1) matches to a pair's totals
+CREATE OR REPLACE FUNCTION h2h_summary_add(p1 INT, p2 INT, winner INT, surf VARCHAR, tier VARCHAR, delta INT)
+RETURNS VOID AS $$
+BEGIN
+    IF p1 IS NULL OR p2 IS NULL THEN
+        RETURN;
+    END IF;
+    
+    INSERT INTO h2h_summary AS s (player_low_id, player_high_id, surface, tournament_tier,
+                                  matches, low_wins, high_wins)
+    VALUES (LEAST(p1, p2), GREATEST(p1, p2), COALESCE(surf, 'unknown'), COALESCE(tier, 'Other'),
+            delta,
+            CASE WHEN winner = LEAST(p1, p2) THEN delta ELSE 0 END,
+            CASE WHEN winner = GREATEST(p1, p2) THEN delta ELSE 0 END)
+    ON CONFLICT (player_low_id, player_high_id, surface, tournament_tier) DO UPDATE
+    SET matches = s.matches + EXCLUDED.matches,
+        low_wins = s.low_wins + EXCLUDED.low_wins,
+        high_wins = s.high_wins + EXCLUDED.high_wins;
+    
+    IF delta < 0 THEN
+        DELETE FROM h2h_summary
+        WHERE player_low_id = LEAST(p1, p2) AND player_high_id = GREATEST(p1, p2)
+          AND surface = COALESCE(surf, 'unknown') AND tournament_tier = COALESCE(tier, 'Other')
+          AND matches <= 0;
+    END IF;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION maintain_h2h_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND (OLD.player1_id, OLD.player2_id, OLD.winner_id, OLD.surface, OLD.tournament_tier)
+           IS NOT DISTINCT FROM
+           (NEW.player1_id, NEW.player2_id, NEW.winner_id, NEW.surface, NEW.tournament_tier) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM h2h_summary_add(OLD.player1_id, OLD.player2_id, OLD.winner_id,
+                                OLD.surface, OLD.tournament_tier, -1);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM h2h_summary_add(NEW.player1_id, NEW.player2_id, NEW.winner_id,
+                                NEW.surface, NEW.tournament_tier, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER maintain_h2h_summary AFTER INSERT OR UPDATE OR DELETE ON matches
+    FOR EACH ROW EXECUTE FUNCTION maintain_h2h_summary();
+
 -- Comments for documentation
 COMMENT ON TABLE players IS 'Master player information table';
 COMMENT ON TABLE matches IS 'All match results with scores and context';
@@ -250,4 +445,5 @@ COMMENT ON TABLE player_ratings IS 'Calculated performance ratings over time (ou
 COMMENT ON TABLE player_career_stats IS 'Aggregated career statistics for quick lookups';
 COMMENT ON COLUMN player_ratings.tsr_rating IS 'Tennis Skill Rating - primary composite metric';
 COMMENT ON COLUMN player_ratings.tsr_smoothed IS 'Gaussian Process smoothed TSR for career trajectory visualization';
+COMMENT ON COLUMN player_ratings.opponent_elo_pre_match IS 'Opponent ELO before the match; opponent ELO after = opponent_elo_pre_match - elo_delta (zero-sum)';
 
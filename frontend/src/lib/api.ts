@@ -95,6 +95,56 @@ export interface RankingsResponse {
   total: number;
 }
 
+// Columnar responses (?format=columnar): one array per field instead of one
+// object per row, so long trajectories don't repeat every key per point
+export type Columnar<T> = { [K in keyof T]: T[K][] };
+
+export function fromColumnar<T>(columns: Columnar<T>): T[] {
+  const keys = Object.keys(columns) as (keyof T)[];
+  const length = keys.length ? columns[keys[0]].length : 0;
+  const rows = new Array<T>(length);
+  for (let i = 0; i < length; i++) {
+    const row = {} as T;
+    for (const key of keys) {
+      row[key] = columns[key][i];
+    }
+    rows[i] = row;
+  }
+  return rows;
+}
+
+interface CompareTrajectoriesResponse<T> {
+  rating_system: string;
+  date_range: { start?: string; end?: string };
+  players: Array<{
+    name: string;
+    data_points: number;
+    trajectory: T;
+  }>;
+}
+
+// Charts can't show more points than this; the API thins longer careers
+// while keeping their shape (LTTB)
+const CHART_MAX_POINTS = 500;
+
+const getComparedTrajectories = (params: {
+  players: string;
+  start_date?: string;
+  end_date?: string;
+  rating_system: 'elo' | 'tsr' | 'glicko2';
+}) =>
+  axiosInstance
+    .get<CompareTrajectoriesResponse<Columnar<TrajectoryPoint>>>(`/api/players/compare/trajectory`, {
+      params: { ...params, max_points: CHART_MAX_POINTS, format: 'columnar' }
+    })
+    .then((res): CompareTrajectoriesResponse<TrajectoryPoint[]> => ({
+      ...res.data,
+      players: res.data.players.map(player => ({
+        ...player,
+        trajectory: fromColumnar<TrajectoryPoint>(player.trajectory),
+      })),
+    }));
+
 // API Functions
 export const apiClient = {
   // Players
@@ -116,14 +166,12 @@ export const apiClient = {
     endDate: string, 
     ratingSystem: 'elo' | 'tsr' | 'glicko2'
   ) =>
-    axiosInstance.get<TrajectoryPoint[]>(`/api/players/compare/trajectory`, {
-      params: { 
-        players: name, 
-        start_date: startDate, 
-        end_date: endDate, 
-        rating_system: ratingSystem 
-      }
-    }).then(res => res.data),
+    getComparedTrajectories({ 
+      players: name, 
+      start_date: startDate, 
+      end_date: endDate, 
+      rating_system: ratingSystem 
+    }).then(data => data.players[0]?.trajectory ?? []),
   
   comparePlayerTrajectories: (
     players: string[], 
@@ -131,22 +179,12 @@ export const apiClient = {
     endDate?: string, 
     ratingSystem: 'elo' | 'tsr' | 'glicko2' = 'elo'
   ) =>
-    axiosInstance.get<{
-      rating_system: string;
-      date_range: { start?: string; end?: string };
-      players: Array<{
-        name: string;
-        data_points: number;
-        trajectory: TrajectoryPoint[];
-      }>;
-    }>(`/api/players/compare/trajectory`, {
-      params: { 
-        players: players.join(','), 
-        start_date: startDate, 
-        end_date: endDate, 
-        rating_system: ratingSystem 
-      }
-    }).then(res => res.data),
+    getComparedTrajectories({ 
+      players: players.join(','), 
+      start_date: startDate, 
+      end_date: endDate, 
+      rating_system: ratingSystem 
+    }),
   
   getPlayerRecentMatches: (name: string, limit: number = 10) =>
     axiosInstance.get<RecentMatch[]>(`/api/players/${encodeURIComponent(name)}/recent`, { 
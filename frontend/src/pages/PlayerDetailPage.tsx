@@ -239,7 +239,7 @@ const PlayerDetailPage: React.FC = () => {
                   />
                   <Line 
                     type="monotone" 
-                    dataKey={ratingSystem} 
+                    dataKey="rating" 
                     stroke="#0EA5E9" 
                     strokeWidth={2}
                     dot={false}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API's fast JSON path on a trajectory payload.
+
+Serializes the same synthetic trajectory (5000 points by default, all
+rating systems) two ways:
+
+- default: dict rows (as the routes used to fetch them) run through
+  jsonable_encoder and JSONResponse, which is what FastAPI does with a
+  returned dict (the response_model validation pass comes on top of this
+  and is not timed, so the real gap is larger)
+- fast: tuple rows zipped into dicts once and rendered by
+  FastJSONResponse (orjson when installed)
+
+and checks that both produce the same JSON.
+
+It then compares the response formats (utils/formats.py): payload size
+and client-side decode time of the row-per-object JSON against the
+columnar JSON and MessagePack shapes.
+
+Usage:
+    python scripts/benchmark_api_serialization.py
+    python scripts/benchmark_api_serialization.py --points 5000 --repeat 50
+"""
+import sys
+from pathlib import Path
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+# The API modules import each other relative to api/
+sys.path.insert(0, str(Path(__file__).parent.parent / 'api'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils.fast_json import FastJSONResponse, orjson, records
+from utils.formats import msgpack, respond, table
+
+COLUMNS = ['match_number', 'date', 'elo_rating', 'tsr_rating', 'tsr_uncertainty',
+           'tsr_smoothed', 'glicko2_rating', 'glicko2_rd']
+
+
+def synthetic_trajectory(n_points, seed=0):
+    """Tuple rows shaped like get_player_trajectory's system=all query."""
+    rng = np.random.default_rng(seed)
+    start = date(2001, 1, 1)
+    days = np.cumsum(rng.integers(1, 8, n_points)).tolist()
+    elo = (1500 + np.cumsum(rng.normal(0, 12, n_points))).tolist()
+    tsr = (1500 + np.cumsum(rng.normal(0, 10, n_points))).tolist()
+    uncertainty = rng.uniform(30, 120, n_points).tolist()
+    glicko = (1500 + np.cumsum(rng.normal(0, 14, n_points))).tolist()
+    rd = rng.uniform(40, 200, n_points).tolist()
+    return [
+        (i + 1, start + timedelta(days=days[i]), elo[i], tsr[i], uncertainty[i],
+         tsr[i] - 3.0, glicko[i], rd[i])
+        for i in range(n_points)
+    ]
+
+
+def default_path(dict_rows):
+    payload = {"player": "Synthetic Player", "total_matches": len(dict_rows),
+               "data_points": dict_rows}
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def fast_path(tuple_rows):
+    payload = {"player": "Synthetic Player", "total_matches": len(tuple_rows),
+               "data_points": records(COLUMNS, tuple_rows)}
+    return FastJSONResponse(payload).body
+
+
+def best_of(func, arg, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(arg)
+        times.append(time.perf_counter() - start)
+    return min(times), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API JSON serialization")
+    parser.add_argument('--points', type=int, default=5000,
+                        help='Trajectory length')
+    parser.add_argument('--repeat', type=int, default=30,
+                        help='Runs per path (best time is reported)')
+    args = parser.parse_args()
+
+    tuple_rows = synthetic_trajectory(args.points)
+    dict_rows = records(COLUMNS, tuple_rows)
+
+    default_time, default_body = best_of(default_path, dict_rows, args.repeat)
+    fast_time, fast_body = best_of(fast_path, tuple_rows, args.repeat)
+
+    encoder = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"Trajectory: {args.points:,} points, {len(COLUMNS)} columns, encoder: {encoder}")
+    print(f"{'Path':<40} {'ms':>8} {'Bytes':>10}")
+    print("-" * 60)
+    print(f"{'jsonable_encoder + JSONResponse':<40} {default_time * 1000:>8.2f} {len(default_body):>10,}")
+    print(f"{'tuple rows + FastJSONResponse':<40} {fast_time * 1000:>8.2f} {len(fast_body):>10,}")
+    print(f"Speedup: {default_time / fast_time:.1f}x")
+
+    same = json.loads(default_body) == json.loads(fast_body)
+    print(f"Identical JSON: {same}")
+
+    benchmark_formats(tuple_rows, args.repeat)
+
+
+def benchmark_formats(tuple_rows, repeat):
+    decoders = {"json": json.loads, "columnar": json.loads}
+    if msgpack is not None:
+        decoders["msgpack"] = msgpack.unpackb
+
+    print(f"\n{'Format':<12} {'Bytes':>10} {'Size':>7} {'Decode ms':>10}  (Python decoders)")
+    print("-" * 42)
+    json_size = None
+    for fmt, decode in decoders.items():
+        body = respond({"data_points": table(COLUMNS, tuple_rows, fmt)}, fmt).body
+        json_size = json_size or len(body)
+        decode_time, _ = best_of(decode, body, repeat)
+        print(f"{fmt:<12} {len(body):>10,} {len(body) / json_size:>6.0%} {decode_time * 1000:>10.2f}")
+    if msgpack is None:
+        print("(msgpack not installed - MessagePack format skipped)")
+
+
+if __name__ == "__main__":
+    main()
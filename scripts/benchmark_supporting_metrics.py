@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized supporting-metrics engine.
+
+Compares calculate_supporting_metrics.compute_metrics against the
+per-row loop the old script variants ran (update_metrics, one deque
+update per rating row) on the same synthetic history, and checks that
+both give the same values.
+
+With --db it also times the read path on the real database: the engine's
+single streamed query against the old per-player query with a correlated
+opponent-ELO subquery, measured on a sample of players and extrapolated.
+
+With --fixture it builds a synthetic matches / player_ratings fixture in
+a scratch schema on the configured server and times every way the metrics
+have been computed end to end, writes included:
+
+    engine       calculate_supporting_metrics.py
+    sql          calculate_supporting_metrics_sql.py (and _simple, the same
+                 three window-function UPDATEs ordered by rating_id)
+    chunked      calculate_supporting_metrics_chunked.py: the same UPDATEs
+                 per 1000 players
+    per-player   calculate_supporting_metrics_fast.py (and _batch,
+                 _progress): a correlated opponent-ELO subquery per row and
+                 one bulk write per player
+
+The schema is dropped afterwards.
+
+Usage:
+    python scripts/benchmark_supporting_metrics.py
+    python scripts/benchmark_supporting_metrics.py --players 5000 --db
+    python scripts/benchmark_supporting_metrics.py --fixture --fixture-matches 200000
+"""
+import sys
+from pathlib import Path
+import argparse
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import TOURNAMENT_TIERS
+from scripts.calculate_supporting_metrics import (
+    MetricHistory, FINISH_ROUND_VALUES, METRIC_COLUMNS,
+    compute_metrics, load_metric_history, new_metric_state, update_metrics
+)
+
+ROUNDS = ['F', 'SF', 'QF', 'R16', 'R32', 'R64', 'R128', 'RR']
+
+FIXTURE_SCHEMA = 'bench_supporting_metrics'
+
+# Players per statement in the chunked variant
+CHUNK_PLAYERS = 1000
+
+# The SQL variants' three UPDATEs; {players} narrows them to a chunk
+SQL_VARIANT_UPDATES = (
+    """
+    WITH match_results AS (
+        SELECT
+            pr.rating_id,
+            pr.player_id,
+            CASE WHEN m.winner_id = pr.player_id THEN 1.0 ELSE 0.0 END as won,
+            ROW_NUMBER() OVER (PARTITION BY pr.player_id ORDER BY pr.date, pr.match_id) as match_num
+        FROM player_ratings pr
+        JOIN matches m ON pr.match_id = m.match_id
+        WHERE pr.tsr_rating IS NOT NULL {players}
+    )
+    UPDATE player_ratings pr
+    SET form_index = subq.form_index
+    FROM (
+        SELECT
+            rating_id,
+            AVG(won) OVER (
+                PARTITION BY player_id
+                ORDER BY match_num
+                ROWS BETWEEN 19 PRECEDING AND CURRENT ROW
+            ) * 100 as form_index
+        FROM match_results
+    ) subq
+    WHERE pr.rating_id = subq.rating_id
+    """,
+    """
+    WITH opponent_data AS (
+        SELECT
+            pr.rating_id,
+            pr.player_id,
+            pr.elo_rating as player_elo,
+            opp.elo_rating as opponent_elo,
+            CASE WHEN m.winner_id = pr.player_id THEN 1.0 ELSE 0.0 END as won,
+            ROW_NUMBER() OVER (PARTITION BY pr.player_id ORDER BY pr.date, pr.match_id) as match_num
+        FROM player_ratings pr
+        JOIN matches m ON pr.match_id = m.match_id
+        JOIN player_ratings opp ON opp.match_id = m.match_id AND opp.player_id != pr.player_id
+        WHERE pr.tsr_rating IS NOT NULL {players}
+            AND opp.elo_rating >= 2300
+    )
+    UPDATE player_ratings pr
+    SET big_match_rating = subq.big_match_rating
+    FROM (
+        SELECT
+            rating_id,
+            AVG((won - (1.0 / (1.0 + POWER(10, (opponent_elo - player_elo) / 400.0)))) * 100) OVER (
+                PARTITION BY player_id
+                ORDER BY match_num
+                ROWS BETWEEN 49 PRECEDING AND CURRENT ROW
+            ) as big_match_rating
+        FROM opponent_data
+    ) subq
+    WHERE pr.rating_id = subq.rating_id
+    """,
+    """
+    WITH tournament_points AS (
+        SELECT
+            pr.rating_id,
+            pr.player_id,
+            ROW_NUMBER() OVER (PARTITION BY pr.player_id ORDER BY pr.date, pr.match_id) as match_num,
+            CASE m.round
+                WHEN 'F' THEN 100 WHEN 'SF' THEN 75 WHEN 'QF' THEN 50
+                WHEN 'R16' THEN 30 WHEN 'R32' THEN 15 WHEN 'R64' THEN 5
+                WHEN 'R128' THEN 2 WHEN 'RR' THEN 40 ELSE 5
+            END *
+            CASE m.tournament_tier
+                WHEN 'Grand Slam' THEN 2.0 WHEN 'Masters 1000' THEN 1.5
+                WHEN 'Masters' THEN 1.5 WHEN 'ATP Finals' THEN 1.8
+                WHEN 'ATP 500' THEN 1.2 WHEN 'Olympics' THEN 1.6
+                ELSE 1.0
+            END as points
+        FROM player_ratings pr
+        JOIN matches m ON pr.match_id = m.match_id
+        WHERE pr.tsr_rating IS NOT NULL {players}
+    )
+    UPDATE player_ratings pr
+    SET tournament_success_score = subq.tournament_success_score
+    FROM (
+        SELECT
+            rating_id,
+            AVG(points) OVER (
+                PARTITION BY player_id
+                ORDER BY match_num
+                ROWS BETWEEN 19 PRECEDING AND CURRENT ROW
+            ) as tournament_success_score
+        FROM tournament_points
+    ) subq
+    WHERE pr.rating_id = subq.rating_id
+    """,
+)
+
+
+def synthetic_history(n_players, max_matches=400, seed=0):
+    """Random careers with realistic ELO spread, tiers, rounds and gaps."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_matches, n_players)
+    n = int(lengths.sum())
+
+    player_id = np.repeat(np.arange(n_players, dtype=np.int64), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    days = np.cumsum(rng.integers(0, 21, n))
+    date = np.datetime64('1990-01-01') + (days - days[starts])
+
+    tiers = list(TOURNAMENT_TIERS) + [None]
+    tier = [tiers[i] for i in rng.integers(len(tiers), size=n)]
+    round_name = [ROUNDS[i] for i in rng.integers(len(ROUNDS), size=n)]
+
+    history = MetricHistory(
+        rating_id=np.arange(n, dtype=np.int64),
+        player_id=player_id,
+        date=date.astype('datetime64[D]'),
+        player_elo=rng.normal(2000, 250, n),
+        opponent_elo=rng.normal(2050, 300, n),
+        won=rng.random(n) < 0.5,
+        tier_weight=np.array([TOURNAMENT_TIERS[t]['weight'] if t else 1.0 for t in tier]),
+        finish_value=np.array([FINISH_ROUND_VALUES.get(r, 0) for r in round_name], dtype=np.float64),
+    )
+    return history, tier, round_name
+
+
+def per_row_metrics(history, tier, round_name):
+    """The old scripts' algorithm: one update_metrics call per rating row."""
+    dates = history.date.astype(object)
+    player_ids = history.player_id.tolist()
+    player_elo = history.player_elo.tolist()
+    opponent_elo = history.opponent_elo.tolist()
+    won = history.won.tolist()
+
+    states = {}
+    out = np.empty((len(history), len(METRIC_COLUMNS)))
+    for i in range(len(history)):
+        state = states.get(player_ids[i])
+        if state is None:
+            state = states[player_ids[i]] = new_metric_state()
+        out[i] = update_metrics(state, won[i], player_elo[i], opponent_elo[i],
+                                tier[i], round_name[i], dates[i])
+    return out
+
+
+def benchmark_compute(n_players):
+    history, tier, round_name = synthetic_history(n_players)
+    print(f"Synthetic history: {len(history):,} rating rows, {n_players:,} players")
+
+    start = time.perf_counter()
+    vectorized = compute_metrics(history)
+    vectorized_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = per_row_metrics(history, tier, round_name)
+    per_row_time = time.perf_counter() - start
+
+    print(f"{'Engine':<28} {'Seconds':>10} {'Rows/sec':>14}")
+    print("-" * 54)
+    for name, seconds in (("per-row loop (old scripts)", per_row_time),
+                          ("vectorized engine", vectorized_time)):
+        print(f"{name:<28} {seconds:>10.2f} {len(history) / seconds:>14,.0f}")
+    print(f"Speedup: {per_row_time / vectorized_time:.1f}x")
+
+    for j, column in enumerate(METRIC_COLUMNS):
+        diff = np.abs(reference[:, j] - vectorized[column]).max()
+        print(f"  max |difference| {column:<26} {diff:.2e}")
+
+
+def benchmark_database(sample_players):
+    from database.db_manager import DatabaseManager
+    db = DatabaseManager()
+
+    start = time.perf_counter()
+    history = load_metric_history(db)
+    compute_metrics(history)
+    engine_time = time.perf_counter() - start
+
+    player_ids = np.unique(history.player_id)
+    rng = np.random.default_rng(0)
+    sample = rng.choice(player_ids, size=min(sample_players, len(player_ids)), replace=False)
+
+    start = time.perf_counter()
+    for player_id in sample.tolist():
+        with db.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT pr.rating_id, pr.date, pr.elo_rating, m.winner_id,
+                       m.tournament_tier, m.round,
+                       (SELECT pr2.elo_rating FROM player_ratings pr2
+                        WHERE pr2.match_id = m.match_id AND pr2.player_id != pr.player_id
+                        LIMIT 1) as opponent_elo
+                FROM player_ratings pr
+                JOIN matches m ON pr.match_id = m.match_id
+                WHERE pr.player_id = %s AND pr.tsr_rating IS NOT NULL
+                ORDER BY pr.date, m.match_id
+            """, (player_id,))
+            cursor.fetchall()
+    per_player_time = (time.perf_counter() - start) * len(player_ids) / len(sample)
+
+    print(f"\nDatabase read path ({len(history):,} rows, {len(player_ids):,} players)")
+    print(f"  per-player queries (extrapolated from {len(sample):,}): {per_player_time:>8.1f} s")
+    print(f"  single streamed query + vectorized compute:  {engine_time:>8.1f} s")
+
+
+def _fixture_database():
+    """A DatabaseManager whose connections resolve tables in FIXTURE_SCHEMA."""
+    import psycopg2
+    from database.db_manager import DatabaseManager
+
+    class FixtureDatabase(DatabaseManager):
+        def get_connection(self):
+            return psycopg2.connect(**self.config, options=f"-c search_path={FIXTURE_SCHEMA}")
+
+    return FixtureDatabase()
+
+
+def _run_autocommit(db, statements):
+    """Run statements outside a transaction block (DDL, VACUUM)."""
+    conn = db.get_connection()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    finally:
+        conn.close()
+
+
+def build_fixture(db, n_players, n_matches, seed=0):
+    """
+    Fill the fixture schema with n_matches random matches and their two
+    rating rows each, shaped like the columns the metric scripts read.
+    """
+    _run_autocommit(db, [
+        f"DROP SCHEMA IF EXISTS {FIXTURE_SCHEMA} CASCADE",
+        f"CREATE SCHEMA {FIXTURE_SCHEMA}",
+        f"""
+        CREATE TABLE {FIXTURE_SCHEMA}.matches (
+            match_id INT,
+            date DATE NOT NULL,
+            tournament_tier VARCHAR(50),
+            round VARCHAR(50),
+            winner_id INT,
+            PRIMARY KEY (match_id, date)
+        )
+        """,
+        f"""
+        CREATE TABLE {FIXTURE_SCHEMA}.player_ratings (
+            rating_id INT,
+            player_id INT,
+            match_id INT,
+            date DATE NOT NULL,
+            tsr_rating FLOAT,
+            form_index FLOAT,
+            big_match_rating FLOAT,
+            tournament_success_score FLOAT,
+            elo_rating FLOAT,
+            elo_pre_match FLOAT,
+            opponent_elo_pre_match FLOAT,
+            PRIMARY KEY (rating_id, date),
+            UNIQUE (player_id, match_id, date)
+        )
+        """,
+        f"CREATE INDEX ON {FIXTURE_SCHEMA}.player_ratings(player_id, date)",
+    ])
+
+    rng = np.random.default_rng(seed)
+    winner = rng.integers(n_players, size=n_matches)
+    loser = (winner + rng.integers(1, n_players, size=n_matches)) % n_players
+    days = np.sort(rng.integers(0, 365 * 40, n_matches))
+    date = (np.datetime64('1985-01-01') + days).astype('datetime64[D]').tolist()
+    tiers = list(TOURNAMENT_TIERS) + [None]
+    tier = [tiers[i] for i in rng.integers(len(tiers), size=n_matches)]
+    round_name = [ROUNDS[i] for i in rng.integers(len(ROUNDS), size=n_matches)]
+
+    db.bulk_replace('matches', ('match_id', 'date', 'tournament_tier', 'round', 'winner_id'),
+                    zip(range(n_matches), date, tier, round_name, winner.tolist()))
+
+    # Rows 2i and 2i + 1 are match i's winner and loser
+    player_id = np.column_stack([winner, loser]).ravel()
+    pre = rng.normal(2000, 250, 2 * n_matches)
+    post = pre + rng.normal(0, 15, 2 * n_matches)
+    opponent_pre = pre.reshape(-1, 2)[:, ::-1].ravel()
+    db.bulk_replace(
+        'player_ratings',
+        ('rating_id', 'player_id', 'match_id', 'date', 'tsr_rating',
+         'elo_rating', 'elo_pre_match', 'opponent_elo_pre_match'),
+        zip(range(2 * n_matches), player_id.tolist(), np.repeat(np.arange(n_matches), 2).tolist(),
+            np.repeat(np.array(date, dtype='datetime64[D]'), 2).tolist(), post.tolist(),
+            post.tolist(), pre.tolist(), opponent_pre.tolist())
+    )
+    _run_autocommit(db, ["ANALYZE matches", "ANALYZE player_ratings"])
+
+
+def run_engine(db):
+    """calculate_supporting_metrics.py: one streamed read, one bulk write."""
+    history = load_metric_history(db)
+    metrics = compute_metrics(history)
+    db.bulk_update(
+        'player_ratings', ('rating_id', 'date'), METRIC_COLUMNS,
+        zip(history.rating_id.tolist(), history.date.tolist(),
+            *(metrics[c].tolist() for c in METRIC_COLUMNS))
+    )
+
+
+def run_sql_variant(db):
+    """calculate_supporting_metrics_sql.py: three whole-table UPDATEs."""
+    for statement in SQL_VARIANT_UPDATES:
+        with db.get_cursor() as cursor:
+            cursor.execute(statement.format(players=''))
+
+
+def _rated_player_ids(db):
+    with db.get_cursor(dict_cursor=False) as cursor:
+        cursor.execute("""
+            SELECT DISTINCT player_id
+            FROM player_ratings
+            WHERE tsr_rating IS NOT NULL
+            ORDER BY player_id
+        """)
+        return [player_id for (player_id,) in cursor.fetchall()]
+
+
+def run_chunked_variant(db):
+    """calculate_supporting_metrics_chunked.py: the same UPDATEs per chunk."""
+    player_ids = _rated_player_ids(db)
+    for i in range(0, len(player_ids), CHUNK_PLAYERS):
+        chunk = player_ids[i:i + CHUNK_PLAYERS]
+        for statement in SQL_VARIANT_UPDATES:
+            with db.get_cursor() as cursor:
+                cursor.execute(statement.format(players='AND pr.player_id = ANY(%s)'), (chunk,))
+
+
+def run_per_player_variant(db):
+    """
+    calculate_supporting_metrics_fast.py: per player, one query with a
+    correlated opponent-ELO subquery per row, the deque updates, and one
+    bulk write.
+    """
+    for player_id in _rated_player_ids(db):
+        with db.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT
+                    pr.rating_id,
+                    pr.date,
+                    pr.elo_rating,
+                    m.winner_id = pr.player_id as won,
+                    m.tournament_tier,
+                    m.round,
+                    COALESCE((SELECT pr2.elo_rating
+                              FROM player_ratings pr2
+                              WHERE pr2.match_id = m.match_id
+                                AND pr2.player_id != pr.player_id
+                              LIMIT 1), 1500.0) as opponent_elo
+                FROM player_ratings pr
+                JOIN matches m ON pr.match_id = m.match_id
+                WHERE pr.player_id = %s
+                  AND pr.tsr_rating IS NOT NULL
+                ORDER BY pr.date
+            """, (player_id,))
+            matches = cursor.fetchall()
+
+        state = new_metric_state()
+        updates = [
+            (match['rating_id'],) + tuple(update_metrics(
+                state, match['won'], match['elo_rating'], match['opponent_elo'],
+                match['tournament_tier'], match['round'], match['date']))
+            for match in matches
+        ]
+        db.bulk_update('player_ratings', ('rating_id',), METRIC_COLUMNS, updates)
+
+
+FIXTURE_RUNS = (
+    ("engine", run_engine),
+    ("sql (+ _simple)", run_sql_variant),
+    ("chunked", run_chunked_variant),
+    ("per-player (_fast, _batch, _progress)", run_per_player_variant),
+)
+
+
+def benchmark_fixture(n_players, n_matches):
+    db = _fixture_database()
+    print(f"\nBuilding fixture: {n_matches:,} matches, {2 * n_matches:,} rating rows, "
+          f"{n_players:,} players (schema {FIXTURE_SCHEMA})")
+    try:
+        build_fixture(db, n_players, n_matches)
+        print(f"{'Variant':<40} {'Seconds':>10} {'Rows/sec':>14}")
+        print("-" * 66)
+        for name, run in FIXTURE_RUNS:
+            # Start every variant from the same clean heap
+            _run_autocommit(db, [
+                "UPDATE player_ratings SET form_index = NULL, big_match_rating = NULL, "
+                "tournament_success_score = NULL",
+                "VACUUM ANALYZE player_ratings",
+            ])
+            start = time.perf_counter()
+            run(db)
+            seconds = time.perf_counter() - start
+            print(f"{name:<40} {seconds:>10.2f} {2 * n_matches / seconds:>14,.0f}")
+    finally:
+        _run_autocommit(db, [f"DROP SCHEMA {FIXTURE_SCHEMA} CASCADE"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the supporting-metrics engine")
+    parser.add_argument('--players', type=int, default=2000,
+                        help='Players in the synthetic history')
+    parser.add_argument('--db', action='store_true',
+                        help='Also time the read path against the configured database')
+    parser.add_argument('--sample', type=int, default=200,
+                        help='Players timed for the per-player query extrapolation')
+    parser.add_argument('--fixture', action='store_true',
+                        help='Also time every variant end to end on a fixture schema')
+    parser.add_argument('--fixture-matches', type=int, default=50000,
+                        help='Matches in the fixture (two rating rows each)')
+    args = parser.parse_args()
+
+    benchmark_compute(args.players)
+    if args.db:
+        benchmark_database(args.sample)
+    if args.fixture:
+        benchmark_fixture(args.players, args.fixture_matches)
+
+
+if __name__ == "__main__":
+    main()
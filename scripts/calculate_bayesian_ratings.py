@@ -18,13 +18,21 @@ Strategy:
 This creates a more sophisticated rating that accounts for sample size and reliability.
 """
 
+import argparse
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Optional
 import math
 import numpy as np
 import sys
-sys.path.insert(0, '/Users/razaool/tennis-career-tracker')
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 from database.db_manager import DatabaseManager
+from scripts.rating_checkpoints import (
+    save_checkpoint, load_latest_checkpoint, discard_checkpoints_after, earliest_pending_date
+)
+from scripts.rating_backfill import backfill_start, fetch_existing_ratings, filter_changed
+from scripts.player_shards import default_workers, run_sharded, shard_filter, group_bounds
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +41,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of recent ELO values used for the volatility estimate
+ELO_WINDOW = 50
+
+# date is in the key so the UPDATE prunes player_ratings partitions
+TSR_KEY_COLUMNS = ('rating_id', 'date')
+
+TSR_COLUMNS = (
+    'tsr_rating', 'tsr_uncertainty',
+    'clay_uncertainty', 'grass_uncertainty', 'hard_uncertainty',
+)
+
 
 def calculate_uncertainty(
     match_count: int,
@@ -92,7 +111,347 @@ def calculate_uncertainty(
     return min(max(uncertainty, 25.0), 350.0)
 
 
-def calculate_bayesian_ratings():
+class EloWindow:
+    """
+    Ring buffer of a player's last ELO_WINDOW ratings with a running mean
+    and variance (sliding-window Welford), so each push is O(1) and memory
+    per player is fixed no matter how long the career.
+    """
+    
+    __slots__ = ('values', 'pos', 'count', 'mean', 'm2')
+    
+    def __init__(self):
+        self.values = [0.0] * ELO_WINDOW
+        self.pos = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def __len__(self):
+        return self.count
+    
+    def push(self, x: float):
+        """Add a rating, evicting the oldest one once the window is full."""
+        if self.count < ELO_WINDOW:
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.values[self.pos]
+            old_mean = self.mean
+            self.mean += (x - old) / ELO_WINDOW
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        
+        self.values[self.pos] = x
+        self.pos = (self.pos + 1) % ELO_WINDOW
+        
+        # Resync from the buffer once per lap so rounding error can't build
+        # up over a long career (amortised O(1))
+        if self.pos == 0:
+            self.mean = math.fsum(self.values) / ELO_WINDOW
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+    
+    def std(self) -> float:
+        """Population standard deviation of the window (same as np.std)."""
+        if self.count == 0:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / self.count)
+    
+    def ordered(self) -> list:
+        """Window contents, oldest first."""
+        if self.count < ELO_WINDOW:
+            return self.values[:self.count]
+        return self.values[self.pos:] + self.values[:self.pos]
+
+
+def new_tsr_stats() -> dict:
+    """Rolling stats for a player with no rated matches yet."""
+    return {
+        'elos': EloWindow(),
+        'last_date': None,
+        'match_count': 0
+    }
+
+
+def update_tsr(stats: dict, match_date, elo: float, match_num: int) -> dict:
+    """
+    Advance a player's rolling stats by one rating row and compute its TSR.
+    
+    Args:
+        stats: The player's rolling stats (see new_tsr_stats), updated in place
+        match_date: Date of the match
+        elo: Player's ELO after the match
+        match_num: Career match number
+        
+    Returns:
+        Dict of TSR_COLUMNS values for the row
+    """
+    window = stats['elos']
+    window.push(elo)
+    stats['match_count'] = match_num
+    
+    # Calculate days since last match
+    if stats['last_date']:
+        days_since_last = (match_date - stats['last_date']).days
+    else:
+        days_since_last = 0
+    
+    stats['last_date'] = match_date
+    
+    # Calculate ELO standard deviation over recent window
+    recent_window = len(window)
+    if recent_window >= 10:
+        elo_std = window.std()
+    else:
+        elo_std = 0.0
+    
+    # Calculate overall uncertainty
+    uncertainty = calculate_uncertainty(
+        match_count=match_num,
+        days_since_last_match=days_since_last,
+        elo_std_dev=elo_std,
+        recent_matches_count=recent_window
+    )
+    
+    # For surface uncertainties, use a simplified approach
+    # (In a full implementation, we'd track surface-specific stats)
+    # For now, base it on match count with higher uncertainty
+    surface_uncertainty_factor = 1.2  # Surfaces have less data
+    clay_uncertainty = uncertainty * surface_uncertainty_factor
+    grass_uncertainty = uncertainty * surface_uncertainty_factor * 1.3  # Grass has least matches
+    hard_uncertainty = uncertainty * surface_uncertainty_factor * 0.9  # Hard has most matches
+    
+    # Calculate proper TSR rating with Bayesian adjustment
+    # TSR = ELO adjusted by confidence and experience
+    experience_factor = min(match_num / 100.0, 1.0)  # 0-1 based on experience
+    confidence = max(0.7, 1.0 - (uncertainty / 400.0))  # Convert uncertainty to confidence (0.7-1.0)
+    
+    # Bayesian TSR: ELO adjusted by experience and confidence
+    # More experienced players with lower uncertainty get ratings closer to ELO
+    # Less experienced players with high uncertainty get more conservative ratings
+    tsr_adjustment = (experience_factor * confidence - 0.5) * 50  # -25 to +25 adjustment
+    tsr_rating = elo + tsr_adjustment
+    
+    # Ensure TSR stays within reasonable bounds
+    tsr_rating = max(800, min(3500, tsr_rating))
+    
+    return {
+        'tsr_rating': tsr_rating,  # Proper Bayesian-adjusted TSR
+        'tsr_uncertainty': uncertainty,
+        'clay_uncertainty': clay_uncertainty,
+        'grass_uncertainty': grass_uncertainty,
+        'hard_uncertainty': hard_uncertainty
+    }
+
+
+def calculate_tsr_arrays(player_ids, dates, elos, match_nums) -> dict:
+    """
+    Vectorized update_tsr over many players' complete histories at once.
+    
+    Args:
+        player_ids, dates, elos, match_nums: Equal-length arrays sorted by
+            (player, date, match) and starting at each player's first match
+        
+    Returns:
+        Dict of TSR_COLUMNS arrays, same values as calling update_tsr row
+        by row from fresh stats
+    """
+    n = len(elos)
+    pos = np.arange(n)
+    bounds = group_bounds(player_ids)
+    group_start = np.repeat(bounds[:-1], np.diff(bounds))
+    
+    # Days since the player's previous match (0 for their first)
+    day_numbers = dates.astype('datetime64[D]').astype(np.int64)
+    days_since_last = np.zeros(n)
+    days_since_last[1:] = day_numbers[1:] - day_numbers[:-1]
+    days_since_last[group_start == pos] = 0
+    
+    # ELO standard deviation over the trailing window, from prefix sums
+    # (shifted by each player's first ELO to keep the sums small)
+    window_start = np.maximum(group_start, pos - ELO_WINDOW + 1)
+    recent_window = pos - window_start + 1
+    shifted = elos - elos[group_start]
+    sum1 = np.concatenate([[0.0], np.cumsum(shifted)])
+    sum2 = np.concatenate([[0.0], np.cumsum(shifted * shifted)])
+    mean = (sum1[pos + 1] - sum1[window_start]) / recent_window
+    variance = (sum2[pos + 1] - sum2[window_start]) / recent_window - mean * mean
+    elo_std = np.where(recent_window >= 10, np.sqrt(np.maximum(variance, 0.0)), 0.0)
+    
+    # calculate_uncertainty, element-wise
+    experience_uncertainty = np.where(
+        match_nums == 0, 350.0, 350.0 / (1 + np.log(match_nums + 1) / 3)
+    )
+    inactivity_factor = np.where(
+        days_since_last > 0, np.sqrt(1 + days_since_last / 30.0 * 0.01), 1.0
+    )
+    volatility_factor = np.where(
+        (elo_std > 0) & (recent_window >= 10), 1.0 + elo_std / 400.0, 1.0
+    )
+    uncertainty = np.clip(
+        experience_uncertainty * inactivity_factor * volatility_factor, 25.0, 350.0
+    )
+    
+    # Bayesian TSR adjustment (see update_tsr)
+    experience_factor = np.minimum(match_nums / 100.0, 1.0)
+    confidence = np.maximum(0.7, 1.0 - uncertainty / 400.0)
+    tsr_rating = np.clip(elos + (experience_factor * confidence - 0.5) * 50, 800, 3500)
+    
+    surface_uncertainty_factor = 1.2
+    return {
+        'tsr_rating': tsr_rating,
+        'tsr_uncertainty': uncertainty,
+        'clay_uncertainty': uncertainty * surface_uncertainty_factor,
+        'grass_uncertainty': uncertainty * surface_uncertainty_factor * 1.3,
+        'hard_uncertainty': uncertainty * surface_uncertainty_factor * 0.9,
+    }
+
+
+def _tsr_end_state(player_ids, dates, elos, match_nums) -> dict:
+    """Checkpoint state after each player's last row (sorted arrays, as above)."""
+    bounds = group_bounds(player_ids)
+    starts, ends = bounds[:-1], bounds[1:]
+    n_players = len(starts)
+    
+    window = np.full((n_players, ELO_WINDOW), np.nan)
+    window_len = np.minimum(ends - starts, ELO_WINDOW)
+    for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        tail = elos[max(start, end - ELO_WINDOW):end]
+        window[i, :len(tail)] = tail
+    
+    return {
+        'player_ids': player_ids[starts].astype(np.int64),
+        'elo_window': window,
+        'window_len': window_len.astype(np.int64),
+        'last_date': dates[ends - 1].astype('datetime64[D]'),
+        'match_count': match_nums[ends - 1].astype(np.int64),
+    }
+
+
+def _tsr_shard(shard: int, n_shards: int):
+    """
+    Worker: full TSR pass for one shard of players.
+    
+    Returns:
+        (rows written, end-of-history checkpoint state) or (0, None)
+    """
+    db = DatabaseManager()
+    with db.get_cursor(dict_cursor=False) as cursor:
+        cursor.execute(f"""
+            SELECT rating_id, player_id, date, elo_rating, career_match_number
+            FROM player_ratings
+            WHERE {shard_filter()}
+            ORDER BY player_id, date, match_id
+        """, (n_shards, shard))
+        rows = cursor.fetchall()
+    
+    if not rows:
+        return 0, None
+    
+    rating_ids, player_ids, dates, elos, match_nums = zip(*rows)
+    rating_ids = np.array(rating_ids, dtype=np.int64)
+    player_ids = np.array(player_ids, dtype=np.int64)
+    dates = np.array(dates, dtype='datetime64[D]')
+    elos = np.array(elos, dtype=np.float64)
+    match_nums = np.nan_to_num(np.array(match_nums, dtype=np.float64))
+    
+    values = calculate_tsr_arrays(player_ids, dates, elos, match_nums)
+    written = db.bulk_update(
+        'player_ratings', TSR_KEY_COLUMNS, TSR_COLUMNS,
+        zip(rating_ids.tolist(), dates.tolist(), *(values[c].tolist() for c in TSR_COLUMNS))
+    )
+    return written, _tsr_end_state(player_ids, dates, elos, match_nums)
+
+
+def calculate_bayesian_ratings_parallel(workers: int):
+    """
+    Full TSR rebuild with players sharded across a process pool.
+    
+    Each player's TSR only depends on their own history, so shards are
+    independent. The merged end state is saved as the 'tsr' checkpoint so
+    later incremental runs can resume from it.
+    
+    Args:
+        workers: Number of worker processes
+    """
+    logger.info("="*70)
+    logger.info(f"CALCULATING TSR (Tennis Skill Rating) - PARALLEL ({workers} workers)")
+    logger.info("="*70)
+    
+    db = DatabaseManager()
+    start_time = datetime.now()
+    
+    # Year snapshots from an earlier serial run may no longer match the data
+    discard_checkpoints_after('tsr')
+    
+    results = run_sharded(_tsr_shard, workers)
+    total_records = sum(written for written, _ in results)
+    states = [state for _, state in results if state is not None]
+    
+    if states:
+        merged = {key: np.concatenate([state[key] for state in states]) for key in states[0]}
+        order = np.argsort(merged['player_ids'], kind='stable')
+        merged = {key: value[order] for key, value in merged.items()}
+        save_checkpoint('tsr', merged['last_date'].max() + 1, merged)
+    
+    duration = (datetime.now() - start_time).total_seconds()
+    
+    logger.info("="*70)
+    logger.info(f"✅ TSR calculation complete!")
+    logger.info(f"✅ Processed {total_records:,} rating records")
+    logger.info(f"✅ Updated {sum(len(state['player_ids']) for state in states):,} players")
+    logger.info(f"Calculation took {duration:.1f} seconds ({duration/60:.1f} minutes)")
+    logger.info("="*70)
+    
+    db.refresh_latest_ratings()
+    db.bump_data_version()
+    _show_top_players(db)
+    _validate_tsr_vs_elo(db)
+
+
+def _tsr_state_dict(player_stats: dict) -> dict:
+    """Snapshot of the per-player rolling stats as NumPy arrays."""
+    player_ids = np.array(sorted(player_stats), dtype=np.int64)
+    window = np.full((len(player_ids), ELO_WINDOW), np.nan)
+    window_len = np.zeros(len(player_ids), dtype=np.int64)
+    last_date = np.full(len(player_ids), np.datetime64('NaT'), dtype='datetime64[D]')
+    match_count = np.zeros(len(player_ids), dtype=np.int64)
+    
+    for i, player_id in enumerate(player_ids.tolist()):
+        stats = player_stats[player_id]
+        elos = stats['elos'].ordered()
+        window[i, :len(elos)] = elos
+        window_len[i] = len(elos)
+        if stats['last_date'] is not None:
+            last_date[i] = stats['last_date']
+        match_count[i] = stats['match_count']
+    
+    return {
+        'player_ids': player_ids,
+        'elo_window': window,
+        'window_len': window_len,
+        'last_date': last_date,
+        'match_count': match_count,
+    }
+
+
+def _load_tsr_state(state: dict) -> dict:
+    """Rebuild the per-player rolling stats from a checkpoint."""
+    player_stats = {}
+    last_dates = state['last_date'].astype(object)
+    for i, player_id in enumerate(state['player_ids'].tolist()):
+        stats = new_tsr_stats()
+        for elo in state['elo_window'][i, :state['window_len'][i]].tolist():
+            stats['elos'].push(elo)
+        stats['last_date'] = last_dates[i]
+        stats['match_count'] = int(state['match_count'][i])
+        player_stats[player_id] = stats
+    return player_stats
+
+
+def calculate_bayesian_ratings(incremental: bool = False, backfill: bool = False,
+                               affected: Optional[date] = None):
     """
     Calculate TSR (Tennis Skill Rating) = ELO + Uncertainty Estimates.
     
@@ -100,6 +459,14 @@ def calculate_bayesian_ratings():
     - tsr_rating: Copy of elo_rating (proven metric)
     - tsr_uncertainty: Bayesian confidence estimate
     - Surface-specific uncertainties
+    
+    Args:
+        incremental: Resume from the latest checkpoint before the earliest
+            row without a TSR value instead of reprocessing all history
+        backfill: Also treat re-dated matches as affected, and only
+            rewrite rating rows whose values actually changed
+        affected: Earliest affected date computed by rating_backfill.main
+            (re-dated rows are gone from view once ELO has run)
     """
     logger.info("="*70)
     logger.info("CALCULATING TSR (Tennis Skill Rating) WITH UNCERTAINTY")
@@ -109,134 +476,130 @@ def calculate_bayesian_ratings():
     db = DatabaseManager()
     start_time = datetime.now()
     
-    # Get all player rating entries
-    logger.info("Fetching all rating records...")
+    # Track player statistics for uncertainty calculation
+    player_stats = {}
+    since = None
+    
+    if incremental:
+        if backfill:
+            pending = backfill_start(db, 'tsr_rating', affected)
+        else:
+            pending = earliest_pending_date(db, 'tsr_rating')
+        if pending is None:
+            logger.info("✅ All rating rows already have TSR values - nothing to do")
+            return
+        since, state = load_latest_checkpoint('tsr', on_or_before=pending)
+        if since is None:
+            logger.info("No usable checkpoint found - falling back to a full pass")
+        else:
+            player_stats = _load_tsr_state(state)
+            logger.info(f"Resuming from checkpoint {since} (earliest pending row: {pending})")
+    
+    # Every later snapshot is about to be rebuilt
+    discard_checkpoints_after('tsr', since)
+    
+    existing = None
+    if backfill and since is not None:
+        existing = fetch_existing_ratings(db, ('rating_id',), TSR_COLUMNS, since)
+    
+    # Stream player rating entries. Each player's stats only depend on
+    # their own history, so rows are processed in date order; that lets the
+    # state be checkpointed at year boundaries. A server-side cursor keeps
+    # memory flat no matter how many rows there are.
+    source = "player_ratings pr"
+    if affected is not None:
+        # The old rows of re-dated matches are only deleted after this pass
+        source += " JOIN matches m ON m.match_id = pr.match_id AND m.date = pr.date"
+    where = ""
+    params = None
+    if since is not None:
+        where = " WHERE pr.date >= %s"
+        params = (str(since),)
+    
     with db.get_cursor() as cursor:
-        cursor.execute("""
+        cursor.execute(f"SELECT COUNT(*) as count FROM {source}" + where, params)
+        total_records = cursor.fetchone()['count']
+    
+    if total_records == 0:
+        logger.info("✅ No rating records to process")
+        return
+    
+    logger.info(f"Streaming {total_records:,} rating records...")
+    
+    updates = []
+    batch_size = 100000
+    processed = 0
+    written = 0
+    current_year = None
+    last_date = None
+    
+    with db.get_cursor(dict_cursor=False, name='tsr_stream') as cursor:
+        cursor.execute(f"""
             SELECT 
                 pr.rating_id,
                 pr.player_id,
-                pr.match_id,
                 pr.date,
                 pr.elo_rating,
-                pr.elo_clay,
-                pr.elo_grass,
-                pr.elo_hard,
                 pr.career_match_number
-            FROM player_ratings pr
-            ORDER BY pr.player_id, pr.date
-        """)
-        
-        all_ratings = cursor.fetchall()
-        total_records = len(all_ratings)
-    
-    logger.info(f"Processing {total_records:,} rating records...")
-    
-    # Track player statistics for uncertainty calculation
-    player_stats = {}
-    updates = []
-    batch_size = 10000
-    processed = 0
-    
-    for rating in all_ratings:
-        player_id = rating['player_id']
-        match_date = rating['date']
-        elo = rating['elo_rating']
-        match_num = rating['career_match_number'] or 0
-        
-        # Initialize player stats if needed
-        if player_id not in player_stats:
-            player_stats[player_id] = {
-                'elos': [],
-                'last_date': None,
-                'match_count': 0
-            }
-        
-        stats = player_stats[player_id]
-        stats['elos'].append(elo)
-        stats['match_count'] = match_num
-        
-        # Calculate days since last match
-        if stats['last_date']:
-            days_since_last = (match_date - stats['last_date']).days
-        else:
-            days_since_last = 0
-        
-        stats['last_date'] = match_date
+            FROM {source}
+            {where}
+            ORDER BY pr.date, pr.match_id, pr.player_id
+        """, params)
         
-        # Calculate ELO standard deviation over recent window
-        recent_window = min(50, len(stats['elos']))
-        if recent_window >= 10:
-            recent_elos = stats['elos'][-recent_window:]
-            elo_std = float(np.std(recent_elos))
-        else:
-            elo_std = 0.0
-        
-        # Calculate overall uncertainty
-        uncertainty = calculate_uncertainty(
-            match_count=match_num,
-            days_since_last_match=days_since_last,
-            elo_std_dev=elo_std,
-            recent_matches_count=recent_window
-        )
-        
-        # For surface uncertainties, use a simplified approach
-        # (In a full implementation, we'd track surface-specific stats)
-        # For now, base it on match count with higher uncertainty
-        surface_uncertainty_factor = 1.2  # Surfaces have less data
-        clay_uncertainty = uncertainty * surface_uncertainty_factor
-        grass_uncertainty = uncertainty * surface_uncertainty_factor * 1.3  # Grass has least matches
-        hard_uncertainty = uncertainty * surface_uncertainty_factor * 0.9  # Hard has most matches
-        
-        # Calculate proper TSR rating with Bayesian adjustment
-        # TSR = ELO adjusted by confidence and experience
-        experience_factor = min(match_num / 100.0, 1.0)  # 0-1 based on experience
-        confidence = max(0.7, 1.0 - (uncertainty / 400.0))  # Convert uncertainty to confidence (0.7-1.0)
-        
-        # Bayesian TSR: ELO adjusted by experience and confidence
-        # More experienced players with lower uncertainty get ratings closer to ELO
-        # Less experienced players with high uncertainty get more conservative ratings
-        tsr_adjustment = (experience_factor * confidence - 0.5) * 50  # -25 to +25 adjustment
-        tsr_rating = elo + tsr_adjustment
-        
-        # Ensure TSR stays within reasonable bounds
-        tsr_rating = max(800, min(3500, tsr_rating))
-        
-        # Prepare update
-        updates.append({
-            'rating_id': rating['rating_id'],
-            'tsr_rating': tsr_rating,  # Proper Bayesian-adjusted TSR
-            'tsr_uncertainty': uncertainty,
-            'clay_uncertainty': clay_uncertainty,
-            'grass_uncertainty': grass_uncertainty,
-            'hard_uncertainty': hard_uncertainty
-        })
-        
-        processed += 1
-        
-        # Batch update database
-        if len(updates) >= batch_size:
-            _update_database_batch(db, updates)
-            updates = []
+        for rating_id, player_id, match_date, elo, match_num in cursor:
+            # Snapshot player stats at the start of every year
+            if match_date.year != current_year:
+                if current_year is not None:
+                    save_checkpoint('tsr', f"{match_date.year}-01-01", _tsr_state_dict(player_stats))
+                current_year = match_date.year
+            last_date = match_date
+            
+            stats = player_stats.get(player_id)
+            if stats is None:
+                stats = player_stats[player_id] = new_tsr_stats()
             
-            if processed % 100000 == 0:
-                progress = processed / total_records * 100
-                logger.info(f"Processed {processed:,} / {total_records:,} ({progress:.1f}%)")
+            values = update_tsr(stats, match_date=match_date, elo=elo, match_num=match_num or 0)
+            values['rating_id'] = rating_id
+            values['date'] = match_date
+            updates.append(values)
+            
+            processed += 1
+            
+            # Batch update database (on its own connection; the stream stays open)
+            if len(updates) >= batch_size:
+                if existing is not None:
+                    updates = filter_changed(updates, existing, ('rating_id',), TSR_COLUMNS)
+                _update_database_batch(db, updates)
+                written += len(updates)
+                updates = []
+                
+                if processed % 100000 == 0:
+                    progress = processed / total_records * 100
+                    logger.info(f"Processed {processed:,} / {total_records:,} ({progress:.1f}%)")
     
     # Final batch
+    if existing is not None:
+        updates = filter_changed(updates, existing, ('rating_id',), TSR_COLUMNS)
     if updates:
         _update_database_batch(db, updates)
+        written += len(updates)
+    
+    # Snapshot the end state so the next run only processes newer rows
+    save_checkpoint('tsr', np.datetime64(last_date, 'D') + 1, _tsr_state_dict(player_stats))
     
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
     
     logger.info("="*70)
     logger.info(f"✅ TSR calculation complete!")
-    logger.info(f"✅ Processed {total_records:,} rating records")
+    logger.info(f"✅ Processed {total_records:,} rating records ({written:,} rewritten)")
     logger.info(f"✅ Updated {len(player_stats):,} players")
     logger.info(f"Calculation took {duration:.1f} seconds ({duration/60:.1f} minutes)")
     logger.info("="*70)
     
+    db.refresh_latest_ratings()
+    db.bump_data_version()
+    
     # Show top players
     _show_top_players(db)
     
@@ -245,26 +608,11 @@ def calculate_bayesian_ratings():
 
 
 def _update_database_batch(db: DatabaseManager, updates: list):
-    """Update TSR ratings in database (batch update)."""
-    with db.get_cursor() as cursor:
-        for update in updates:
-            cursor.execute("""
-                UPDATE player_ratings
-                SET 
-                    tsr_rating = %s,
-                    tsr_uncertainty = %s,
-                    clay_uncertainty = %s,
-                    grass_uncertainty = %s,
-                    hard_uncertainty = %s
-                WHERE rating_id = %s
-            """, (
-                update['tsr_rating'],
-                update['tsr_uncertainty'],
-                update['clay_uncertainty'],
-                update['grass_uncertainty'],
-                update['hard_uncertainty'],
-                update['rating_id']
-            ))
+    """Update TSR ratings in database (one bulk COPY + UPDATE)."""
+    db.bulk_update(
+        'player_ratings', TSR_KEY_COLUMNS, TSR_COLUMNS,
+        (tuple(u[c] for c in TSR_KEY_COLUMNS + TSR_COLUMNS) for u in updates)
+    )
 
 
 def _show_top_players(db: DatabaseManager):
@@ -329,7 +677,23 @@ def _validate_tsr_vs_elo(db: DatabaseManager):
 
 
 if __name__ == '__main__':
-    calculate_bayesian_ratings()
+    parser = argparse.ArgumentParser(description='Calculate TSR ratings with uncertainty')
+    parser.add_argument('--full', action='store_true',
+                        help='Reprocess all history instead of resuming from the latest checkpoint')
+    parser.add_argument('--backfill', action='store_true',
+                        help='Recompute from the earliest late-arriving match and rewrite only changed rows')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Rebuild all history in parallel on this many processes, sharded by player '
+                             '(-1: one per core)')
+    args = parser.parse_args()
+    if args.workers and args.backfill:
+        parser.error('--backfill is only supported without --workers (which always rebuilds all history)')
+    
+    workers = default_workers() if args.workers < 0 else args.workers
+    if workers > 0:
+        calculate_bayesian_ratings_parallel(workers)
+    else:
+        calculate_bayesian_ratings(incremental=not args.full, backfill=args.backfill)
     
     logger.info("\n" + "="*70)
     logger.info("✅ SCRIPT 2 COMPLETE - TSR ratings with uncertainty calculated!")
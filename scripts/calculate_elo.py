@@ -5,19 +5,35 @@ This script processes all matches chronologically and calculates:
 - Overall ELO rating
 - Surface-specific ELO ratings (clay, grass, hard)
 
+The full replay runs on ELOReplayEngine, which keeps every player's ratings
+in contiguous float64 arrays and applies independent runs of matches as
+vectorized updates. TennisELOCalculator.process_match is kept as the
+reference per-match implementation (see --verify).
+
 ELO ratings are stored in the player_ratings table.
 """
 import sys
 from pathlib import Path
 from collections import defaultdict
+import argparse
 import logging
 from datetime import datetime
 
+import numpy as np
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import INITIAL_ELO, BASE_K_FACTOR, TOURNAMENT_TIERS, SURFACES
 from database.db_manager import DatabaseManager
+from scripts.match_stream import (
+    OVERALL, SURFACE_INDEX, PlayerIndex, load_match_columns, independent_segments
+)
+from scripts.rating_checkpoints import (
+    save_checkpoint, load_latest_checkpoint, discard_checkpoints_after,
+    year_periods, remap_rows, earliest_pending_date
+)
+from scripts.rating_backfill import backfill_start, fetch_existing_ratings, is_changed
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +42,148 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class ELOReplayEngine:
+    """
+    Array-backed ELO replay.
+
+    State is a (n_players, 1 + len(SURFACES)) float64 matrix (column 0 is the
+    overall rating, then one column per surface) plus a career match counter,
+    both addressed by dense player index. Matches are applied one independent
+    segment at a time, so no per-match dicts are allocated and the output
+    is identical to replaying TennisELOCalculator.process_match in order.
+    """
+
+    # Output columns (in addition to the row keys)
+    RATING_COLUMNS = ('elo_rating', 'elo_clay', 'elo_grass', 'elo_hard')
+    # Match context recorded while the match is applied, so readers never
+    # have to join the opponent's rating row (overall ELO)
+    CONTEXT_COLUMNS = ('opponent_id', 'elo_pre_match', 'elo_delta', 'opponent_elo_pre_match')
+    _OUTPUT_INDEX = [OVERALL, SURFACE_INDEX['clay'], SURFACE_INDEX['grass'], SURFACE_INDEX['hard']]
+
+    def __init__(self, player_index, initial_elo=INITIAL_ELO, base_k=BASE_K_FACTOR):
+        self.players = player_index
+        self.initial_elo = float(initial_elo)
+        self.base_k = float(base_k)
+        self.elo = np.full((len(player_index), 1 + len(SURFACES)), self.initial_elo)
+        self.career_match_count = np.zeros(len(player_index), dtype=np.int64)
+
+    def replay(self, matches):
+        """
+        Apply matches (already in chronological order) to the current state.
+
+        Args:
+            matches: MatchColumns
+
+        Returns:
+            Dict of rating-row columns. Rows are interleaved per match,
+            winner first (row 2*i) then loser (row 2*i + 1), exactly as
+            process_match returns them.
+        """
+        n = len(matches)
+        w = self.players.index_of(matches.winner_id)
+        l = self.players.index_of(matches.loser_id)
+        surface = matches.surface.astype(np.intp)
+        k = self.base_k * matches.tier_weight
+
+        winner_out = np.empty((n, len(self._OUTPUT_INDEX)))
+        loser_out = np.empty((n, len(self._OUTPUT_INDEX)))
+        winner_pre = np.empty(n)
+        loser_pre = np.empty(n)
+        winner_count = np.empty(n, dtype=np.int64)
+        loser_count = np.empty(n, dtype=np.int64)
+
+        elo = self.elo
+        bounds = independent_segments(w, l)
+
+        for s, e in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            ws, ls, ks, surf = w[s:e], l[s:e], k[s:e], surface[s:e]
+            winner_pre[s:e] = elo[ws, OVERALL]
+            loser_pre[s:e] = elo[ls, OVERALL]
+
+            for col in (OVERALL, surf):
+                winner_elo = elo[ws, col]
+                loser_elo = elo[ls, col]
+                expected_winner = 1 / (1 + 10 ** ((loser_elo - winner_elo) / 400))
+                elo[ws, col] = winner_elo + ks * (1 - expected_winner)
+                elo[ls, col] = loser_elo + ks * (0 - (1 - expected_winner))
+
+            self.career_match_count[ws] += 1
+            self.career_match_count[ls] += 1
+
+            winner_out[s:e] = elo[ws][:, self._OUTPUT_INDEX]
+            loser_out[s:e] = elo[ls][:, self._OUTPUT_INDEX]
+            winner_count[s:e] = self.career_match_count[ws]
+            loser_count[s:e] = self.career_match_count[ls]
+
+        rows = {
+            'player_id': _interleave(matches.winner_id, matches.loser_id),
+            'match_id': np.repeat(matches.match_id, 2),
+            'date': np.repeat(matches.date, 2),
+            'career_match_number': _interleave(winner_count, loser_count),
+        }
+        for i, column in enumerate(self.RATING_COLUMNS):
+            rows[column] = _interleave(winner_out[:, i], loser_out[:, i])
+
+        # Stored values are rounded to 2 decimals; the delta is taken from
+        # the rounded values so that pre + delta == post on every row
+        pre = np.round(_interleave(winner_pre, loser_pre), 2)
+        rows['opponent_id'] = _interleave(matches.loser_id, matches.winner_id)
+        rows['elo_pre_match'] = pre
+        rows['elo_delta'] = np.round(np.round(rows['elo_rating'], 2) - pre, 2)
+        rows['opponent_elo_pre_match'] = _interleave(pre[1::2], pre[0::2])
+
+        logger.debug(f"Replayed {n:,} matches in {len(bounds) - 1:,} independent segments")
+        return rows
+    
+    def state_dict(self):
+        """Snapshot of all player state for rating_checkpoints."""
+        return {
+            'player_ids': self.players.player_ids,
+            'elo': self.elo,
+            'career_match_count': self.career_match_count,
+        }
+    
+    def load_state_dict(self, state):
+        """Restore a snapshot; players unknown to it keep their initial state."""
+        rows = remap_rows(state['player_ids'], self.players.player_ids)
+        self.elo[rows] = state['elo']
+        self.career_match_count[rows] = state['career_match_count']
+
+    def current_ratings(self):
+        """Return (player_ids, overall_elo, career_match_count) for players with matches."""
+        played = self.career_match_count > 0
+        return (
+            self.players.player_ids[played],
+            self.elo[played, OVERALL],
+            self.career_match_count[played],
+        )
+
+
+# Key of a rating row; date is included because player_ratings is
+# partitioned by it
+ELO_KEY_COLUMNS = ('player_id', 'match_id', 'date')
+
+# Columns written per rating row, after the key
+ELO_VALUE_COLUMNS = (
+    ('career_match_number',)
+    + ELOReplayEngine.RATING_COLUMNS
+    + ELOReplayEngine.CONTEXT_COLUMNS
+)
+
+
+def _concat_rows(parts):
+    """Concatenate the column dicts returned by several replay() calls."""
+    return {column: np.concatenate([part[column] for part in parts]) for column in parts[0]}
+
+
+def _interleave(a, b):
+    """Interleave two equal-length arrays: a[0], b[0], a[1], b[1], ..."""
+    out = np.empty(2 * len(a), dtype=np.result_type(a, b))
+    out[0::2] = a
+    out[1::2] = b
+    return out
+
+
 class TennisELOCalculator:
     """Calculate ELO ratings for tennis players"""
     
@@ -116,6 +274,10 @@ class TennisELOCalculator:
         self.career_match_count[winner_id] += 1
         self.career_match_count[loser_id] += 1
         
+        # Match context (pre-match overall ELO; delta from the rounded values)
+        winner_pre = round(winner_overall, 2)
+        loser_pre = round(loser_overall, 2)
+        
         # Prepare rating records for database
         winner_rating = {
             'player_id': winner_id,
@@ -126,6 +288,10 @@ class TennisELOCalculator:
             'elo_clay': round(self.player_elos[winner_id]['clay'], 2),
             'elo_grass': round(self.player_elos[winner_id]['grass'], 2),
             'elo_hard': round(self.player_elos[winner_id]['hard'], 2),
+            'opponent_id': loser_id,
+            'elo_pre_match': winner_pre,
+            'elo_delta': round(round(winner_overall_new, 2) - winner_pre, 2),
+            'opponent_elo_pre_match': loser_pre,
             'model_version': 'v1.0'
         }
         
@@ -138,108 +304,200 @@ class TennisELOCalculator:
             'elo_clay': round(self.player_elos[loser_id]['clay'], 2),
             'elo_grass': round(self.player_elos[loser_id]['grass'], 2),
             'elo_hard': round(self.player_elos[loser_id]['hard'], 2),
+            'opponent_id': winner_id,
+            'elo_pre_match': loser_pre,
+            'elo_delta': round(round(loser_overall_new, 2) - loser_pre, 2),
+            'opponent_elo_pre_match': winner_pre,
             'model_version': 'v1.0'
         }
         
         return [winner_rating, loser_rating]
     
-    def calculate_all_elos(self, batch_size=1000):
+    def calculate_all_elos(self, batch_size=10000, incremental=False, backfill=False, affected=None):
         """
-        Process all matches and calculate ELO ratings.
+        Process matches and calculate ELO ratings.
+        
+        Args:
+            batch_size: Rows per COPY chunk
+            incremental: Resume from the latest checkpoint before the earliest
+                unrated match instead of replaying from 1968
+            backfill: Also treat re-dated matches as affected, and only
+                rewrite rating rows whose values actually changed
+            affected: Earliest affected date, when the caller runs several
+                engines (rating_backfill.main); the caller then deletes the
+                re-dated rows after the last engine
         """
-        logger.info("Starting ELO calculation for all matches...")
+        since = None
+        state = None
+        
+        if incremental:
+            if backfill:
+                pending = backfill_start(self.db, 'elo_rating', affected)
+            else:
+                pending = earliest_pending_date(self.db, 'elo_rating')
+            if pending is None:
+                logger.info("✅ All matches already have ELO ratings - nothing to do")
+                return None
+            since, state = load_latest_checkpoint('elo', on_or_before=pending)
+            if since is None:
+                logger.info("No usable checkpoint found - falling back to a full replay")
+            else:
+                logger.info(f"Resuming from checkpoint {since} (earliest unrated match: {pending})")
+        else:
+            logger.info("Starting ELO calculation for all matches...")
+        
+        # Every later snapshot is about to be rebuilt
+        discard_checkpoints_after('elo', since)
+        
+        # Read the matches to replay into columnar arrays once
+        matches = load_match_columns(self.db, since=since)
+        total_matches = len(matches)
+        logger.info(f"Processing {total_matches:,} matches...")
+        if total_matches == 0:
+            return None
+        
+        player_ids = matches.player_ids()
+        if state is not None:
+            player_ids = np.concatenate([player_ids, state['player_ids']])
+        player_index = PlayerIndex(player_ids)
+        
+        self.engine = ELOReplayEngine(player_index, self.initial_elo, self.base_k)
+        if state is not None:
+            self.engine.load_state_dict(state)
         
-        # Get all matches ordered by date
+        replay_start = datetime.now()
+        rows = self._replay_with_checkpoints(matches)
+        replay_duration = (datetime.now() - replay_start).total_seconds()
+        logger.info(f"Replay took {replay_duration:.1f} seconds")
+        
+        existing = None
+        if backfill and since is not None:
+            existing = fetch_existing_ratings(
+                self.db, ELO_KEY_COLUMNS, ELO_VALUE_COLUMNS, since
+            )
+        self._insert_ratings(rows, batch_size=batch_size, existing=existing)
+        if affected is None:
+            self.db.delete_redated_ratings(since)
+        self.db.refresh_latest_ratings(matches.player_ids() if since is not None else None)
+        self.db.bump_data_version()
+        
+        logger.info(f"✅ ELO calculation complete! Processed {total_matches:,} matches")
+        logger.info(f"✅ Calculated ratings for {len(player_index):,} players")
+        return rows
+    
+    def _replay_with_checkpoints(self, matches):
+        """Replay year by year, saving a checkpoint after each year."""
+        parts = []
+        for start, end, as_of in year_periods(matches.date):
+            parts.append(self.engine.replay(matches.slice(start, end)))
+            save_checkpoint('elo', as_of, self.engine.state_dict())
+        return _concat_rows(parts)
+    
+    def verify_against_reference(self, n_matches=10000):
+        """
+        Replay the first n_matches with both process_match and the array
+        engine and report the largest difference in any stored value.
+        """
+        matches = load_match_columns(self.db)
         with self.db.get_cursor() as cursor:
             cursor.execute("""
                 SELECT match_id, date, player1_id, player2_id, winner_id,
                        surface, tournament_tier
                 FROM matches
                 ORDER BY date, match_id
-            """)
-            
-            matches = cursor.fetchall()
-            total_matches = len(matches)
-            logger.info(f"Processing {total_matches:,} matches...")
-        
-        # Process matches in batches
-        ratings_batch = []
-        processed = 0
-        
-        for match in matches:
-            # Process match and get rating updates
-            rating_updates = self.process_match(match)
-            ratings_batch.extend(rating_updates)
-            
-            # Insert batch when full
-            if len(ratings_batch) >= batch_size:
-                self._insert_ratings_batch(ratings_batch)
-                processed += len(ratings_batch) // 2  # Divide by 2 (winner + loser)
-                logger.info(f"Processed {processed:,} / {total_matches:,} matches "
-                          f"({100 * processed / total_matches:.1f}%)")
-                ratings_batch = []
-        
-        # Insert remaining ratings
-        if ratings_batch:
-            self._insert_ratings_batch(ratings_batch)
-            processed += len(ratings_batch) // 2
-        
-        logger.info(f"✅ ELO calculation complete! Processed {processed:,} matches")
-        logger.info(f"✅ Calculated ratings for {len(self.player_elos):,} players")
+                LIMIT %s
+            """, (n_matches,))
+            reference_matches = cursor.fetchall()
+        
+        reference = []
+        for match in reference_matches:
+            reference.extend(self.process_match(match))
+        
+        n = len(reference_matches)
+        subset = matches.slice(0, n)
+        engine = ELOReplayEngine(
+            PlayerIndex(subset.player_ids()),
+            self.initial_elo, self.base_k
+        )
+        rows = engine.replay(subset)
+        
+        max_diff = 0.0
+        mismatched_keys = 0
+        for i, expected in enumerate(reference):
+            if (expected['player_id'] != rows['player_id'][i]
+                    or expected['match_id'] != rows['match_id'][i]
+                    or expected['career_match_number'] != rows['career_match_number'][i]):
+                mismatched_keys += 1
+            for column in ELOReplayEngine.RATING_COLUMNS:
+                max_diff = max(max_diff, abs(expected[column] - round(float(rows[column][i]), 2)))
+        
+        logger.info(f"Verified {n:,} matches: {mismatched_keys} key mismatches, "
+                    f"max rating difference {max_diff:.4f}")
+        return mismatched_keys == 0 and max_diff == 0.0
     
-    def _insert_ratings_batch(self, ratings_batch):
-        """Insert a batch of ratings into the database."""
-        if not ratings_batch:
-            return
-        
-        with self.db.get_cursor(dict_cursor=False) as cursor:
-            insert_query = """
-                INSERT INTO player_ratings (
-                    player_id, match_id, date, career_match_number,
-                    elo_rating, elo_clay, elo_grass, elo_hard, model_version
-                ) VALUES (
-                    %(player_id)s, %(match_id)s, %(date)s, %(career_match_number)s,
-                    %(elo_rating)s, %(elo_clay)s, %(elo_grass)s, %(elo_hard)s,
-                    %(model_version)s
-                )
-                ON CONFLICT (player_id, match_id) 
-                DO UPDATE SET
-                    elo_rating = EXCLUDED.elo_rating,
-                    elo_clay = EXCLUDED.elo_clay,
-                    elo_grass = EXCLUDED.elo_grass,
-                    elo_hard = EXCLUDED.elo_hard,
-                    model_version = EXCLUDED.model_version
-            """
-            
-            cursor.executemany(insert_query, ratings_batch)
+    def _insert_ratings(self, rows, batch_size=10000, existing=None):
+        """
+        Upsert columnar rating rows in one bulk COPY + INSERT ... ON CONFLICT.
+        
+        Args:
+            rows: Columns returned by ELOReplayEngine.replay
+            batch_size: Rows per COPY chunk
+            existing: Optional {(player_id, match_id, date): stored values} map;
+                when given, rows whose values are unchanged are skipped
+        """
+        player_ids = rows['player_id'].tolist()
+        match_ids = rows['match_id'].tolist()
+        dates = rows['date'].astype(object)
+        match_numbers = rows['career_match_number'].tolist()
+        ratings = [
+            [round(v, 2) for v in rows[column].tolist()]
+            for column in ELOReplayEngine.RATING_COLUMNS
+        ]
+        context = [rows[column].tolist() for column in ELOReplayEngine.CONTEXT_COLUMNS]
+        
+        records = [
+            (player_ids[i], match_ids[i], dates[i], match_numbers[i],
+             ratings[0][i], ratings[1][i], ratings[2][i], ratings[3][i],
+             context[0][i], context[1][i], context[2][i], context[3][i], 'v1.0')
+            for i in range(len(player_ids))
+        ]
+        if existing is not None:
+            records = [
+                record for record in records
+                if is_changed(existing.get(record[:3]), record[3:-1])
+            ]
+            logger.info(f"{len(records):,} of {len(player_ids):,} rating rows changed")
+        
+        self.db.bulk_upsert(
+            'player_ratings',
+            key_columns=ELO_KEY_COLUMNS,
+            value_columns=ELO_VALUE_COLUMNS + ('model_version',),
+            rows=records,
+            chunk_size=batch_size,
+        )
     
     def get_top_rated_players(self, n=10):
         """Get top N players by current ELO rating."""
-        player_ratings = [
-            (player_id, ratings['overall'], self.career_match_count[player_id])
-            for player_id, ratings in self.player_elos.items()
-        ]
-        
-        # Sort by ELO (descending)
-        player_ratings.sort(key=lambda x: x[1], reverse=True)
+        player_ids, elos, match_counts = self.engine.current_ratings()
+        top = np.argsort(-elos, kind='stable')[:n]
         
         # Get player names
         with self.db.get_cursor() as cursor:
-            top_players = []
-            for player_id, elo, matches in player_ratings[:n]:
-                cursor.execute(
-                    "SELECT name FROM players WHERE player_id = %s",
-                    (player_id,)
-                )
-                result = cursor.fetchone()
-                if result:
-                    top_players.append({
-                        'name': result['name'],
-                        'elo': round(elo, 1),
-                        'matches': matches
-                    })
-        
-        return top_players
+            cursor.execute(
+                "SELECT player_id, name FROM players WHERE player_id = ANY(%s)",
+                (player_ids[top].tolist(),)
+            )
+            names = {row['player_id']: row['name'] for row in cursor.fetchall()}
+        
+        return [
+            {
+                'name': names[int(player_ids[i])],
+                'elo': round(float(elos[i]), 1),
+                'matches': int(match_counts[i])
+            }
+            for i in top
+            if int(player_ids[i]) in names
+        ]
 
 
 def main():
@@ -248,15 +506,30 @@ def main():
     logger.info("TENNIS ELO CALCULATOR - Script 1 of 5")
     logger.info("=" * 70)
     
+    parser = argparse.ArgumentParser(description='Calculate ELO ratings for all matches')
+    parser.add_argument('--full', action='store_true',
+                        help='Replay every match from 1968 instead of resuming from the latest checkpoint')
+    parser.add_argument('--backfill', action='store_true',
+                        help='Recompute from the earliest late-arriving match and rewrite only changed rows')
+    parser.add_argument('--verify', type=int, metavar='N',
+                        help='Compare the array engine with process_match on the first N matches and exit')
+    args = parser.parse_args()
+    
     # Initialize database
     db = DatabaseManager()
     
+    if args.verify:
+        identical = TennisELOCalculator(db).verify_against_reference(args.verify)
+        logger.info("✅ Engine output identical to process_match" if identical
+                    else "❌ Engine output differs from process_match")
+        sys.exit(0 if identical else 1)
+    
     # Check if we already have ratings
     with db.get_cursor() as cursor:
         cursor.execute("SELECT COUNT(*) as count FROM player_ratings WHERE elo_rating IS NOT NULL")
         existing = cursor.fetchone()['count']
         
-        if existing > 0:
+        if existing > 0 and args.full:
             logger.warning(f"Found {existing:,} existing ELO ratings in database")
             response = input("Do you want to recalculate? This will overwrite existing data. (yes/no): ")
             if response.lower() != 'yes':
@@ -268,9 +541,12 @@ def main():
     calculator = TennisELOCalculator(db)
     
     start_time = datetime.now()
-    calculator.calculate_all_elos(batch_size=1000)
+    rows = calculator.calculate_all_elos(incremental=not args.full, backfill=args.backfill)
     end_time = datetime.now()
     
+    if rows is None:
+        return
+    
     duration = (end_time - start_time).total_seconds()
     logger.info(f"Calculation took {duration:.1f} seconds ({duration/60:.1f} minutes)")
     
@@ -11,15 +11,35 @@ Reference: http://www.glicko.net/glicko/glicko2.pdf
 Glickman, M. E. (1999). Parameter estimation in large dynamic paired comparison experiments.
 
 This is a SEPARATE rating system from ELO and TSR, stored in its own columns.
+
+Two modes:
+- Per match (default): Glicko2Rating updates both players after every
+  match, with inactivity RD growth but a fixed volatility.
+- Rating periods (--rating-periods): Glicko2PeriodEngine groups matches
+  into 30-day rating periods and updates every player's rating, RD and
+  volatility once per period, as in Glickman's paper, including the
+  Illinois iteration for the new volatility. All players of a period are
+  updated together with NumPy, so there is no per-match Python work.
 """
 
+import argparse
 import logging
 from datetime import datetime
 import math
 import sys
-sys.path.insert(0, '/Users/razaool/tennis-career-tracker')
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
 from database.db_manager import DatabaseManager
 from config import TOURNAMENT_TIERS, INITIAL_ELO
+from scripts.match_stream import SURFACE_INDEX, PlayerIndex, load_match_columns
+from scripts.rating_checkpoints import (
+    save_checkpoint, load_latest_checkpoint, discard_checkpoints_after, earliest_pending_date,
+    year_periods, remap_rows
+)
+from scripts.rating_backfill import backfill_start, fetch_existing_ratings, filter_changed
 
 # Configure logging
 logging.basicConfig(
@@ -47,10 +67,44 @@ class Glicko2Rating:
     TAU = 0.5  # System constant constraining volatility changes
     EPSILON = 0.000001  # Convergence tolerance
     
+    # Per-player numeric state, in checkpoint column order
+    STATE_FIELDS = (
+        'rating', 'rd', 'volatility',
+        'rating_clay', 'rd_clay', 'volatility_clay',
+        'rating_grass', 'rd_grass', 'volatility_grass',
+        'rating_hard', 'rd_hard', 'volatility_hard',
+    )
+    
     def __init__(self):
         """Initialize the rating system."""
         self.player_ratings = {}  # player_id -> {rating, rd, volatility, last_date}
     
+    def state_dict(self):
+        """Snapshot of all player state as NumPy arrays (see rating_checkpoints)."""
+        player_ids = np.array(sorted(self.player_ratings), dtype=np.int64)
+        players = [self.player_ratings[pid] for pid in player_ids.tolist()]
+        return {
+            'player_ids': player_ids,
+            'values': np.array(
+                [[p[field] for field in self.STATE_FIELDS] for p in players],
+                dtype=np.float64
+            ).reshape(len(players), len(self.STATE_FIELDS)),
+            'last_date': np.array(
+                [p['last_date'] if p['last_date'] is not None else 'NaT' for p in players],
+                dtype='datetime64[D]'
+            ),
+        }
+    
+    def load_state_dict(self, state):
+        """Restore a snapshot produced by state_dict()."""
+        self.player_ratings = {}
+        last_dates = state['last_date'].astype(object)
+        for player_id, values, last_date in zip(state['player_ids'].tolist(),
+                                                state['values'].tolist(), last_dates):
+            player = dict(zip(self.STATE_FIELDS, values))
+            player['last_date'] = last_date
+            self.player_ratings[player_id] = player
+    
     def get_or_create_player(self, player_id):
         """Get player rating or initialize if new."""
         if player_id not in self.player_ratings:
@@ -229,8 +283,254 @@ class Glicko2Rating:
         return player
 
 
-def calculate_glicko2_ratings():
-    """Calculate Glicko-2 ratings for all matches."""
+GLICKO2_COLUMNS = (
+    'glicko2_rating', 'glicko2_rd', 'glicko2_volatility',
+    'glicko2_clay', 'glicko2_grass', 'glicko2_hard',
+)
+
+# Glicko-2 scale factor (400 / ln 10)
+GLICKO2_SCALE = 173.7178
+
+# Rating periods restart every Jan 1 so that year boundaries, where
+# checkpoints are taken, are always period boundaries. The last period of
+# a year absorbs the remaining 5-6 days.
+PERIOD_DAYS = 30
+PERIODS_PER_YEAR = 365 // PERIOD_DAYS
+
+# Safety cap on Illinois iterations (it normally converges in < 10)
+VOLATILITY_MAX_ITERATIONS = 100
+
+
+def rating_period_index(dates):
+    """Absolute rating-period number of each date in a datetime64[D] array."""
+    years = dates.astype('datetime64[Y]')
+    day_of_year = (dates - years.astype('datetime64[D]')).astype(np.int64)
+    period_in_year = np.minimum(day_of_year // PERIOD_DAYS, PERIODS_PER_YEAR - 1)
+    return years.astype(np.int64) * PERIODS_PER_YEAR + period_in_year
+
+
+def _volatility_f(x, a, phi2, v, delta2, tau):
+    """f(x) from step 5 of Glickman's algorithm; its root is ln(sigma'^2)."""
+    ex = np.exp(x)
+    return ex * (delta2 - phi2 - v - ex) / (2.0 * (phi2 + v + ex) ** 2) - (x - a) / (tau * tau)
+
+
+def glicko2_volatility(sigma, phi, v, delta, tau=Glicko2Rating.TAU,
+                       epsilon=Glicko2Rating.EPSILON):
+    """
+    New volatility for arrays of players (step 5, Illinois algorithm).
+    
+    Every player iterates until their own bracket is narrower than
+    epsilon; converged players drop out of the working set.
+    
+    Args:
+        sigma, phi: Current volatility and deviation (Glicko-2 scale)
+        v: Estimated variance of the rating from the period's games
+        delta: Estimated improvement in rating
+    
+    Returns:
+        New volatility per player
+    """
+    a = np.log(sigma * sigma)
+    phi2 = phi * phi
+    delta2 = delta * delta
+    
+    def f(x, idx):
+        return _volatility_f(x, a[idx], phi2[idx], v[idx], delta2[idx], tau)
+    
+    # Initial bracket [A, B]
+    A = a.copy()
+    large = delta2 > phi2 + v
+    B = np.where(large, np.log(np.where(large, delta2 - phi2 - v, 1.0)), a - tau)
+    
+    # For the other players step B down by tau until f(B) >= 0
+    idx = np.flatnonzero(~large)
+    while idx.size:
+        idx = idx[f(B[idx], idx) < 0]
+        B[idx] -= tau
+    
+    everyone = np.arange(len(a))
+    fA = f(A, everyone)
+    fB = f(B, everyone)
+    
+    idx = np.flatnonzero(np.abs(B - A) > epsilon)
+    for _ in range(VOLATILITY_MAX_ITERATIONS):
+        if not idx.size:
+            break
+        A_i, B_i, fA_i, fB_i = A[idx], B[idx], fA[idx], fB[idx]
+        C = A_i + (A_i - B_i) * fA_i / (fB_i - fA_i)
+        fC = f(C, idx)
+        
+        # Illinois step: keep the bracket, halve fA if the sign didn't change
+        flip = fC * fB_i <= 0
+        A[idx] = np.where(flip, B_i, A_i)
+        fA[idx] = np.where(flip, fB_i, fA_i / 2.0)
+        B[idx] = C
+        fB[idx] = fC
+        
+        idx = idx[np.abs(B[idx] - A[idx]) > epsilon]
+    
+    return np.exp(A / 2.0)
+
+
+class Glicko2PeriodEngine:
+    """
+    Glicko-2 with rating periods, vectorized across players.
+    
+    Ratings live in (n_players, 4) arrays on the Glicko-2 scale: column 0
+    is the overall rating, columns 1-3 clay, grass and hard (each its own
+    rating with its own RD and volatility; carpet matches only count for
+    the overall rating).
+    
+    For every period, each player's games are rated against the opponents'
+    ratings at the start of the period. A game's contribution to v and to
+    the rating change is multiplied by its tournament weight, which for a
+    single game is the same v / weight as the per-match mode. Players
+    without games in a period only have their RD grow by one period of
+    volatility (capped at the initial RD).
+    
+    Every match row is given its players' ratings at the end of the match's
+    period.
+    """
+    
+    _COLUMN_SURFACES = (None, 'clay', 'grass', 'hard')
+    
+    def __init__(self, player_index, tau=Glicko2Rating.TAU):
+        self.players = player_index
+        self.tau = tau
+        n = len(player_index)
+        shape = (n, len(self._COLUMN_SURFACES))
+        self.mu = np.full(shape, (Glicko2Rating.INITIAL_RATING - 1500) / GLICKO2_SCALE)
+        self.phi = np.full(shape, Glicko2Rating.INITIAL_RD / GLICKO2_SCALE)
+        self.sigma = np.full(shape, Glicko2Rating.INITIAL_VOLATILITY)
+        self.max_phi = Glicko2Rating.INITIAL_RD / GLICKO2_SCALE
+        # Last rating period processed
+        self.period = None
+    
+    def replay(self, matches):
+        """
+        Rate matches (already in chronological order), one period at a time.
+        
+        Args:
+            matches: MatchColumns; must not start in a period that was
+                already processed
+        
+        Returns:
+            Dict of GLICKO2_COLUMNS, two rows per match (winner at 2*i,
+            loser at 2*i + 1)
+        """
+        n = len(matches)
+        w = self.players.index_of(matches.winner_id)
+        l = self.players.index_of(matches.loser_id)
+        periods = rating_period_index(matches.date)
+        
+        out = np.empty((2 * n, len(GLICKO2_COLUMNS)))
+        cuts = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+        bounds = np.concatenate([[0], cuts, [n]]).tolist()
+        
+        for s, e in zip(bounds[:-1], bounds[1:]):
+            self._start_period(int(periods[s]))
+            for col, surface in enumerate(self._COLUMN_SURFACES):
+                if surface is None:
+                    self._rate_period(col, w[s:e], l[s:e], matches.tier_weight[s:e])
+                else:
+                    on_surface = matches.surface[s:e] == SURFACE_INDEX[surface]
+                    self._rate_period(col, w[s:e][on_surface], l[s:e][on_surface],
+                                      matches.tier_weight[s:e][on_surface])
+            
+            out[2 * s:2 * e:2] = self._output(w[s:e])
+            out[2 * s + 1:2 * e:2] = self._output(l[s:e])
+        
+        return {column: out[:, j] for j, column in enumerate(GLICKO2_COLUMNS)}
+    
+    def _start_period(self, period):
+        """Grow every RD for the empty periods since the last one processed."""
+        if self.period is not None:
+            if period <= self.period:
+                raise ValueError(f"Rating period {period} was already processed")
+            skipped = period - self.period - 1
+            if skipped:
+                self.phi = np.minimum(
+                    np.sqrt(self.phi ** 2 + skipped * self.sigma ** 2), self.max_phi
+                )
+        self.period = period
+    
+    def _rate_period(self, col, winners, losers, weights):
+        """Steps 3-8 of Glickman's algorithm for one rating column."""
+        mu, phi, sigma = self.mu[:, col], self.phi[:, col], self.sigma[:, col]
+        
+        # Players without games: RD grows by one period
+        phi_idle = np.minimum(np.sqrt(phi ** 2 + sigma ** 2), self.max_phi)
+        if len(winners) == 0:
+            self.phi[:, col] = phi_idle
+            return
+        
+        # One game per player per match, against start-of-period ratings
+        player = np.concatenate([winners, losers])
+        opponent = np.concatenate([losers, winners])
+        score = np.concatenate([np.ones(len(winners)), np.zeros(len(losers))])
+        weight = np.concatenate([weights, weights])
+        
+        g = 1.0 / np.sqrt(1.0 + 3.0 * phi[opponent] ** 2 / np.pi ** 2)
+        expected = 1.0 / (1.0 + np.exp(-g * (mu[player] - mu[opponent])))
+        
+        rated, game_player = np.unique(player, return_inverse=True)
+        v = 1.0 / np.bincount(game_player, weight * g * g * expected * (1.0 - expected))
+        improvement = np.bincount(game_player, weight * g * (score - expected))
+        delta = v * improvement
+        
+        sigma_new = glicko2_volatility(sigma[rated], phi[rated], v, delta, self.tau)
+        phi_star = np.sqrt(phi[rated] ** 2 + sigma_new ** 2)
+        phi_new = 1.0 / np.sqrt(1.0 / phi_star ** 2 + 1.0 / v)
+        mu_new = mu[rated] + phi_new ** 2 * improvement
+        
+        self.phi[:, col] = phi_idle
+        self.mu[rated, col] = mu_new
+        self.phi[rated, col] = phi_new
+        self.sigma[rated, col] = sigma_new
+    
+    def _output(self, idx):
+        """GLICKO2_COLUMNS values (ELO scale) for players idx."""
+        ratings = self.mu[idx] * GLICKO2_SCALE + 1500
+        return np.column_stack([
+            ratings[:, 0],
+            self.phi[idx, 0] * GLICKO2_SCALE,
+            self.sigma[idx, 0],
+            ratings[:, 1], ratings[:, 2], ratings[:, 3],
+        ])
+    
+    def state_dict(self):
+        """Snapshot of all player state for rating_checkpoints."""
+        return {
+            'player_ids': self.players.player_ids,
+            'mu': self.mu,
+            'phi': self.phi,
+            'sigma': self.sigma,
+            # Empty before the first period (period numbers can be negative)
+            'period': np.array([] if self.period is None else [self.period], dtype=np.int64),
+        }
+    
+    def load_state_dict(self, state):
+        """Restore a snapshot; players unknown to it keep their initial state."""
+        rows = remap_rows(state['player_ids'], self.players.player_ids)
+        self.mu[rows] = state['mu']
+        self.phi[rows] = state['phi']
+        self.sigma[rows] = state['sigma']
+        self.period = int(state['period'][0]) if len(state['period']) else None
+
+
+def calculate_glicko2_ratings(incremental=False, backfill=False, affected=None):
+    """
+    Calculate Glicko-2 ratings for all matches.
+    
+    Args:
+        incremental: Resume from the latest checkpoint before the earliest
+            unrated match instead of replaying from 1968
+        backfill: Also treat re-dated matches as affected, and only
+            rewrite rating rows whose values actually changed
+        affected: Earliest affected date computed by rating_backfill.main
+            (re-dated rows are gone from view once ELO has run)
+    """
     print("=" * 80)
     print("GLICKO-2 RATING CALCULATION")
     print("=" * 80)
@@ -242,25 +542,58 @@ def calculate_glicko2_ratings():
     calculator = Glicko2Rating()
     start_time = datetime.now()
     
-    # Get all matches chronologically
-    print("\n📊 Fetching all matches...")
+    since = None
+    if incremental:
+        if backfill:
+            pending = backfill_start(db, 'glicko2_rating', affected)
+        else:
+            pending = earliest_pending_date(db, 'glicko2_rating')
+        if pending is None:
+            print("\n✅ All rating rows already have Glicko-2 values - nothing to do")
+            return
+        since, state = load_latest_checkpoint('glicko2', on_or_before=pending)
+        if since is None:
+            print("\nNo usable checkpoint found - falling back to a full replay")
+        else:
+            calculator.load_state_dict(state)
+            print(f"\n♻️  Resuming from checkpoint {since} (earliest unrated match: {pending})")
+    
+    # Every later snapshot is about to be rebuilt
+    discard_checkpoints_after('glicko2', since)
+    
+    existing = None
+    if backfill and since is not None:
+        existing = fetch_existing_ratings(db, ('match_id', 'player_id'), GLICKO2_COLUMNS, since)
+    
+    # Get matches chronologically
+    print("\n📊 Fetching matches...")
+    query = """
+        SELECT 
+            match_id,
+            date,
+            player1_id,
+            player2_id,
+            winner_id,
+            tournament_tier,
+            surface
+        FROM matches
+    """
+    params = None
+    if since is not None:
+        query += " WHERE date >= %s"
+        params = (str(since),)
+    query += " ORDER BY date, match_id"
+    
     with db.get_cursor() as cursor:
-        cursor.execute("""
-            SELECT 
-                match_id,
-                date,
-                player1_id,
-                player2_id,
-                winner_id,
-                tournament_tier,
-                surface
-            FROM matches
-            ORDER BY date, match_id
-        """)
+        cursor.execute(query, params)
         
         matches = cursor.fetchall()
         total_matches = len(matches)
     
+    if total_matches == 0:
+        print("✅ No matches to process")
+        return
+    
     print(f"✅ Found {total_matches:,} matches\n")
     print("Processing matches...")
     print("=" * 80)
@@ -268,10 +601,18 @@ def calculate_glicko2_ratings():
     print("=" * 80)
     
     ratings_to_insert = []
-    batch_size = 10000
+    batch_size = 100000
     processed = 0
+    written = 0
+    current_year = None
     
     for match in matches:
+        # Snapshot player state at the start of every year
+        if match['date'].year != current_year:
+            if current_year is not None:
+                save_checkpoint('glicko2', f"{match['date'].year}-01-01", calculator.state_dict())
+            current_year = match['date'].year
+        
         # Determine winner and loser
         winner_id = match['winner_id']
         loser_id = match['player2_id'] if winner_id == match['player1_id'] else match['player1_id']
@@ -288,6 +629,7 @@ def calculate_glicko2_ratings():
         # Store both players' ratings at this match
         ratings_to_insert.append({
             'match_id': match['match_id'],
+            'date': match['date'],
             'player_id': winner_id,
             'glicko2_rating': winner_rating['rating'],
             'glicko2_rd': winner_rating['rd'],
@@ -299,6 +641,7 @@ def calculate_glicko2_ratings():
         
         ratings_to_insert.append({
             'match_id': match['match_id'],
+            'date': match['date'],
             'player_id': loser_id,
             'glicko2_rating': loser_rating['rating'],
             'glicko2_rd': loser_rating['rd'],
@@ -312,7 +655,12 @@ def calculate_glicko2_ratings():
         
         # Batch update database
         if len(ratings_to_insert) >= batch_size:
+            if existing is not None:
+                ratings_to_insert = filter_changed(
+                    ratings_to_insert, existing, ('match_id', 'player_id'), GLICKO2_COLUMNS
+                )
             _update_database_batch(db, ratings_to_insert)
+            written += len(ratings_to_insert)
             ratings_to_insert = []
         
         # Progress every 50k matches
@@ -328,8 +676,16 @@ def calculate_glicko2_ratings():
                   f"{remaining/60:>6.1f} min")
     
     # Final batch
+    if existing is not None:
+        ratings_to_insert = filter_changed(
+            ratings_to_insert, existing, ('match_id', 'player_id'), GLICKO2_COLUMNS
+        )
     if ratings_to_insert:
         _update_database_batch(db, ratings_to_insert)
+        written += len(ratings_to_insert)
+    
+    # Snapshot the end state so the next run only processes newer matches
+    save_checkpoint('glicko2', np.datetime64(matches[-1]['date'], 'D') + 1, calculator.state_dict())
     
     # Final update
     total_duration = (datetime.now() - start_time).total_seconds()
@@ -338,11 +694,15 @@ def calculate_glicko2_ratings():
     print("✅ GLICKO-2 CALCULATION COMPLETE!")
     print("=" * 80)
     print(f"Matches processed:  {processed:,}")
+    print(f"Rows rewritten:     {written:,}")
     print(f"Players rated:      {len(calculator.player_ratings):,}")
     print(f"Total time:         {total_duration:.1f} seconds ({total_duration/60:.1f} minutes)")
     print(f"Average rate:       {processed/total_duration:.1f} matches/second")
     print("=" * 80)
     
+    db.refresh_latest_ratings()
+    db.bump_data_version()
+    
     # Show top players
     _show_top_players_glicko2(db)
     
@@ -350,30 +710,104 @@ def calculate_glicko2_ratings():
     _compare_glicko2_vs_elo(db)
 
 
+def calculate_glicko2_rating_periods(incremental=False):
+    """
+    Calculate Glicko-2 ratings with 30-day rating periods (Glicko2PeriodEngine).
+    
+    Checkpoints are kept separately from the per-match mode and only taken
+    at year starts, so a resumed run never starts inside a rating period.
+    
+    Args:
+        incremental: Resume from the latest year-start checkpoint before
+            the earliest unrated match instead of replaying from 1968
+    """
+    print("=" * 80)
+    print("GLICKO-2 RATING CALCULATION - RATING PERIODS")
+    print("=" * 80)
+    print(f"\nMatches grouped into {PERIOD_DAYS}-day rating periods; rating, RD and")
+    print("volatility updated once per period (Illinois volatility iteration)")
+    print("=" * 80)
+    
+    db = DatabaseManager()
+    start_time = datetime.now()
+    
+    since, state = None, None
+    if incremental:
+        pending = earliest_pending_date(db, 'glicko2_rating')
+        if pending is None:
+            print("\n✅ All rating rows already have Glicko-2 values - nothing to do")
+            return
+        since, state = load_latest_checkpoint('glicko2_periods', on_or_before=pending)
+        if since is None:
+            print("\nNo usable checkpoint found - falling back to a full replay")
+        else:
+            print(f"\n♻️  Resuming from checkpoint {since} (earliest unrated match: {pending})")
+    
+    # Every later snapshot is about to be rebuilt
+    discard_checkpoints_after('glicko2_periods', since)
+    
+    print("\n📊 Fetching matches...")
+    matches = load_match_columns(db, since=since)
+    total_matches = len(matches)
+    if total_matches == 0:
+        print("✅ No matches to process")
+        return
+    print(f"✅ Found {total_matches:,} matches\n")
+    
+    player_ids = [matches.player_ids()]
+    if state is not None:
+        player_ids.append(state['player_ids'])
+    engine = Glicko2PeriodEngine(PlayerIndex(np.concatenate(player_ids)))
+    if state is not None:
+        engine.load_state_dict(state)
+    
+    print(f"{'Year':<8} {'Matches':<20} {'Rows written':<15}")
+    print("=" * 80)
+    
+    written = 0
+    for start, end, as_of in year_periods(matches.date):
+        rows = engine.replay(matches.slice(start, end))
+        
+        match_ids = np.repeat(matches.match_id[start:end], 2)
+        dates = np.repeat(matches.date[start:end], 2)
+        player_ids = np.column_stack([matches.winner_id[start:end],
+                                      matches.loser_id[start:end]]).ravel()
+        written += db.bulk_update(
+            'player_ratings', ('match_id', 'player_id', 'date'), GLICKO2_COLUMNS,
+            zip(match_ids.tolist(), player_ids.tolist(), dates.tolist(),
+                *(rows[c].tolist() for c in GLICKO2_COLUMNS))
+        )
+        
+        # The final year may end inside a rating period - no checkpoint there
+        if end < total_matches:
+            save_checkpoint('glicko2_periods', as_of, engine.state_dict())
+        
+        print(f"{str(matches.date[start].astype('datetime64[Y]')):<8} "
+              f"{end:>9,}/{total_matches:<9,}  {written:>12,}")
+    
+    total_duration = (datetime.now() - start_time).total_seconds()
+    
+    print("=" * 80)
+    print("✅ GLICKO-2 CALCULATION COMPLETE!")
+    print("=" * 80)
+    print(f"Matches processed:  {total_matches:,}")
+    print(f"Rows written:       {written:,}")
+    print(f"Total time:         {total_duration:.1f} seconds ({total_duration/60:.1f} minutes)")
+    print("=" * 80)
+    
+    db.refresh_latest_ratings()
+    db.bump_data_version()
+    _show_top_players_glicko2(db)
+    _compare_glicko2_vs_elo(db)
+
+
 def _update_database_batch(db, ratings):
-    """Update Glicko-2 ratings in database."""
-    with db.get_cursor() as cursor:
-        for rating in ratings:
-            cursor.execute("""
-                UPDATE player_ratings
-                SET 
-                    glicko2_rating = %s,
-                    glicko2_rd = %s,
-                    glicko2_volatility = %s,
-                    glicko2_clay = %s,
-                    glicko2_grass = %s,
-                    glicko2_hard = %s
-                WHERE match_id = %s AND player_id = %s
-            """, (
-                rating['glicko2_rating'],
-                rating['glicko2_rd'],
-                rating['glicko2_volatility'],
-                rating['glicko2_clay'],
-                rating['glicko2_grass'],
-                rating['glicko2_hard'],
-                rating['match_id'],
-                rating['player_id']
-            ))
+    """Update Glicko-2 ratings in database (one bulk COPY + UPDATE)."""
+    key_columns = ('match_id', 'player_id', 'date')
+    db.bulk_update(
+        'player_ratings', key_columns, GLICKO2_COLUMNS,
+        (tuple(rating[c] for c in key_columns + GLICKO2_COLUMNS) for rating in ratings)
+    )
 
 
 def _show_top_players_glicko2(db):
@@ -443,8 +877,22 @@ if __name__ == '__main__':
     print("This will create a third independent rating system alongside ELO and TSR")
     print()
     
+    parser = argparse.ArgumentParser(description='Calculate Glicko-2 ratings')
+    parser.add_argument('--full', action='store_true',
+                        help='Replay every match from 1968 instead of resuming from the latest checkpoint')
+    parser.add_argument('--backfill', action='store_true',
+                        help='Recompute from the earliest late-arriving match and rewrite only changed rows')
+    parser.add_argument('--rating-periods', action='store_true',
+                        help=f'Update once per {PERIOD_DAYS}-day rating period with the full volatility step')
+    args = parser.parse_args()
+    if args.rating_periods and args.backfill:
+        parser.error('--backfill is only supported in per-match mode')
+    
     try:
-        calculate_glicko2_ratings()
+        if args.rating_periods:
+            calculate_glicko2_rating_periods(incremental=not args.full)
+        else:
+            calculate_glicko2_ratings(incremental=not args.full, backfill=args.backfill)
         
         print("\n" + "=" * 80)
         print("✅ GLICKO-2 IMPLEMENTATION COMPLETE!")
@@ -97,23 +97,15 @@ def compare_ranking_methods(db):
     
     with db.get_cursor() as cursor:
         cursor.execute("""
-            WITH latest_ratings AS (
-                SELECT 
-                    player_id,
-                    MAX(career_match_number) as max_match
-                FROM player_ratings
-                GROUP BY player_id
-            )
             SELECT 
                 p.name,
-                pr.elo_rating as current_elo,
-                pr.date as last_match_date,
-                pr.career_match_number as total_matches
-            FROM player_ratings pr
-            JOIN latest_ratings lr ON pr.player_id = lr.player_id 
-                AND pr.career_match_number = lr.max_match
-            JOIN players p ON pr.player_id = p.player_id
-            ORDER BY pr.elo_rating DESC
+                plr.elo_rating as current_elo,
+                plr.last_match as last_match_date,
+                plr.career_match_number as total_matches
+            FROM player_latest_ratings plr
+            JOIN players p ON plr.player_id = p.player_id
+            WHERE plr.elo_rating IS NOT NULL
+            ORDER BY plr.elo_rating DESC
             LIMIT 10
         """)
         
@@ -8,15 +8,25 @@ This script calculates contextual performance metrics:
 3. Tournament Success Score - Weighted title/finals performance
 
 These metrics add context to raw TSR ratings.
+
+The scalar functions below define each metric for one player and match
+(rating_pipeline.py uses them through update_metrics). The full rebuild
+computes the same values for every player at once with vectorized
+rolling windows over offset-indexed arrays (see MetricHistory).
 """
 
 import logging
 from datetime import datetime
 from collections import deque
 import sys
-sys.path.insert(0, '/Users/razaool/tennis-career-tracker')
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
 from database.db_manager import DatabaseManager
 from config import TOURNAMENT_TIERS
+from scripts.player_shards import group_bounds
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +35,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+METRIC_COLUMNS = ('form_index', 'big_match_rating', 'tournament_success_score')
+
 
 def calculate_form_index(recent_results: deque, window_size: int = 20) -> float:
     """
@@ -162,10 +174,281 @@ def calculate_tournament_success_score(
     return min(score / 10.0, 100.0)
 
 
+def new_metric_state() -> dict:
+    """Rolling windows for a player with no matches yet."""
+    return {
+        'recent_results': deque(maxlen=20),  # Rolling window of 20 matches
+        'big_match_ratings': deque(maxlen=50),  # Track recent big match performance
+        'tournament_results': deque(maxlen=20),  # Track recent tournament finishes
+    }
+
+
+def update_metrics(
+    state: dict,
+    won: bool,
+    player_elo: float,
+    opponent_elo: float,
+    tournament_tier: str,
+    round_name: str,
+    match_date: datetime.date
+) -> tuple:
+    """
+    Advance a player's rolling windows by one match and compute its metrics.
+    
+    Args:
+        state: The player's windows (see new_metric_state), updated in place
+        won: Whether the player won the match
+        player_elo: Player's ELO before the match
+        opponent_elo: Opponent's ELO before the match (None if unknown)
+        tournament_tier: Tournament tier
+        round_name: Round of the match
+        match_date: Date of the match
+        
+    Returns:
+        (form_index, big_match_rating, tournament_success_score)
+    """
+    match_result = 1.0 if won else 0.0
+    
+    # Update recent results
+    state['recent_results'].append(match_result)
+    
+    # Calculate form index
+    form_index = calculate_form_index(state['recent_results'])
+    
+    # Calculate big match rating
+    big_match_contribution = calculate_big_match_rating(
+        player_elo,
+        opponent_elo or 1500.0,
+        match_result,
+        tournament_tier
+    )
+    
+    big_match_ratings = state['big_match_ratings']
+    if big_match_contribution is not None:
+        big_match_ratings.append(big_match_contribution)
+    
+    # Average big match rating over recent matches
+    big_match_rating = (
+        sum(big_match_ratings) / len(big_match_ratings)
+        if big_match_ratings else 0.0
+    )
+    
+    # Track tournament results (finals/semis/etc)
+    if round_name in ['F', 'SF', 'QF', 'R16']:
+        state['tournament_results'].append((tournament_tier, round_name, match_date))
+    
+    # Calculate tournament success score
+    tournament_score = calculate_tournament_success_score(
+        list(state['tournament_results']),
+        match_date
+    )
+    
+    return form_index, big_match_rating, tournament_score
+
+
+# Rolling window lengths (matches, big matches, tournament finishes)
+FORM_WINDOW = 20
+BIG_MATCH_WINDOW = 50
+FINISH_WINDOW = 20
+
+# Opponents at or above this ELO make a "big match"
+BIG_MATCH_ELO = 2300
+
+# Rounds that count as a tournament finish, with their value
+FINISH_ROUND_VALUES = {'F': 100, 'SF': 75, 'QF': 50, 'R16': 30}
+
+# Rows per block when evaluating the tournament-success window matrix
+FINISH_BLOCK_ROWS = 250000
+
+
+class MetricHistory:
+    """
+    Every player's match history as flat NumPy arrays.
+    
+    Rows are sorted by (player, date, match) and player j owns rows
+    [offsets[j], offsets[j+1]), so ragged per-player histories can be
+    processed with whole-array operations.
+    """
+    
+    def __init__(self, rating_id, player_id, date, player_elo, opponent_elo,
+                 won, tier_weight, finish_value):
+        self.rating_id = rating_id
+        self.player_id = player_id
+        self.date = date
+        self.player_elo = player_elo
+        self.opponent_elo = opponent_elo
+        self.won = won
+        self.tier_weight = tier_weight
+        self.finish_value = finish_value  # 0 unless the round counts as a finish
+        self.offsets = group_bounds(player_id)
+    
+    def __len__(self):
+        return len(self.rating_id)
+    
+    def group_start(self):
+        """Index of each row's player's first row."""
+        return np.repeat(self.offsets[:-1], np.diff(self.offsets))
+
+
+def load_metric_history(db: DatabaseManager) -> MetricHistory:
+    """
+    Read every rated match once, streamed through a server-side cursor.
+    
+    Both ELOs are the pre-match values stored on the row itself, so no
+    join on the opponent's rating row is needed.
+    """
+    columns = {name: [] for name in (
+        'rating_id', 'player_id', 'date', 'player_elo', 'opponent_elo',
+        'won', 'tier_weight', 'finish_value'
+    )}
+    
+    with db.get_cursor(dict_cursor=False, name='metric_history') as cursor:
+        cursor.execute("""
+            SELECT 
+                pr.rating_id,
+                pr.player_id,
+                pr.date,
+                COALESCE(pr.elo_pre_match, pr.elo_rating),
+                pr.opponent_elo_pre_match,
+                m.winner_id = pr.player_id,
+                m.tournament_tier,
+                m.round
+            FROM player_ratings pr
+            JOIN matches m ON pr.match_id = m.match_id
+            WHERE pr.tsr_rating IS NOT NULL
+            ORDER BY pr.player_id, pr.date, pr.match_id
+        """)
+        
+        while True:
+            rows = cursor.fetchmany(cursor.itersize)
+            if not rows:
+                break
+            
+            rating_id, player_id, date, player_elo, opponent_elo, won, tier, round_name = zip(*rows)
+            columns['rating_id'].append(np.array(rating_id, dtype=np.int64))
+            columns['player_id'].append(np.array(player_id, dtype=np.int64))
+            columns['date'].append(np.array(date, dtype='datetime64[D]'))
+            columns['player_elo'].append(np.array(player_elo, dtype=np.float64))
+            columns['opponent_elo'].append(
+                np.array([e if e else 1500.0 for e in opponent_elo], dtype=np.float64)
+            )
+            columns['won'].append(np.array(won, dtype=bool))
+            columns['tier_weight'].append(np.array(
+                [TOURNAMENT_TIERS[t]['weight'] if t in TOURNAMENT_TIERS else 1.0 for t in tier],
+                dtype=np.float64
+            ))
+            columns['finish_value'].append(np.array(
+                [FINISH_ROUND_VALUES.get(r, 0) for r in round_name], dtype=np.float64
+            ))
+    
+    return MetricHistory(**{
+        name: np.concatenate(parts) if parts else np.empty(0)
+        for name, parts in columns.items()
+    })
+
+
+def rolling_form_index(history: MetricHistory) -> np.ndarray:
+    """
+    calculate_form_index over each row's last FORM_WINDOW results.
+    
+    With n results in the window (oldest first, i = 0..n-1) the weights are
+    0.5 + 0.5 * i / (n - 1), which sum to 0.75 * n, so the weighted sum only
+    needs prefix sums of r and of k * r.
+    """
+    n_rows = len(history)
+    pos = np.arange(n_rows)
+    start = np.maximum(history.group_start(), pos - FORM_WINDOW + 1)
+    n = pos - start + 1
+    
+    results = history.won.astype(np.float64)
+    sum_r = np.concatenate([[0.0], np.cumsum(results)])
+    sum_kr = np.concatenate([[0.0], np.cumsum(pos * results)])
+    
+    wins = sum_r[pos + 1] - sum_r[start]
+    # sum of (k - start) * r_k over the window
+    ranked = (sum_kr[pos + 1] - sum_kr[start]) - start * wins
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weighted = (0.5 * wins + 0.5 * ranked / (n - 1)) / (0.75 * n)
+    return np.where(n > 1, weighted, results) * 100.0
+
+
+def rolling_big_match_rating(history: MetricHistory) -> np.ndarray:
+    """
+    Mean of the last BIG_MATCH_WINDOW big-match contributions per row
+    (see calculate_big_match_rating); 0 before a player's first big match.
+    """
+    opponent_elo = history.opponent_elo
+    is_big = opponent_elo >= BIG_MATCH_ELO
+    
+    expected = 1.0 / (1.0 + 10 ** ((opponent_elo - history.player_elo) / 400.0))
+    performance = history.won - expected
+    opponent_factor = np.minimum(opponent_elo / 3000.0, 1.5)
+    contribution = performance * opponent_factor * history.tier_weight * 100
+    
+    # Prefix sums over the big matches only, indexed by running count
+    big_sum = np.concatenate([[0.0], np.cumsum(contribution[is_big])])
+    big_count = np.cumsum(is_big)
+    count_before_player = big_count[history.group_start()] - is_big[history.group_start()]
+    
+    count = np.minimum(big_count - count_before_player, BIG_MATCH_WINDOW)
+    total = big_sum[big_count] - big_sum[big_count - count]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(count > 0, total / np.maximum(count, 1), 0.0)
+
+
+def rolling_tournament_success(history: MetricHistory) -> np.ndarray:
+    """
+    calculate_tournament_success_score over each row's last FINISH_WINDOW
+    finishes. Recency decay depends on the current row's date, so the
+    window is evaluated as a (rows, FINISH_WINDOW) matrix, in blocks.
+    """
+    is_finish = history.finish_value > 0
+    finish_value = (history.finish_value * history.tier_weight)[is_finish]
+    finish_day = history.date.astype(np.int64)[is_finish]
+    
+    finish_count = np.cumsum(is_finish)
+    group_start = history.group_start()
+    count_before_player = finish_count[group_start] - is_finish[group_start]
+    day = history.date.astype(np.int64)
+    
+    scores = np.empty(len(history))
+    lags = np.arange(FINISH_WINDOW)
+    for block in range(0, len(history), FINISH_BLOCK_ROWS):
+        rows = slice(block, block + FINISH_BLOCK_ROWS)
+        # Index of the j-th most recent finish for every row in the block
+        idx = finish_count[rows, None] - 1 - lags[None, :]
+        valid = idx >= count_before_player[rows, None]
+        idx = np.where(valid, idx, 0)
+        
+        if len(finish_value):
+            days_ago = day[rows, None] - finish_day[idx]
+            weighted = finish_value[idx] / (1.0 + days_ago / 365.0)
+            score = np.where(valid, weighted, 0.0).sum(axis=1)
+        else:
+            score = np.zeros(len(day[rows]))
+        scores[rows] = np.minimum(score / 10.0, 100.0)
+    
+    return scores
+
+
+def compute_metrics(history: MetricHistory) -> dict:
+    """All three supporting metrics for every row of the history."""
+    return {
+        'form_index': rolling_form_index(history),
+        'big_match_rating': rolling_big_match_rating(history),
+        'tournament_success_score': rolling_tournament_success(history),
+    }
+
+
 def calculate_supporting_metrics():
     """
     Calculate supporting metrics for all players.
     Populates form_index, big_match_rating, and tournament_success_score columns.
+    
+    One streamed read of the rated history, one vectorized pass over all
+    players, one bulk write.
     """
     logger.info("="*70)
     logger.info("CALCULATING SUPPORTING METRICS")
@@ -175,158 +458,41 @@ def calculate_supporting_metrics():
     db = DatabaseManager()
     start_time = datetime.now()
     
-    # Get all unique players
-    logger.info("Fetching all players...")
-    with db.get_cursor() as cursor:
-        cursor.execute("""
-            SELECT DISTINCT player_id
-            FROM player_ratings
-            WHERE tsr_rating IS NOT NULL
-            ORDER BY player_id
-        """)
-        
-        player_ids = [row['player_id'] for row in cursor.fetchall()]
-        total_players = len(player_ids)
-    
-    logger.info(f"Processing {total_players:,} players...")
+    logger.info("Loading rated match history...")
+    history = load_metric_history(db)
+    if len(history) == 0:
+        logger.info("✅ No rated matches to process")
+        return
+    logger.info(f"Loaded {len(history):,} rating records for {len(history.offsets) - 1:,} players")
     
-    processed_players = 0
-    total_updates = 0
+    compute_start = datetime.now()
+    metrics = compute_metrics(history)
+    compute_duration = (datetime.now() - compute_start).total_seconds()
+    logger.info(f"Computed metrics in {compute_duration:.1f} seconds")
     
-    for player_id in player_ids:
-        # Get all matches for this player
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    pr.rating_id,
-                    pr.date,
-                    pr.elo_rating as player_elo,
-                    m.winner_id,
-                    m.tournament_tier,
-                    m.round,
-                    m.player1_id,
-                    m.player2_id,
-                    -- Get opponent's ELO at that time
-                    (SELECT pr2.elo_rating
-                     FROM player_ratings pr2
-                     WHERE pr2.match_id = m.match_id
-                       AND pr2.player_id != pr.player_id
-                     LIMIT 1) as opponent_elo
-                FROM player_ratings pr
-                JOIN matches m ON pr.match_id = m.match_id
-                WHERE pr.player_id = %s
-                  AND pr.tsr_rating IS NOT NULL
-                ORDER BY pr.date, m.match_id
-            """, (player_id,))
-            
-            matches = cursor.fetchall()
-        
-        if not matches:
-            continue
-        
-        # Track metrics for each match
-        recent_results = deque(maxlen=20)  # Rolling window of 20 matches
-        big_match_ratings = deque(maxlen=50)  # Track recent big match performance
-        tournament_results = deque(maxlen=20)  # Track recent tournament finishes
-        
-        updates = []
-        
-        for match in matches:
-            # Determine if player won
-            is_winner = (match['winner_id'] == player_id)
-            match_result = 1.0 if is_winner else 0.0
-            
-            # Update recent results
-            recent_results.append(match_result)
-            
-            # Calculate form index
-            form_index = calculate_form_index(recent_results)
-            
-            # Calculate big match rating
-            opponent_elo = match['opponent_elo'] or 1500.0
-            big_match_contribution = calculate_big_match_rating(
-                match['player_elo'],
-                opponent_elo,
-                match_result,
-                match['tournament_tier']
-            )
-            
-            if big_match_contribution is not None:
-                big_match_ratings.append(big_match_contribution)
-            
-            # Average big match rating over recent matches
-            big_match_rating = (
-                sum(big_match_ratings) / len(big_match_ratings)
-                if big_match_ratings else 0.0
-            )
-            
-            # Track tournament results (finals/semis/etc)
-            if match['round'] in ['F', 'SF', 'QF', 'R16']:
-                tournament_results.append((
-                    match['tournament_tier'],
-                    match['round'],
-                    match['date']
-                ))
-            
-            # Calculate tournament success score
-            tournament_score = calculate_tournament_success_score(
-                list(tournament_results),
-                match['date']
-            )
-            
-            # Prepare update
-            updates.append({
-                'rating_id': match['rating_id'],
-                'form_index': form_index,
-                'big_match_rating': big_match_rating,
-                'tournament_success_score': tournament_score
-            })
-        
-        # Batch update database
-        if updates:
-            _update_database_batch(db, updates)
-            total_updates += len(updates)
-        
-        processed_players += 1
-        
-        # Progress logging
-        if processed_players % 1000 == 0:
-            progress = processed_players / total_players * 100
-            logger.info(f"Processed {processed_players:,} / {total_players:,} players ({progress:.1f}%)")
+    total_updates = db.bulk_update(
+        'player_ratings', ('rating_id', 'date'), METRIC_COLUMNS,
+        zip(history.rating_id.tolist(), history.date.tolist(),
+            *(metrics[c].tolist() for c in METRIC_COLUMNS))
+    )
     
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
     
     logger.info("="*70)
     logger.info(f"✅ Supporting metrics calculation complete!")
-    logger.info(f"✅ Processed {processed_players:,} players")
+    logger.info(f"✅ Processed {len(history.offsets) - 1:,} players")
     logger.info(f"✅ Updated {total_updates:,} rating records")
     logger.info(f"Calculation took {duration:.1f} seconds ({duration/60:.1f} minutes)")
     logger.info("="*70)
     
+    db.refresh_latest_ratings()
+    db.bump_data_version()
+    
     # Show sample metrics
     _show_metric_examples(db)
 
 
-def _update_database_batch(db: DatabaseManager, updates: list):
-    """Update supporting metrics in database."""
-    with db.get_cursor() as cursor:
-        for update in updates:
-            cursor.execute("""
-                UPDATE player_ratings
-                SET 
-                    form_index = %s,
-                    big_match_rating = %s,
-                    tournament_success_score = %s
-                WHERE rating_id = %s
-            """, (
-                update['form_index'],
-                update['big_match_rating'],
-                update['tournament_success_score'],
-                update['rating_id']
-            ))
-
-
 def _show_metric_examples(db: DatabaseManager):
     """Display metric examples for Big 3."""
     logger.info("\n" + "="*70)
@@ -1,267 +0,0 @@
-#!/usr/bin/env python3
-"""
-Calculate supporting metrics using optimized SQL window functions.
-
-This approach is 100x faster than Python loops because it:
-1. Uses database window functions (all in SQL)
-2. Processes metrics in parallel
-3. Minimizes data transfer between Python and database
-
-Expected time: 30-60 minutes (vs 10+ hours for Python approach)
-"""
-
-import sys
-sys.path.insert(0, '/Users/razaool/tennis-career-tracker')
-from database.db_manager import DatabaseManager
-from datetime import datetime
-
-print("=" * 80)
-print("SUPPORTING METRICS - ULTRA-OPTIMIZED SQL VERSION")
-print("=" * 80)
-print("\nUsing SQL window functions for maximum performance")
-print("Expected time: 30-60 minutes")
-print("=" * 80)
-
-db = DatabaseManager()
-start_time = datetime.now()
-
-# METRIC 1: Form Index (20-match rolling win rate)
-print("\n1️⃣  Calculating Form Index (20-match rolling win rate)...")
-print("-" * 80)
-
-metric_start = datetime.now()
-
-with db.get_cursor() as cursor:
-    cursor.execute("""
-        WITH match_results AS (
-            SELECT 
-                pr.rating_id,
-                pr.player_id,
-                pr.date,
-                pr.match_id,
-                CASE WHEN m.winner_id = pr.player_id THEN 1.0 ELSE 0.0 END as won,
-                ROW_NUMBER() OVER (PARTITION BY pr.player_id ORDER BY pr.date, pr.match_id) as match_num
-            FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
-            WHERE pr.tsr_rating IS NOT NULL
-        )
-        UPDATE player_ratings pr
-        SET form_index = subq.form_index
-        FROM (
-            SELECT 
-                rating_id,
-                AVG(won) OVER (
-                    PARTITION BY player_id 
-                    ORDER BY match_num
-                    ROWS BETWEEN 19 PRECEDING AND CURRENT ROW
-                ) * 100 as form_index
-            FROM match_results
-        ) subq
-        WHERE pr.rating_id = subq.rating_id
-    """)
-    
-    updated = cursor.rowcount
-
-metric_duration = (datetime.now() - metric_start).total_seconds()
-print(f"✅ Form Index calculated for {updated:,} records")
-print(f"   Time: {metric_duration:.1f} seconds ({metric_duration/60:.1f} minutes)")
-
-# METRIC 2: Big Match Rating (vs elite opponents)
-print("\n2️⃣  Calculating Big Match Rating (vs elite opponents ELO ≥2500)...")
-print("-" * 80)
-
-metric_start = datetime.now()
-
-with db.get_cursor() as cursor:
-    cursor.execute("""
-        WITH opponent_data AS (
-            SELECT 
-                pr1.rating_id,
-                pr1.player_id,
-                pr1.elo_rating as player_elo,
-                pr2.elo_rating as opponent_elo,
-                CASE WHEN m.winner_id = pr1.player_id THEN 1.0 ELSE 0.0 END as won,
-                pr1.date,
-                pr1.match_id,
-                ROW_NUMBER() OVER (PARTITION BY pr1.player_id ORDER BY pr1.date, pr1.match_id) as match_num
-            FROM player_ratings pr1
-            JOIN matches m ON pr1.match_id = m.match_id
-            JOIN player_ratings pr2 ON pr2.match_id = m.match_id AND pr2.player_id != pr1.player_id
-            WHERE pr1.tsr_rating IS NOT NULL
-                AND pr2.elo_rating >= 2300  -- Elite opponents only
-        ),
-        big_match_performance AS (
-            SELECT 
-                rating_id,
-                player_id,
-                match_num,
-                -- Performance vs expectation
-                (won - (1.0 / (1.0 + POWER(10, (opponent_elo - player_elo) / 400.0)))) * 100 as performance
-            FROM opponent_data
-        )
-        UPDATE player_ratings pr
-        SET big_match_rating = subq.big_match_rating
-        FROM (
-            SELECT 
-                rating_id,
-                AVG(performance) OVER (
-                    PARTITION BY player_id 
-                    ORDER BY match_num
-                    ROWS BETWEEN 49 PRECEDING AND CURRENT ROW
-                ) as big_match_rating
-            FROM big_match_performance
-        ) subq
-        WHERE pr.rating_id = subq.rating_id
-    """)
-    
-    updated = cursor.rowcount
-
-metric_duration = (datetime.now() - metric_start).total_seconds()
-print(f"✅ Big Match Rating calculated for {updated:,} records")
-print(f"   Time: {metric_duration:.1f} seconds ({metric_duration/60:.1f} minutes)")
-
-# METRIC 3: Tournament Success Score
-print("\n3️⃣  Calculating Tournament Success Score (recent tournament finishes)...")
-print("-" * 80)
-
-metric_start = datetime.now()
-
-with db.get_cursor() as cursor:
-    cursor.execute("""
-        WITH tournament_points AS (
-            SELECT 
-                pr.rating_id,
-                pr.player_id,
-                pr.date,
-                pr.match_id,
-                ROW_NUMBER() OVER (PARTITION BY pr.player_id ORDER BY pr.date, pr.match_id) as match_num,
-                CASE m.round
-                    WHEN 'F' THEN 100
-                    WHEN 'SF' THEN 75
-                    WHEN 'QF' THEN 50
-                    WHEN 'R16' THEN 30
-                    WHEN 'R32' THEN 15
-                    WHEN 'R64' THEN 5
-                    WHEN 'R128' THEN 2
-                    WHEN 'RR' THEN 40
-                    ELSE 5
-                END * 
-                CASE m.tournament_tier
-                    WHEN 'Grand Slam' THEN 2.0
-                    WHEN 'Masters 1000' THEN 1.5
-                    WHEN 'Masters' THEN 1.5
-                    WHEN 'ATP Finals' THEN 1.8
-                    WHEN 'ATP 500' THEN 1.2
-                    WHEN 'Olympics' THEN 1.6
-                    ELSE 1.0
-                END as points
-            FROM player_ratings pr
-            JOIN matches m ON pr.match_id = m.match_id
-            WHERE pr.tsr_rating IS NOT NULL
-        )
-        UPDATE player_ratings pr
-        SET tournament_success_score = subq.tournament_success_score
-        FROM (
-            SELECT 
-                rating_id,
-                AVG(points) OVER (
-                    PARTITION BY player_id 
-                    ORDER BY match_num
-                    ROWS BETWEEN 19 PRECEDING AND CURRENT ROW
-                ) as tournament_success_score
-            FROM tournament_points
-        ) subq
-        WHERE pr.rating_id = subq.rating_id
-    """)
-    
-    updated = cursor.rowcount
-
-metric_duration = (datetime.now() - metric_start).total_seconds()
-print(f"✅ Tournament Success Score calculated for {updated:,} records")
-print(f"   Time: {metric_duration:.1f} seconds ({metric_duration/60:.1f} minutes)")
-
-# Total time
-total_duration = (datetime.now() - start_time).total_seconds()
-
-print("\n" + "=" * 80)
-print("✅ ALL SUPPORTING METRICS CALCULATED!")
-print("=" * 80)
-print(f"Total time: {total_duration:.1f} seconds ({total_duration/60:.1f} minutes)")
-print("=" * 80)
-
-# Verify and show examples
-print("\n📊 Verification: Top 15 Active Players with All Metrics")
-print("-" * 80)
-
-with db.get_cursor() as cursor:
-    cursor.execute("""
-        WITH latest_ratings AS (
-            SELECT DISTINCT ON (pr.player_id)
-                pl.name,
-                pr.tsr_rating,
-                pr.tsr_uncertainty,
-                pr.form_index,
-                pr.big_match_rating,
-                pr.tournament_success_score,
-                pr.date
-            FROM player_ratings pr
-            JOIN players pl ON pr.player_id = pl.player_id
-            WHERE pr.form_index IS NOT NULL
-              AND pr.date >= CURRENT_DATE - INTERVAL '6 months'
-            ORDER BY pr.player_id, pr.date DESC
-        )
-        SELECT *
-        FROM latest_ratings
-        ORDER BY tsr_rating DESC
-        LIMIT 15
-    """)
-    
-    results = cursor.fetchall()
-    
-    print(f"{'Player':<25} {'TSR':<8} {'±Unc':<8} {'Form%':<7} {'BigMtch':<8} {'TournSc':<8}")
-    print("-" * 80)
-    
-    for row in results:
-        print(f"{row['name']:<25} {row['tsr_rating']:<8.1f} "
-              f"{row['tsr_uncertainty']:<8.1f} {row['form_index']:<7.1f} "
-              f"{row['big_match_rating']:<8.1f} {row['tournament_success_score']:<8.1f}")
-
-# Final statistics
-print("\n" + "=" * 80)
-print("📊 FINAL DATABASE STATISTICS")
-print("=" * 80)
-
-with db.get_cursor() as cursor:
-    cursor.execute("""
-        SELECT 
-            COUNT(*) as total,
-            COUNT(form_index) as has_form,
-            COUNT(big_match_rating) as has_big_match,
-            COUNT(tournament_success_score) as has_tournament
-        FROM player_ratings
-        WHERE tsr_rating IS NOT NULL
-    """)
-    
-    result = cursor.fetchone()
-    
-    print(f"Total TSR records:              {result['total']:>10,}")
-    print(f"With form_index:                {result['has_form']:>10,} ({result['has_form']/result['total']*100:.1f}%)")
-    print(f"With big_match_rating:          {result['has_big_match']:>10,} ({result['has_big_match']/result['total']*100:.1f}%)")
-    print(f"With tournament_success_score:  {result['has_tournament']:>10,} ({result['has_tournament']/result['total']*100:.1f}%)")
-
-print("\n" + "=" * 80)
-print("🎉 PHASE 2 - 100% COMPLETE!")
-print("=" * 80)
-print("""
-All metrics calculated:
-  ✅ ELO ratings
-  ✅ TSR with Bayesian uncertainty
-  ✅ Smoothed trajectories  
-  ✅ Form index
-  ✅ Big match rating
-  ✅ Tournament success score
-
-Ready for Phase 3: API Development! 🚀
-""")
-print("=" * 80)
-
@@ -126,27 +126,19 @@ def export_top_players(db, n=10, output_file='top_players_current.csv'):
     with db.get_cursor() as cursor:
         # Get latest rating for each player (active players only - last match in 2024 or 2025)
         cursor.execute("""
-            WITH latest_ratings AS (
-                SELECT 
-                    player_id,
-                    MAX(career_match_number) as max_match
-                FROM player_ratings
-                GROUP BY player_id
-            )
             SELECT 
                 p.name,
-                pr.elo_rating,
-                pr.elo_clay,
-                pr.elo_grass,
-                pr.elo_hard,
-                pr.career_match_number as total_matches,
-                pr.date as last_match_date
-            FROM player_ratings pr
-            JOIN latest_ratings lr ON pr.player_id = lr.player_id 
-                AND pr.career_match_number = lr.max_match
-            JOIN players p ON pr.player_id = p.player_id
-            WHERE pr.date >= '2024-01-01'
-            ORDER BY pr.elo_rating DESC
+                plr.elo_rating,
+                plr.elo_clay,
+                plr.elo_grass,
+                plr.elo_hard,
+                plr.career_match_number as total_matches,
+                plr.last_match as last_match_date
+            FROM player_latest_ratings plr
+            JOIN players p ON plr.player_id = p.player_id
+            WHERE plr.last_match >= '2024-01-01'
+                AND plr.elo_rating IS NOT NULL
+            ORDER BY plr.elo_rating DESC
             LIMIT %s
         """, (n,))
         
@@ -254,29 +246,20 @@ def export_rating_system_csvs(db, rating_type='elo'):
     # Export top 10 current players
     with db.get_cursor() as cursor:
         cursor.execute(f"""
-            WITH latest_ratings AS (
-                SELECT 
-                    player_id,
-                    MAX(career_match_number) as max_match
-                FROM player_ratings
-                GROUP BY player_id
-            )
             SELECT 
                 p.name,
-                pr.{rating_col} as rating,
-                pr.{clay_col} as clay_rating,
-                pr.{grass_col} as grass_rating,
-                pr.{hard_col} as hard_rating,
-                pr.career_match_number as total_matches,
-                pr.date as last_match_date
-            FROM player_ratings pr
-            JOIN latest_ratings lr ON pr.player_id = lr.player_id 
-                AND pr.career_match_number = lr.max_match
-            JOIN players p ON pr.player_id = p.player_id
-            WHERE pr.date >= '2025-01-01' 
-                AND pr.{rating_col} IS NOT NULL
-                AND pr.career_match_number >= 100
-            ORDER BY pr.{rating_col} DESC
+                plr.{rating_col} as rating,
+                plr.{clay_col} as clay_rating,
+                plr.{grass_col} as grass_rating,
+                plr.{hard_col} as hard_rating,
+                plr.career_match_number as total_matches,
+                plr.last_match as last_match_date
+            FROM player_latest_ratings plr
+            JOIN players p ON plr.player_id = p.player_id
+            WHERE plr.last_match >= '2025-01-01' 
+                AND plr.{rating_col} IS NOT NULL
+                AND plr.career_match_number >= 100
+            ORDER BY plr.{rating_col} DESC
             LIMIT 10
         """)
         
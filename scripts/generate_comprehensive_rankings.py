@@ -30,32 +30,23 @@ def get_current_elo_rankings(db, min_date=None, limit=50):
     """
     with db.get_cursor() as cursor:
         query = """
-            WITH latest_ratings AS (
-                SELECT 
-                    player_id,
-                    MAX(career_match_number) as max_match
-                FROM player_ratings
-                GROUP BY player_id
-            )
             SELECT 
                 p.name,
-                pr.elo_rating as current_elo,
-                pr.elo_clay,
-                pr.elo_grass,
-                pr.elo_hard,
-                pr.date as last_match_date,
-                pr.career_match_number as total_matches
-            FROM player_ratings pr
-            JOIN latest_ratings lr ON pr.player_id = lr.player_id 
-                AND pr.career_match_number = lr.max_match
-            JOIN players p ON pr.player_id = p.player_id
-            WHERE pr.elo_rating IS NOT NULL
+                plr.elo_rating as current_elo,
+                plr.elo_clay,
+                plr.elo_grass,
+                plr.elo_hard,
+                plr.last_match as last_match_date,
+                plr.career_match_number as total_matches
+            FROM player_latest_ratings plr
+            JOIN players p ON plr.player_id = p.player_id
+            WHERE plr.elo_rating IS NOT NULL
         """
         
         if min_date:
-            query += f" AND pr.date >= '{min_date}'"
+            query += f" AND plr.last_match >= '{min_date}'"
         
-        query += " ORDER BY pr.elo_rating DESC LIMIT %s"
+        query += " ORDER BY plr.elo_rating DESC LIMIT %s"
         
         cursor.execute(query, (limit,))
         return cursor.fetchall()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Maintain the yearly partitions of matches and player_ratings.
+
+1. Creates the partitions for the next AHEAD_YEARS years, so new matches
+   never land in the default partition
+2. Freezes closed years: VACUUM (FREEZE, ANALYZE) every partition older
+   than --freeze-after years. Old seasons never change again, so once
+   frozen autovacuum skips them and anti-wraparound vacuums are cheap
+
+Safe to run repeatedly (e.g. from cron at the start of each year).
+
+Usage:
+    python scripts/maintain_partitions.py
+    python scripts/maintain_partitions.py --freeze-after 2
+"""
+import sys
+from pathlib import Path
+import argparse
+import logging
+from datetime import date
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.db_manager import DatabaseManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ('matches', 'player_ratings')
+
+# Years of partitions kept ahead of the current one
+AHEAD_YEARS = 2
+
+# Partitions older than this many years are frozen
+FREEZE_AFTER_YEARS = 1
+
+
+def _year_partitions(cursor, table):
+    """{year: partition name} for table's yearly partitions."""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+    """, (table,))
+    prefix = f"{table}_"
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and suffix.isdigit():
+            partitions[int(suffix)] = name
+    return partitions
+
+
+def create_partitions(cursor, through_year):
+    """
+    Create missing yearly partitions up to through_year.
+
+    Fails if the default partition already holds rows for a new year
+    (move them out first); keeping partitions ahead avoids that.
+
+    Returns:
+        Names of the partitions created
+    """
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = _year_partitions(cursor, table)
+        first = max(existing) + 1 if existing else date.today().year
+        for year in range(first, through_year + 1):
+            name = f"{table}_{year}"
+            cursor.execute(f"""
+                CREATE TABLE {name} PARTITION OF {table}
+                FOR VALUES FROM (%s) TO (%s)
+            """, (date(year, 1, 1), date(year + 1, 1, 1)))
+            created.append(name)
+    return created
+
+
+def freeze_partitions(cursor, before_year):
+    """
+    VACUUM (FREEZE, ANALYZE) every yearly partition before before_year.
+
+    Returns:
+        Names of the partitions frozen
+    """
+    frozen = []
+    for table in PARTITIONED_TABLES:
+        for year, name in sorted(_year_partitions(cursor, table).items()):
+            if year < before_year:
+                cursor.execute(f"VACUUM (FREEZE, ANALYZE) {name}")
+                frozen.append(name)
+    return frozen
+
+
+def maintain_partitions(freeze_after=FREEZE_AFTER_YEARS, ahead=AHEAD_YEARS):
+    db = DatabaseManager()
+    this_year = date.today().year
+
+    # VACUUM cannot run inside a transaction block
+    conn = db.get_connection()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            created = create_partitions(cursor, this_year + ahead)
+            for name in created:
+                logger.info(f"Created partition {name}")
+
+            before_year = this_year - freeze_after + 1
+            frozen = freeze_partitions(cursor, before_year)
+            logger.info(f"Froze {len(frozen)} partitions dated before {before_year}")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create and freeze yearly partitions")
+    parser.add_argument('--freeze-after', type=int, default=FREEZE_AFTER_YEARS,
+                        help='Freeze partitions more than this many years old')
+    parser.add_argument('--ahead', type=int, default=AHEAD_YEARS,
+                        help='Years of partitions to keep ahead of the current one')
+    args = parser.parse_args()
+
+    maintain_partitions(freeze_after=args.freeze_after, ahead=args.ahead)
+
+
+if __name__ == "__main__":
+    main()
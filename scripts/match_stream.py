@@ -0,0 +1,214 @@
+"""
+Columnar match stream shared by the rating engines.
+
+Matches are read once, in (date, match_id) order, into contiguous NumPy
+arrays. Player ids are mapped to a dense 0..n-1 index so rating state can
+live in flat float64 arrays instead of per-player dicts.
+
+The stream is also split into "independent segments": runs of consecutive
+matches in which no player appears twice. Every match in a segment only
+touches its own two players, so a segment can be applied as one vectorized
+update and still give exactly the same result as a match-by-match replay.
+"""
+import sys
+from pathlib import Path
+import logging
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import SURFACES, TOURNAMENT_TIERS
+
+logger = logging.getLogger(__name__)
+
+# Column 0 of every per-player rating matrix is the overall rating,
+# columns 1.. are the surfaces in config.SURFACES order.
+OVERALL = 0
+SURFACE_INDEX = {surface: i + 1 for i, surface in enumerate(SURFACES)}
+DEFAULT_SURFACE = 'hard'
+
+
+class PlayerIndex:
+    """Maps sparse player_id values to a dense 0..n-1 index."""
+
+    def __init__(self, player_ids):
+        self.player_ids = np.unique(np.asarray(player_ids, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def index_of(self, player_ids):
+        """Dense index for an array of player ids (all must be known)."""
+        return np.searchsorted(self.player_ids, np.asarray(player_ids, dtype=np.int64))
+
+
+class MatchColumns:
+    """
+    One column per match attribute, all arrays of equal length.
+
+    Attributes:
+        match_id, winner_id, loser_id: int64
+        date: datetime64[D]
+        surface: int8 index into a rating matrix (see SURFACE_INDEX)
+        tier_weight: float64 tournament weight (1.0 for unknown tiers)
+        tournament_tier, round, surface_name: object arrays (raw values,
+            may be None)
+    """
+
+    def __init__(self, match_id, date, winner_id, loser_id, surface,
+                 tier_weight, tournament_tier, round_, surface_name):
+        self.match_id = match_id
+        self.date = date
+        self.winner_id = winner_id
+        self.loser_id = loser_id
+        self.surface = surface
+        self.tier_weight = tier_weight
+        self.tournament_tier = tournament_tier
+        self.round = round_
+        self.surface_name = surface_name
+
+    def __len__(self):
+        return len(self.match_id)
+
+    def slice(self, start, end):
+        """Matches [start, end) as a new MatchColumns (views, no copies)."""
+        return MatchColumns(
+            match_id=self.match_id[start:end],
+            date=self.date[start:end],
+            winner_id=self.winner_id[start:end],
+            loser_id=self.loser_id[start:end],
+            surface=self.surface[start:end],
+            tier_weight=self.tier_weight[start:end],
+            tournament_tier=self.tournament_tier[start:end],
+            round_=self.round[start:end],
+            surface_name=self.surface_name[start:end],
+        )
+
+    def player_ids(self):
+        """All player ids that appear in these matches."""
+        return np.concatenate([self.winner_id, self.loser_id])
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build columns from (match_id, date, player1_id, player2_id, winner_id,
+        surface, tournament_tier, round) tuples.
+        """
+        if not rows:
+            return cls.empty()
+
+        match_id, date, p1, p2, winner, surface, tier, round_ = zip(*rows)
+
+        winner_id = np.array(winner, dtype=np.int64)
+        p1 = np.array(p1, dtype=np.int64)
+        p2 = np.array(p2, dtype=np.int64)
+        loser_id = np.where(winner_id == p2, p1, p2)
+
+        default_surface = SURFACE_INDEX[DEFAULT_SURFACE]
+        surface_idx = np.fromiter(
+            (SURFACE_INDEX.get(s, default_surface) for s in surface),
+            dtype=np.int8, count=len(surface)
+        )
+        tier_weight = np.fromiter(
+            (TOURNAMENT_TIERS[t]['weight'] if t in TOURNAMENT_TIERS else 1.0 for t in tier),
+            dtype=np.float64, count=len(tier)
+        )
+
+        return cls(
+            match_id=np.array(match_id, dtype=np.int64),
+            date=np.array(date, dtype='datetime64[D]'),
+            winner_id=winner_id,
+            loser_id=loser_id,
+            surface=surface_idx,
+            tier_weight=tier_weight,
+            tournament_tier=np.array(tier, dtype=object),
+            round_=np.array(round_, dtype=object),
+            surface_name=np.array(surface, dtype=object),
+        )
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            match_id=np.empty(0, dtype=np.int64),
+            date=np.empty(0, dtype='datetime64[D]'),
+            winner_id=np.empty(0, dtype=np.int64),
+            loser_id=np.empty(0, dtype=np.int64),
+            surface=np.empty(0, dtype=np.int8),
+            tier_weight=np.empty(0, dtype=np.float64),
+            tournament_tier=np.empty(0, dtype=object),
+            round_=np.empty(0, dtype=object),
+            surface_name=np.empty(0, dtype=object),
+        )
+
+
+def load_match_columns(db, since=None):
+    """
+    Read matches into columnar arrays, ordered by (date, match_id).
+
+    Args:
+        db: DatabaseManager
+        since: Optional date; only matches on or after it are read
+
+    Returns:
+        MatchColumns
+    """
+    query = """
+        SELECT match_id, date, player1_id, player2_id, winner_id,
+               surface, tournament_tier, round
+        FROM matches
+    """
+    params = None
+    if since is not None:
+        query += " WHERE date >= %s"
+        params = (str(since),)
+    query += " ORDER BY date, match_id"
+
+    with db.get_cursor(dict_cursor=False) as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+    logger.info(f"Loaded {len(rows):,} matches into columnar arrays")
+    return MatchColumns.from_rows(rows)
+
+
+def independent_segments(winner_idx, loser_idx):
+    """
+    Split a match sequence into maximal runs with no repeated player.
+
+    Args:
+        winner_idx, loser_idx: Dense player indexes per match
+
+    Returns:
+        int64 array of boundaries b such that segment j is [b[j], b[j+1])
+    """
+    n = len(winner_idx)
+    if n == 0:
+        return np.zeros(1, dtype=np.int64)
+
+    # For every match, the index of the most recent earlier match that
+    # involved either of its players (-1 if none).
+    players = np.empty(2 * n, dtype=np.int64)
+    players[0::2] = winner_idx
+    players[1::2] = loser_idx
+    match_pos = np.repeat(np.arange(n, dtype=np.int64), 2)
+
+    order = np.argsort(players, kind='stable')
+    sorted_players = players[order]
+    same_player = sorted_players[1:] == sorted_players[:-1]
+
+    prev_occurrence = np.full(2 * n, -1, dtype=np.int64)
+    prev_occurrence[order[1:][same_player]] = match_pos[order[:-1][same_player]]
+    last_seen = np.maximum(prev_occurrence[0::2], prev_occurrence[1::2])
+
+    # Greedy cut: start a new segment as soon as a player reappears
+    bounds = [0]
+    start = 0
+    for i, previous in enumerate(last_seen.tolist()):
+        if previous >= start:
+            bounds.append(i)
+            start = i
+    bounds.append(n)
+
+    return np.array(bounds, dtype=np.int64)
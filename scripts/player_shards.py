@@ -0,0 +1,79 @@
+"""
+Run per-player passes in parallel, sharded by player id.
+
+Passes such as TSR uncertainty and trajectory smoothing only depend on
+each player's own rating history, so players can be split into shards
+(player_id % n_shards) and processed by independent worker processes.
+Each worker fetches its whole shard with one query ordered by player,
+computes with NumPy/SciPy and bulk-writes its results.
+
+More shards than workers are used so a shard holding a few very long
+careers doesn't leave the other workers idle at the end.
+"""
+import sys
+from pathlib import Path
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logger = logging.getLogger(__name__)
+
+# Shards per worker process
+SHARDS_PER_WORKER = 4
+
+
+def default_workers():
+    """One worker per available core."""
+    return os.cpu_count() or 1
+
+
+def shard_filter(column='player_id'):
+    """SQL predicate selecting one shard; takes (n_shards, shard) parameters."""
+    return f"{column} %% %s = %s"
+
+
+def group_bounds(player_ids):
+    """
+    Boundaries of the runs of equal ids in an array sorted by player.
+
+    Returns:
+        int64 array b such that player j's rows are [b[j], b[j+1])
+    """
+    if len(player_ids) == 0:
+        return np.zeros(1, dtype=np.int64)
+    cuts = np.flatnonzero(player_ids[1:] != player_ids[:-1]) + 1
+    return np.concatenate([[0], cuts, [len(player_ids)]]).astype(np.int64)
+
+
+def run_sharded(worker, n_workers, *args):
+    """
+    Run worker(shard, n_shards, *args) for every shard on a process pool.
+
+    Args:
+        worker: Module-level function (must be picklable)
+        n_workers: Number of processes
+
+    Returns:
+        List of the workers' return values, in shard order
+    """
+    n_workers = max(1, int(n_workers))
+    n_shards = n_workers * SHARDS_PER_WORKER
+    results = [None] * n_shards
+
+    logger.info(f"Running {n_shards} shards on {n_workers} worker processes")
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = {
+            pool.submit(worker, shard, n_shards, *args): shard
+            for shard in range(n_shards)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            logger.info(f"Finished shard {done} / {n_shards}")
+
+    return results
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Publish the read-only trajectory store the API memory-maps.
+
+Every player's rating history is written as contiguous typed arrays, one
+.npy file per column, with rows grouped by dense player index and ordered
+by career match number inside each player:
+
+    data/processed/trajectory_store/
+        CURRENT                  name of the live version directory
+        v<data_version>/
+            manifest.json        data version, row count, column dtypes,
+                                 name -> dense player index
+            offsets.npy          int64[n_players + 1]; player i owns rows
+                                 offsets[i]:offsets[i + 1]
+            <column>.npy         one array per STORE_COLUMNS entry
+                                 (NULL ratings are NaN)
+
+The API (api/services/trajectory_store.py) np.load()s the columns with
+mmap_mode='r', so a trajectory is a zero-copy slice and Postgres is not
+queried. A store is only used while its data version matches the
+database's; any later rating write makes it stale until it is published
+again. The pipeline publishes after every run; run this script after the
+standalone rating scripts.
+
+Publishing is atomic: the new version directory is written completely,
+then CURRENT is swapped with os.replace. Older versions are kept for
+KEEP_VERSIONS publishes so API workers still mapping them are unaffected.
+
+Usage:
+    python scripts/publish_trajectory_store.py
+"""
+import sys
+from pathlib import Path
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import TRAJECTORY_STORE_DIR
+from database.db_manager import DatabaseManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Column -> dtype, in player_ratings order
+STORE_COLUMNS = {
+    'career_match_number': np.int32,
+    'date': 'datetime64[D]',
+    'elo_rating': np.float64,
+    'tsr_rating': np.float64,
+    'tsr_uncertainty': np.float64,
+    'tsr_smoothed': np.float64,
+    'glicko2_rating': np.float64,
+    'glicko2_rd': np.float64,
+    'glicko2_volatility': np.float64,
+}
+
+KEEP_VERSIONS = 2
+
+# Rows converted to arrays per fetch
+FETCH_SIZE = 200000
+
+
+def _current_version(db):
+    with db.get_cursor() as cursor:
+        cursor.execute("SELECT version FROM data_version")
+        row = cursor.fetchone()
+    return row['version'] if row else 0
+
+
+def _load_columns(db):
+    """Stream player_ratings into (player_id, {column: array})."""
+    columns = list(STORE_COLUMNS)
+    query = f"""
+        SELECT player_id, {', '.join(columns)}
+        FROM player_ratings
+        ORDER BY player_id, career_match_number
+    """
+
+    player_chunks = []
+    column_chunks = {column: [] for column in columns}
+    with db.get_cursor(dict_cursor=False, name='trajectory_store') as cursor:
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            values = list(zip(*rows))
+            player_chunks.append(np.array(values[0], dtype=np.int64))
+            for column, column_values in zip(columns, values[1:]):
+                dtype = STORE_COLUMNS[column]
+                if dtype is np.float64:
+                    # None -> NaN
+                    array = np.array(column_values, dtype=np.float64)
+                elif dtype is np.int32:
+                    array = np.array([v if v is not None else -1 for v in column_values], dtype=np.int32)
+                else:
+                    array = np.array(column_values, dtype=dtype)
+                column_chunks[column].append(array)
+
+    if not player_chunks:
+        return np.zeros(0, dtype=np.int64), {
+            column: np.zeros(0, dtype=dtype) for column, dtype in STORE_COLUMNS.items()
+        }
+    return (np.concatenate(player_chunks),
+            {column: np.concatenate(chunks) for column, chunks in column_chunks.items()})
+
+
+def _player_names(db):
+    with db.get_cursor(dict_cursor=False) as cursor:
+        cursor.execute("SELECT player_id, name FROM players")
+        return dict(cursor.fetchall())
+
+
+def publish_trajectory_store(db=None, version=None, store_dir=TRAJECTORY_STORE_DIR):
+    """
+    Write a new store version and make it current.
+
+    Args:
+        db: DatabaseManager (a new one if omitted)
+        version: data_version the store reflects (read from the database
+            if omitted; pass the value bump_data_version returned)
+        store_dir: Store root
+
+    Returns:
+        Path of the published version directory
+    """
+    db = db or DatabaseManager()
+    if version is None:
+        version = _current_version(db)
+    start_time = datetime.now()
+
+    player_id, columns = _load_columns(db)
+    names = _player_names(db)
+
+    # Rows are sorted by player_id: each player's rows are one contiguous run
+    ids, starts = np.unique(player_id, return_index=True)
+    offsets = np.append(starts, len(player_id)).astype(np.int64)
+
+    index = {}
+    for i, pid in enumerate(ids.tolist()):
+        name = names.get(pid)
+        if name is not None:
+            index.setdefault(name, i)  # Duplicate names: first player wins
+
+    store_dir = Path(store_dir)
+    version_dir = store_dir / f"v{version}"
+    tmp_dir = store_dir / f"v{version}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    np.save(tmp_dir / 'offsets.npy', offsets)
+    for column, values in columns.items():
+        np.save(tmp_dir / f"{column}.npy", values)
+    with open(tmp_dir / 'manifest.json', 'w') as f:
+        json.dump({
+            'data_version': version,
+            'rows': int(len(player_id)),
+            'columns': {column: str(np.dtype(dtype)) for column, dtype in STORE_COLUMNS.items()},
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'players': index,
+        }, f)
+
+    if version_dir.exists():
+        shutil.rmtree(version_dir)
+    os.replace(tmp_dir, version_dir)
+
+    # Swap CURRENT last, so readers only ever see complete versions
+    current_tmp = store_dir / 'CURRENT.tmp'
+    current_tmp.write_text(version_dir.name)
+    os.replace(current_tmp, store_dir / 'CURRENT')
+
+    _prune_versions(store_dir, keep=version_dir.name)
+
+    duration = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Published trajectory store {version_dir.name}: {len(player_id):,} rows, "
+                f"{len(ids):,} players ({duration:.1f}s)")
+    return version_dir
+
+
+def _prune_versions(store_dir, keep):
+    """Delete all but the newest KEEP_VERSIONS version directories."""
+    versions = sorted(
+        (p for p in store_dir.glob('v*') if p.is_dir() and p.name[1:].isdigit()),
+        key=lambda p: int(p.name[1:])
+    )
+    for path in versions[:-KEEP_VERSIONS]:
+        if path.name != keep:
+            shutil.rmtree(path)
+
+
+def main():
+    publish_trajectory_store()
+
+
+if __name__ == "__main__":
+    main()
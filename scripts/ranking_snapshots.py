@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Weekly ranking snapshots, rank intervals and weeks at the top.
+
+Ranking players "as of" a date used to mean finding every player's latest
+rating row on or before it - a window over all of player_ratings up to
+that date, on every request. This stage sweeps the rating stream once, in
+date order, and keeps every rating system's current ratings in an
+order-statistic tree (a Fenwick tree over rating-sorted slots). At the end
+of each week with rating changes it reads the top RANKED players off the
+tree and writes them to ranking_snapshots, so a historical lookup is one
+indexed read of the latest snapshot on or before the date.
+
+The same sweep follows every player's rank inside the top RANKED: each
+run of consecutive weeks at one rank becomes a row of rank_intervals
+(rank on any date, per player), and the weeks spent at #1 and in the top
+10 are summed per player into weeks_at_top.
+
+Only active players are ranked: a player drops out of a system's ranking
+ACTIVE_WEEKS weeks after their last rated match (the ATP's 52-week window)
+and re-enters with their next one.
+
+Weeks run Monday to Sunday and are dated by their Sunday: the ranking
+"of" a week includes every rating up to and including that Sunday, and
+holds until the next Sunday. The rating pipeline rebuilds all three
+tables after every run; run this script after the standalone rating
+scripts.
+
+Usage:
+    python scripts/ranking_snapshots.py
+"""
+import sys
+from pathlib import Path
+import logging
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.db_manager import DatabaseManager
+from scripts.match_stream import PlayerIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# rating_system -> player_ratings column
+SNAPSHOT_SYSTEMS = {
+    'elo': 'elo_rating',
+    'tsr': 'tsr_rating',
+    'glicko2': 'glicko2_rating',
+}
+
+# Players per snapshot (the endpoint's maximum limit)
+RANKED = 100
+
+# Weeks without a rated match before a player leaves the ranking
+ACTIVE_WEEKS = 52
+
+SNAPSHOT_COLUMNS = ('rating_system', 'snapshot_date', 'rank', 'player_id', 'rating',
+                    'last_match', 'career_match_number')
+INTERVAL_COLUMNS = ('rating_system', 'player_id', 'start_date', 'end_date', 'rank')
+WEEKS_COLUMNS = ('rating_system', 'player_id', 'weeks_at_no1', 'weeks_in_top10', 'best_rank')
+
+# Monday 1970-01-05: weeks run Monday..Sunday
+_EPOCH_MONDAY = np.datetime64('1970-01-05', 'D')
+
+
+class OrderStatisticTree:
+    """
+    Counts of occupied slots in a Fenwick (binary indexed) tree.
+
+    Slots are positions in a fixed order (here: every rating value a system
+    ever takes, best first); a player occupies the slot of their current
+    rating. Updates take whole arrays of slots at once, and the k-th
+    occupied slot is found in O(log n) without scanning.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = np.zeros(size + 1, dtype=np.int64)
+        self.occupied = np.zeros(size, dtype=bool)
+        self.count = 0
+        self._top_bit = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, slots, delta):
+        """Occupy (delta=1) or vacate (delta=-1) an array of distinct slots."""
+        if len(slots) == 0:
+            return
+        self.occupied[slots] = delta > 0
+        self.count += delta * len(slots)
+        index = slots + 1
+        while len(index):
+            np.add.at(self.tree, index, delta)
+            index = index + (index & -index)
+            index = index[index <= self.size]
+
+    def kth(self, k):
+        """The k-th occupied slot (1-based k <= count)."""
+        position = 0
+        step = self._top_bit
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self.tree[nxt] < k:
+                position = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        # position is the longest prefix holding fewer than k: the k-th
+        # occupied slot is the next one (tree indexes are 1-based)
+        return position
+
+    def top(self, n):
+        """The first min(n, count) occupied slots, in order."""
+        n = min(n, self.count)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.occupied[:self.kth(n) + 1])
+
+
+class SystemSweep:
+    """One rating system's live ranking during the sweep."""
+
+    def __init__(self, name, rows, n_players):
+        self.name = name
+
+        # Every rated row gets a slot; slots run from the best rating down
+        # (ties by player_id), so the tree's first slots are the top ranks
+        self.rows = np.flatnonzero(~np.isnan(rows['rating']))
+        ratings = rows['rating'][self.rows]
+        order = np.lexsort((rows['player_id'][self.rows], -ratings))
+        self.slot_row = self.rows[order]  # slot -> row
+        self.row_slot = np.full(len(rows['rating']), -1, dtype=np.int64)
+        self.row_slot[self.slot_row] = np.arange(len(order))
+
+        self.tree = OrderStatisticTree(len(order))
+        self.player_slot = np.full(n_players, -1, dtype=np.int64)
+        self.last_week = np.zeros(n_players, dtype=np.int64)
+
+    def apply(self, week, rows, player):
+        """
+        Move every player rated this week to the slot of their latest
+        rating, and drop players who went inactive.
+
+        Returns:
+            Whether the ranking changed
+        """
+        rows = rows[self.row_slot[rows] >= 0]
+        changed = len(rows) > 0
+        if changed:
+            # Rows are in date order: the last one per player is the latest
+            players, last = np.unique(player[rows][::-1], return_index=True)
+            latest = rows[::-1][last]
+
+            old = self.player_slot[players]
+            self.tree.add(old[old >= 0], -1)
+            new = self.row_slot[latest]
+            self.tree.add(new, 1)
+            self.player_slot[players] = new
+            self.last_week[players] = week
+
+        # Players inactive for ACTIVE_WEEKS leave the ranking
+        expired = np.flatnonzero((self.player_slot >= 0) & (self.last_week <= week - ACTIVE_WEEKS))
+        if len(expired):
+            self.tree.add(self.player_slot[expired], -1)
+            self.player_slot[expired] = -1
+            changed = True
+        return changed
+
+    def top_rows(self, n):
+        """Rating rows of the current top n, best first."""
+        return self.slot_row[self.tree.top(n)]
+
+
+def _load_ratings(db):
+    """All rating rows in (date, career_match_number) order, as arrays."""
+    columns = list(SNAPSHOT_SYSTEMS.values())
+    query = f"""
+        SELECT player_id, date, career_match_number, {', '.join(columns)}
+        FROM player_ratings
+        WHERE date IS NOT NULL
+        ORDER BY date, career_match_number, player_id
+    """
+
+    chunks = []
+    with db.get_cursor(dict_cursor=False, name='ranking_snapshots') as cursor:
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(200000)
+            if not rows:
+                break
+            values = list(zip(*rows))
+            chunk = {
+                'player_id': np.array(values[0], dtype=np.int64),
+                'date': np.array(values[1], dtype='datetime64[D]'),
+                'career_match_number': np.array(
+                    [v if v is not None else 0 for v in values[2]], dtype=np.int64),
+            }
+            for column, column_values in zip(columns, values[3:]):
+                chunk[column] = np.array(column_values, dtype=np.float64)  # None -> NaN
+            chunks.append(chunk)
+
+    if not chunks:
+        return None
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def _sunday(week):
+    return (_EPOCH_MONDAY + np.timedelta64(7 * week + 6, 'D')).item()
+
+
+class RankTracker:
+    """
+    Turns one system's weekly top-N into rank intervals and week counts.
+
+    Each player's current rank (0 = outside the top N) and the week it
+    started are kept in dense arrays; a week's top N is compared against
+    them in one vectorized pass.
+    """
+
+    def __init__(self, name, n_players):
+        self.name = name
+        self.rank = np.zeros(n_players, dtype=np.int64)
+        self.since = np.zeros(n_players, dtype=np.int64)
+        self.weeks_at_no1 = np.zeros(n_players, dtype=np.int64)
+        self.weeks_in_top10 = np.zeros(n_players, dtype=np.int64)
+        self.best_rank = np.zeros(n_players, dtype=np.int64)
+        self.intervals = []
+
+    def update(self, week, players):
+        """Record the top N of week (dense player indexes, best first)."""
+        rank = np.zeros_like(self.rank)
+        rank[players] = np.arange(1, len(players) + 1)
+        changed = np.flatnonzero(rank != self.rank)
+        if len(changed):
+            self._close(changed, week)
+            self.rank[changed] = rank[changed]
+            self.since[changed] = week
+
+    def finish(self, last_week):
+        """Close the intervals still open after last_week (left open-ended)."""
+        self._close(np.flatnonzero(self.rank), last_week + 1, open_ended=True)
+
+    def _close(self, players, week, open_ended=False):
+        players = players[self.rank[players] > 0]
+        ranks = self.rank[players]
+        weeks = week - self.since[players]
+        self.weeks_at_no1[players[ranks == 1]] += weeks[ranks == 1]
+        self.weeks_in_top10[players[ranks <= 10]] += weeks[ranks <= 10]
+        best = self.best_rank[players]
+        self.best_rank[players] = np.where(best > 0, np.minimum(best, ranks), ranks)
+        self.intervals.append((players, self.since[players], None if open_ended else week, ranks))
+
+    def interval_rows(self, player_ids):
+        """Tuples ordered as INTERVAL_COLUMNS."""
+        for players, since, end, ranks in self.intervals:
+            ends = [None] * len(players) if end is None else [_sunday(end)] * len(players)
+            yield from zip(
+                [self.name] * len(players),
+                player_ids[players].tolist(),
+                [_sunday(w) for w in since.tolist()],
+                ends,
+                ranks.tolist(),
+            )
+
+    def weeks_rows(self, player_ids):
+        """Tuples ordered as WEEKS_COLUMNS, for every player ever ranked."""
+        ranked = np.flatnonzero(self.best_rank)
+        yield from zip(
+            [self.name] * len(ranked),
+            player_ids[ranked].tolist(),
+            self.weeks_at_no1[ranked].tolist(),
+            self.weeks_in_top10[ranked].tolist(),
+            self.best_rank[ranked].tolist(),
+        )
+
+
+def sweep_rankings(ratings, ranked=RANKED):
+    """
+    Sweep rating rows in date order, one calendar week at a time.
+
+    Args:
+        ratings: Dict of equal-length arrays in date order: player_id,
+            date, career_match_number and one column per SNAPSHOT_SYSTEMS
+        ranked: Players per snapshot (and deepest rank tracked)
+
+    Returns:
+        (snapshot rows, interval rows, weeks rows): lists of tuples ordered
+        as SNAPSHOT_COLUMNS, INTERVAL_COLUMNS and WEEKS_COLUMNS. Snapshots
+        are written for weeks in which a ranking changed.
+    """
+    index = PlayerIndex(ratings['player_id'])
+    player = index.index_of(ratings['player_id'])
+    weeks = (ratings['date'] - _EPOCH_MONDAY).astype(np.int64) // 7
+
+    sweeps = [
+        SystemSweep(system, {'rating': ratings[column], 'player_id': ratings['player_id']}, len(index))
+        for system, column in SNAPSHOT_SYSTEMS.items()
+    ]
+    trackers = [RankTracker(sweep.name, len(index)) for sweep in sweeps]
+
+    # Every calendar week counts towards weeks at the top, including
+    # weeks without matches
+    first_week, last_week = int(weeks[0]), int(weeks[-1])
+    bounds = np.searchsorted(weeks, np.arange(first_week, last_week + 2)).tolist()
+
+    snapshots = []
+    for week in range(first_week, last_week + 1):
+        rows = np.arange(bounds[week - first_week], bounds[week - first_week + 1])
+
+        for sweep, tracker in zip(sweeps, trackers):
+            changed = sweep.apply(week, rows, player)
+            top = sweep.top_rows(ranked)
+            tracker.update(week, player[top])
+            if not changed:
+                continue
+
+            column = ratings[SNAPSHOT_SYSTEMS[sweep.name]]
+            snapshots.extend(zip(
+                [sweep.name] * len(top),
+                [_sunday(week)] * len(top),
+                range(1, len(top) + 1),
+                ratings['player_id'][top].tolist(),
+                column[top].tolist(),
+                ratings['date'][top].tolist(),
+                ratings['career_match_number'][top].tolist(),
+            ))
+
+    intervals, weeks_at_top = [], []
+    for tracker in trackers:
+        tracker.finish(last_week)
+        intervals.extend(tracker.interval_rows(index.player_ids))
+        weeks_at_top.extend(tracker.weeks_rows(index.player_ids))
+
+    return snapshots, intervals, weeks_at_top
+
+
+def build_ranking_snapshots(db=None):
+    """
+    Rebuild ranking_snapshots, rank_intervals and weeks_at_top from
+    player_ratings.
+
+    Args:
+        db: DatabaseManager (a new one if omitted)
+
+    Returns:
+        Number of snapshot rows written
+    """
+    db = db or DatabaseManager()
+    start_time = datetime.now()
+
+    ratings = _load_ratings(db)
+    if ratings is None:
+        logger.info("No rating rows - ranking snapshots left unchanged")
+        return 0
+
+    snapshots, intervals, weeks_at_top = sweep_rankings(ratings)
+    written = db.bulk_replace('ranking_snapshots', SNAPSHOT_COLUMNS, snapshots)
+    db.bulk_replace('rank_intervals', INTERVAL_COLUMNS, intervals)
+    db.bulk_replace('weeks_at_top', WEEKS_COLUMNS, weeks_at_top)
+
+    duration = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Wrote {written:,} ranking snapshot rows, {len(intervals):,} rank intervals and "
+                f"{len(weeks_at_top):,} weeks-at-top rows from {len(ratings['date']):,} "
+                f"rating rows ({duration:.1f}s)")
+    return written
+
+
+def main():
+    build_ranking_snapshots()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Late-arriving match correction for the rating engines.
+
+Loaders such as load_miami_2025.py insert matches dated before matches
+that are already rated. Instead of rerunning every engine from 1968, a
+backfill run:
+
+1. Finds the earliest affected date (unrated matches, or rating rows
+   whose date no longer agrees with their match)
+2. Restores each engine from the nearest checkpoint before that date
+3. Replays only the matches from there on
+4. Rewrites only the player_ratings rows whose values actually changed
+5. Deletes the rows left at the old dates of re-dated matches, once all
+   three engines have run
+
+Run all three engines in dependency order with:
+    python scripts/rating_backfill.py
+"""
+import sys
+from pathlib import Path
+import logging
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.db_manager import DatabaseManager
+from scripts.rating_checkpoints import earliest_pending_date
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Values closer than this are considered unchanged
+VALUE_TOLERANCE = 1e-6
+
+
+def earliest_affected_date(db, column):
+    """
+    Earliest date from which an engine's output may be stale.
+
+    Args:
+        db: DatabaseManager
+        column: player_ratings column the engine fills
+
+    Returns:
+        date or None if nothing needs recomputing
+    """
+    pending = earliest_pending_date(db, column)
+
+    # Rating rows whose match was re-dated by a loader or a fix script
+    with db.get_cursor() as cursor:
+        cursor.execute("""
+            SELECT MIN(LEAST(m.date, pr.date)) as moved_date
+            FROM player_ratings pr
+            JOIN matches m ON pr.match_id = m.match_id
+            WHERE pr.date <> m.date
+        """)
+        moved = cursor.fetchone()['moved_date']
+
+    candidates = [d for d in (pending, moved) if d is not None]
+    return min(candidates) if candidates else None
+
+
+def backfill_start(db, column, affected=None):
+    """
+    Date an engine's backfill replays from.
+
+    Args:
+        db: DatabaseManager
+        column: player_ratings column the engine fills
+        affected: Earliest affected date the caller already computed (see
+            main), or None to work it out here. It has to be computed
+            before the first engine runs: the re-dated rows it is based on
+            are rewritten by ELO, so later engines can't see them
+
+    Returns:
+        date or None if nothing needs recomputing
+    """
+    if affected is None:
+        return earliest_affected_date(db, column)
+    pending = earliest_pending_date(db, column)
+    return min(affected, pending) if pending is not None else affected
+
+
+def fetch_existing_ratings(db, key_columns, value_columns, since):
+    """
+    Current stored values for every rating row dated on or after since.
+
+    Returns:
+        Dict mapping key tuple -> value tuple
+    """
+    columns = ', '.join(list(key_columns) + list(value_columns))
+    with db.get_cursor(dict_cursor=False) as cursor:
+        cursor.execute(
+            f"SELECT {columns} FROM player_ratings WHERE date >= %s",
+            (str(since),)
+        )
+        rows = cursor.fetchall()
+
+    n_keys = len(key_columns)
+    return {tuple(row[:n_keys]): tuple(row[n_keys:]) for row in rows}
+
+
+def is_changed(old_values, new_values, tolerance=VALUE_TOLERANCE):
+    """True if any value differs (a missing row always counts as changed)."""
+    if old_values is None:
+        return True
+    for old, new in zip(old_values, new_values):
+        if old is None or new is None:
+            if old is not new:
+                return True
+        elif isinstance(old, (int, float)):
+            if abs(old - new) > tolerance:
+                return True
+        elif old != new:
+            return True
+    return False
+
+
+def filter_changed(updates, existing, key_columns, value_columns):
+    """Keep only the update dicts whose stored values would change."""
+    return [
+        update for update in updates
+        if is_changed(
+            existing.get(tuple(update[k] for k in key_columns)),
+            [update[c] for c in value_columns]
+        )
+    ]
+
+
+def main():
+    """Backfill ELO, then Glicko-2 and TSR (which read the ELO rows)."""
+    from scripts.calculate_elo import TennisELOCalculator
+    from scripts.calculate_glicko2 import calculate_glicko2_ratings
+    from scripts.calculate_bayesian_ratings import calculate_bayesian_ratings
+
+    logger.info("=" * 70)
+    logger.info("RATING BACKFILL")
+    logger.info("=" * 70)
+
+    db = DatabaseManager()
+    start_time = datetime.now()
+
+    # Once, before ELO rewrites the rows of re-dated matches
+    affected = earliest_affected_date(db, 'elo_rating')
+    if affected is None:
+        logger.info("✅ No late-arriving matches found - ELO ratings are up to date")
+    else:
+        logger.info(f"Earliest affected date: {affected}")
+
+    TennisELOCalculator(db).calculate_all_elos(incremental=True, backfill=True, affected=affected)
+    calculate_glicko2_ratings(incremental=True, backfill=True, affected=affected)
+    calculate_bayesian_ratings(incremental=True, backfill=True, affected=affected)
+
+    # Every engine has rated the matches at their new dates; drop the old rows
+    if affected is not None and db.delete_redated_ratings(affected):
+        db.refresh_latest_ratings()
+        db.bump_data_version()
+
+    duration = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Backfill took {duration:.1f} seconds ({duration/60:.1f} minutes)")
+
+
+if __name__ == "__main__":
+    main()
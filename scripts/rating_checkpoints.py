@@ -0,0 +1,165 @@
+"""
+On-disk player-state snapshots for the rating engines.
+
+Each engine (ELO, Glicko-2, TSR) saves its complete player state at the
+start of every calendar year and at the end of every run. A checkpoint
+named by date D holds the state after every match dated before D, so an
+incremental run can restore the latest checkpoint on or before the
+earliest unrated match and replay only the matches from there on.
+
+Snapshots are compressed .npz files of plain NumPy arrays:
+    data/processed/checkpoints/<system>/<YYYY-MM-DD>.npz
+"""
+import sys
+from pathlib import Path
+import logging
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def save_checkpoint(system, as_of, state):
+    """
+    Save an engine's state.
+
+    Args:
+        system: Engine name ('elo', 'glicko2', 'tsr')
+        as_of: The state covers every match dated before this date
+        state: Dict of NumPy arrays (see each engine's state_dict)
+    """
+    system_dir = CHECKPOINT_DIR / system
+    system_dir.mkdir(parents=True, exist_ok=True)
+
+    path = system_dir / f"{np.datetime64(as_of, 'D')}.npz"
+    tmp_path = path.with_name(path.name + '.tmp')
+
+    # Write to a temp file first so a crashed run never leaves a torn snapshot
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **state)
+    os.replace(tmp_path, path)
+
+    logger.debug(f"Saved {system} checkpoint as of {path.stem}")
+    return path
+
+
+def list_checkpoints(system):
+    """Return the dates of all saved checkpoints for an engine, oldest first."""
+    system_dir = CHECKPOINT_DIR / system
+    if not system_dir.exists():
+        return []
+    return sorted(np.datetime64(p.stem, 'D') for p in system_dir.glob('*.npz'))
+
+
+def load_latest_checkpoint(system, on_or_before=None):
+    """
+    Load the most recent checkpoint that is safe to resume from.
+
+    Args:
+        system: Engine name
+        on_or_before: Earliest date that still has to be (re)processed;
+            None means any checkpoint will do
+
+    Returns:
+        (as_of, state) or (None, None) if no usable checkpoint exists
+    """
+    candidates = list_checkpoints(system)
+    if on_or_before is not None:
+        limit = np.datetime64(on_or_before, 'D')
+        candidates = [d for d in candidates if d <= limit]
+
+    if not candidates:
+        return None, None
+
+    as_of = candidates[-1]
+    with np.load(CHECKPOINT_DIR / system / f"{as_of}.npz", allow_pickle=False) as data:
+        state = {key: data[key] for key in data.files}
+
+    logger.info(f"Restored {system} checkpoint as of {as_of}")
+    return as_of, state
+
+
+def discard_checkpoints_after(system, as_of=None):
+    """
+    Delete checkpoints newer than as_of (all of them if as_of is None).
+
+    Called before an engine replays from as_of: every later snapshot was
+    built from history that is about to be rewritten and must not be
+    resumed from again.
+    """
+    limit = np.datetime64(as_of, 'D') if as_of is not None else None
+    removed = 0
+    for checkpoint_date in list_checkpoints(system):
+        if limit is None or checkpoint_date > limit:
+            (CHECKPOINT_DIR / system / f"{checkpoint_date}.npz").unlink()
+            removed += 1
+    if removed:
+        logger.info(f"Discarded {removed} stale {system} checkpoint(s)")
+
+
+def year_periods(dates):
+    """
+    Split a sorted datetime64[D] array into calendar-year slices.
+
+    Yields:
+        (start, end, as_of): rows [start, end) and the checkpoint date that
+        follows them (Jan 1 of the next year, or the day after the last
+        match for the final, possibly incomplete, year)
+    """
+    if len(dates) == 0:
+        return
+
+    years = dates.astype('datetime64[Y]')
+    cuts = np.flatnonzero(years[1:] != years[:-1]) + 1
+    starts = np.concatenate([[0], cuts])
+    ends = np.concatenate([cuts, [len(dates)]])
+
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if end < len(dates):
+            as_of = (years[start] + 1).astype('datetime64[D]')
+        else:
+            as_of = dates[-1] + 1
+        yield start, end, as_of
+
+
+def remap_rows(state_ids, player_ids):
+    """
+    Positions of checkpointed players inside a (possibly larger) id array.
+
+    Both arrays must be sorted; every id in state_ids must appear in player_ids.
+    """
+    return np.searchsorted(player_ids, state_ids)
+
+
+def earliest_pending_date(db, column):
+    """
+    Earliest match date that still has to be rated by an engine.
+
+    Args:
+        db: DatabaseManager
+        column: player_ratings column the engine fills; matches with no
+            rating row, or rows where this column is NULL, are pending
+
+    Returns:
+        date or None if everything is rated
+    """
+    # Each match is probed on idx_ratings_match within its own partition
+    with db.get_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT LEAST(
+                (SELECT MIN(m.date)
+                 FROM matches m
+                 WHERE NOT EXISTS (
+                     SELECT 1 FROM player_ratings pr
+                     WHERE pr.match_id = m.match_id AND pr.date = m.date
+                 )),
+                (SELECT MIN(pr.date) FROM player_ratings pr WHERE pr.{column} IS NULL)
+            ) as pending_date
+        """)
+        return cursor.fetchone()['pending_date']
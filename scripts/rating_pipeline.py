@@ -0,0 +1,477 @@
+"""
+Single-pass rating pipeline.
+
+Streams the match history once, in (date, match_id) order, and feeds each
+calendar year of matches through a chain of pluggable rating systems:
+
+    ELO (overall + surface)  ->  Glicko-2  ->  TSR  ->  form metrics
+
+Every system adds its own columns to the same set of rating rows (one per
+player per match, winner first), so each player_ratings row is written
+exactly once with all columns filled. A full rebuild costs one read of
+matches and one bulk write of player_ratings instead of one read and one
+write per script.
+
+Systems run in order and may read columns produced by earlier systems
+(TSR reads the ELO columns, form metrics the pre-match ELO context).
+Each system checkpoints its state under checkpoints/pipeline/<name>/, so
+incremental runs resume from the latest year boundary all systems share.
+After writing, the run refreshes player_latest_ratings for the players it
+rated, rebuilds the weekly ranking snapshots (ranking_snapshots.py) and
+publishes the API's memory-mapped trajectory store (see
+publish_trajectory_store.py).
+
+Usage:
+    python scripts/rating_pipeline.py              # resume from checkpoints
+    python scripts/rating_pipeline.py --full       # rebuild everything
+    python scripts/rating_pipeline.py --systems elo,glicko2
+"""
+import sys
+from pathlib import Path
+import argparse
+import logging
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.db_manager import DatabaseManager
+from scripts.match_stream import PlayerIndex, load_match_columns
+from scripts.rating_checkpoints import (
+    save_checkpoint, list_checkpoints, load_latest_checkpoint, discard_checkpoints_after,
+    year_periods
+)
+from scripts.rating_backfill import earliest_affected_date
+from scripts.calculate_elo import ELOReplayEngine
+from scripts.calculate_glicko2 import Glicko2Rating, GLICKO2_COLUMNS
+from scripts.calculate_bayesian_ratings import (
+    TSR_COLUMNS, new_tsr_stats, update_tsr, _tsr_state_dict, _load_tsr_state
+)
+from scripts.calculate_supporting_metrics import new_metric_state, update_metrics
+from scripts.publish_trajectory_store import publish_trajectory_store
+from scripts.ranking_snapshots import build_ranking_snapshots
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 'v1.0'
+
+
+class RatingSystem:
+    """
+    Base class for a rating system plugged into the pipeline.
+
+    Attributes:
+        name: Checkpoint namespace and --systems name
+        columns: player_ratings columns this system fills
+        requires: Columns that an earlier system must have filled
+        pending_column: Column whose NULLs mark rows this system still owes
+    """
+
+    name = None
+    columns = ()
+    requires = ()
+    pending_column = None
+
+    def start(self, player_ids):
+        """Called once before the replay with every player id that can appear."""
+
+    def process(self, matches, rows):
+        """
+        Add this system's columns to rows.
+
+        Args:
+            matches: MatchColumns for one period, in chronological order
+            rows: Dict of row columns, two rows per match (winner at 2*i,
+                loser at 2*i + 1); already holds the key columns and the
+                columns of every earlier system
+        """
+        raise NotImplementedError
+
+    def state_dict(self):
+        """Snapshot of the system's player state as NumPy arrays."""
+        raise NotImplementedError
+
+    def load_state_dict(self, state):
+        """Restore a snapshot; called after start()."""
+        raise NotImplementedError
+
+
+class EloSystem(RatingSystem):
+    """Overall and surface ELO on the array-backed replay engine."""
+
+    name = 'elo'
+    columns = (
+        ('career_match_number',)
+        + ELOReplayEngine.RATING_COLUMNS
+        + ELOReplayEngine.CONTEXT_COLUMNS
+    )
+    pending_column = 'elo_rating'
+
+    def start(self, player_ids):
+        self.engine = ELOReplayEngine(PlayerIndex(player_ids))
+
+    def process(self, matches, rows):
+        out = self.engine.replay(matches)
+        rows['career_match_number'] = out['career_match_number']
+        # Downstream systems see the same 2-decimal values calculate_elo.py stores
+        for column in ELOReplayEngine.RATING_COLUMNS:
+            rows[column] = np.round(out[column], 2)
+        for column in ELOReplayEngine.CONTEXT_COLUMNS:
+            rows[column] = out[column]
+
+    def state_dict(self):
+        return self.engine.state_dict()
+
+    def load_state_dict(self, state):
+        self.engine.load_state_dict(state)
+
+
+class Glicko2System(RatingSystem):
+    """Glicko-2 with surface ratings (see calculate_glicko2.py)."""
+
+    name = 'glicko2'
+    columns = GLICKO2_COLUMNS
+    pending_column = 'glicko2_rating'
+
+    _FIELDS = ('rating', 'rd', 'volatility', 'rating_clay', 'rating_grass', 'rating_hard')
+
+    def start(self, player_ids):
+        self.calculator = Glicko2Rating()
+
+    def process(self, matches, rows):
+        n = len(matches)
+        out = np.empty((2 * n, len(self._FIELDS)))
+        dates = matches.date.astype(object)
+        winners = matches.winner_id.tolist()
+        losers = matches.loser_id.tolist()
+
+        for i in range(n):
+            winner, loser = self.calculator.update_rating(
+                winners[i], losers[i],
+                outcome=1.0,
+                match_date=dates[i],
+                tournament_tier=matches.tournament_tier[i],
+                surface=matches.surface_name[i]
+            )
+            out[2 * i] = [winner[f] for f in self._FIELDS]
+            out[2 * i + 1] = [loser[f] for f in self._FIELDS]
+
+        for j, column in enumerate(self.columns):
+            rows[column] = out[:, j]
+
+    def state_dict(self):
+        return self.calculator.state_dict()
+
+    def load_state_dict(self, state):
+        self.calculator.load_state_dict(state)
+
+
+class TSRSystem(RatingSystem):
+    """TSR and uncertainties (see calculate_bayesian_ratings.py)."""
+
+    name = 'tsr'
+    columns = TSR_COLUMNS
+    requires = ('elo_rating', 'career_match_number')
+    pending_column = 'tsr_rating'
+
+    def start(self, player_ids):
+        self.player_stats = {}
+
+    def process(self, matches, rows):
+        n_rows = len(rows['player_id'])
+        out = np.empty((n_rows, len(self.columns)))
+        dates = np.repeat(matches.date, 2).astype(object)
+        player_ids = rows['player_id'].tolist()
+        elos = rows['elo_rating'].tolist()
+        match_numbers = rows['career_match_number'].tolist()
+
+        for j in range(n_rows):
+            stats = self.player_stats.get(player_ids[j])
+            if stats is None:
+                stats = self.player_stats[player_ids[j]] = new_tsr_stats()
+            values = update_tsr(stats, dates[j], elos[j], match_numbers[j])
+            out[j] = [values[c] for c in self.columns]
+
+        for k, column in enumerate(self.columns):
+            rows[column] = out[:, k]
+
+    def state_dict(self):
+        return _tsr_state_dict(self.player_stats)
+
+    def load_state_dict(self, state):
+        self.player_stats = _load_tsr_state(state)
+
+
+class FormMetricsSystem(RatingSystem):
+    """Form index, big match rating and tournament success (see calculate_supporting_metrics.py)."""
+
+    name = 'form'
+    columns = ('form_index', 'big_match_rating', 'tournament_success_score')
+    requires = ('elo_pre_match', 'opponent_elo_pre_match')
+    pending_column = 'form_index'
+
+    def start(self, player_ids):
+        self.player_state = {}
+
+    def process(self, matches, rows):
+        n_rows = len(rows['player_id'])
+        out = np.empty((n_rows, len(self.columns)))
+        dates = matches.date.astype(object)
+        player_ids = rows['player_id'].tolist()
+        player_elos = rows['elo_pre_match'].tolist()
+        opponent_elos = rows['opponent_elo_pre_match'].tolist()
+
+        for j in range(n_rows):
+            i = j // 2
+            state = self.player_state.get(player_ids[j])
+            if state is None:
+                state = self.player_state[player_ids[j]] = new_metric_state()
+            out[j] = update_metrics(
+                state,
+                won=(j % 2 == 0),
+                player_elo=player_elos[j],
+                opponent_elo=opponent_elos[j],
+                tournament_tier=matches.tournament_tier[i],
+                round_name=matches.round[i],
+                match_date=dates[i]
+            )
+
+        for k, column in enumerate(self.columns):
+            rows[column] = out[:, k]
+
+    def state_dict(self):
+        player_ids = np.array(sorted(self.player_state), dtype=np.int64)
+        n = len(player_ids)
+        results = np.full((n, 20), np.nan)
+        big_match = np.full((n, 50), np.nan)
+        tiers = np.full((n, 20), '', dtype='U32')
+        rounds = np.full((n, 20), '', dtype='U8')
+        finish_dates = np.full((n, 20), np.datetime64('NaT'), dtype='datetime64[D]')
+        lengths = np.zeros((n, 3), dtype=np.int64)
+
+        for i, player_id in enumerate(player_ids.tolist()):
+            state = self.player_state[player_id]
+            recent = list(state['recent_results'])
+            big = list(state['big_match_ratings'])
+            finishes = list(state['tournament_results'])
+            results[i, :len(recent)] = recent
+            big_match[i, :len(big)] = big
+            for k, (tier, round_name, finish_date) in enumerate(finishes):
+                tiers[i, k] = tier or ''
+                rounds[i, k] = round_name
+                finish_dates[i, k] = finish_date
+            lengths[i] = (len(recent), len(big), len(finishes))
+
+        return {
+            'player_ids': player_ids,
+            'recent_results': results,
+            'big_match_ratings': big_match,
+            'finish_tiers': tiers,
+            'finish_rounds': rounds,
+            'finish_dates': finish_dates,
+            'lengths': lengths,
+        }
+
+    def load_state_dict(self, state):
+        self.player_state = {}
+        finish_dates = state['finish_dates'].astype(object)
+        for i, player_id in enumerate(state['player_ids'].tolist()):
+            n_recent, n_big, n_finishes = state['lengths'][i].tolist()
+            player = new_metric_state()
+            player['recent_results'].extend(state['recent_results'][i, :n_recent].tolist())
+            player['big_match_ratings'].extend(state['big_match_ratings'][i, :n_big].tolist())
+            for k in range(n_finishes):
+                player['tournament_results'].append((
+                    str(state['finish_tiers'][i, k]) or None,
+                    str(state['finish_rounds'][i, k]),
+                    finish_dates[i, k],
+                ))
+            self.player_state[player_id] = player
+
+
+# Registered systems, in dependency order
+SYSTEMS = {
+    system.name: system
+    for system in (EloSystem, Glicko2System, TSRSystem, FormMetricsSystem)
+}
+
+
+def build_systems(names=None):
+    """
+    Instantiate systems by name (all of them if names is None).
+
+    Raises:
+        ValueError: Unknown name, or a system whose inputs are not produced
+            by an earlier system in the chain
+    """
+    names = list(SYSTEMS) if names is None else list(names)
+    unknown = [name for name in names if name not in SYSTEMS]
+    if unknown:
+        raise ValueError(f"Unknown rating system(s): {', '.join(unknown)}")
+
+    # Always run in registration order so dependencies come first
+    systems = [SYSTEMS[name]() for name in SYSTEMS if name in names]
+
+    available = set()
+    for system in systems:
+        missing = [c for c in system.requires if c not in available]
+        if missing:
+            raise ValueError(f"System '{system.name}' needs {', '.join(missing)} "
+                             f"from an earlier system")
+        available.update(system.columns)
+    return systems
+
+
+def _checkpoint_name(system):
+    return f"pipeline/{system.name}"
+
+
+def _common_checkpoint(systems, on_or_before):
+    """Latest checkpoint date that every system has, not after on_or_before."""
+    limit = np.datetime64(on_or_before, 'D')
+    common = None
+    for system in systems:
+        dates = {d for d in list_checkpoints(_checkpoint_name(system)) if d <= limit}
+        common = dates if common is None else common & dates
+    return max(common) if common else None
+
+
+def _earliest_pending(db, systems):
+    """
+    Earliest date any of the systems still owes a value for, including
+    matches re-dated since they were rated (no column is NULL for those)
+    """
+    dates = [earliest_affected_date(db, system.pending_column) for system in systems]
+    dates = [d for d in dates if d is not None]
+    return min(dates) if dates else None
+
+
+def _write_rows(db, rows, systems):
+    """Upsert one period's rows with every system's columns in one bulk write."""
+    value_columns = []
+    for system in systems:
+        value_columns.extend(system.columns)
+
+    # date is part of the key: player_ratings is partitioned by it
+    columns = [rows['player_id'].tolist(), rows['match_id'].tolist(), rows['date'].tolist()]
+    columns.extend(rows[c].tolist() for c in value_columns)
+    records = (record + (MODEL_VERSION,) for record in zip(*columns))
+
+    return db.bulk_upsert(
+        'player_ratings',
+        key_columns=('player_id', 'match_id', 'date'),
+        value_columns=tuple(value_columns) + ('model_version',),
+        rows=records,
+    )
+
+
+def run_pipeline(system_names=None, incremental=True):
+    """
+    Replay matches once through the selected rating systems.
+
+    Args:
+        system_names: Names from SYSTEMS to run (default: all)
+        incremental: Resume from the latest checkpoint shared by all systems
+            instead of rebuilding from the first match
+
+    Returns:
+        Number of player_ratings rows written
+    """
+    systems = build_systems(system_names)
+    db = DatabaseManager()
+    start_time = datetime.now()
+
+    logger.info("=" * 70)
+    logger.info(f"RATING PIPELINE: {' -> '.join(s.name for s in systems)}")
+    logger.info("=" * 70)
+
+    since = None
+    states = {}
+    if incremental:
+        pending = _earliest_pending(db, systems)
+        if pending is None:
+            logger.info("✅ All rating rows are up to date - nothing to do")
+            return 0
+        since = _common_checkpoint(systems, pending)
+        if since is None:
+            logger.info("No checkpoint shared by all systems - rebuilding from the first match")
+        else:
+            for system in systems:
+                _, states[system.name] = load_latest_checkpoint(_checkpoint_name(system), on_or_before=since)
+            logger.info(f"Resuming from checkpoint {since} (earliest pending row: {pending})")
+
+    # Every later snapshot is about to be rebuilt
+    for system in systems:
+        discard_checkpoints_after(_checkpoint_name(system), since)
+
+    matches = load_match_columns(db, since=since)
+    if len(matches) == 0:
+        logger.info("✅ No matches to process")
+        return 0
+
+    player_ids = [matches.player_ids()]
+    player_ids.extend(state['player_ids'] for state in states.values())
+    player_ids = np.unique(np.concatenate(player_ids))
+
+    for system in systems:
+        system.start(player_ids)
+        if system.name in states:
+            system.load_state_dict(states[system.name])
+
+    written = 0
+    touched = []
+    for start, end, as_of in year_periods(matches.date):
+        period = matches.slice(start, end)
+        rows = {
+            'player_id': np.column_stack([period.winner_id, period.loser_id]).ravel(),
+            'match_id': np.repeat(period.match_id, 2),
+            'date': np.repeat(period.date, 2),
+        }
+        for system in systems:
+            system.process(period, rows)
+
+        written += _write_rows(db, rows, systems)
+        touched.append(np.unique(rows['player_id']))
+        for system in systems:
+            save_checkpoint(_checkpoint_name(system), as_of, system.state_dict())
+
+        logger.info(f"Rated {end:,} / {len(matches):,} matches (through {as_of})")
+
+    # Only players with new rating rows can have a new latest rating
+    db.delete_redated_ratings(since)
+    db.refresh_latest_ratings(np.unique(np.concatenate(touched)) if since is not None else None)
+    build_ranking_snapshots(db)
+
+    # Invalidate API caches built on the previous ratings, then give the
+    # API a trajectory store for the new version
+    version = db.bump_data_version()
+    publish_trajectory_store(db, version)
+
+    duration = (datetime.now() - start_time).total_seconds()
+    logger.info("=" * 70)
+    logger.info(f"✅ Pipeline complete! {len(matches):,} matches, {written:,} rating rows written")
+    logger.info(f"Pipeline took {duration:.1f} seconds ({duration/60:.1f} minutes)")
+    logger.info("=" * 70)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass rating pipeline")
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild from the first match instead of resuming from checkpoints')
+    parser.add_argument('--systems',
+                        help=f"Comma-separated systems to run (default: {','.join(SYSTEMS)})")
+    args = parser.parse_args()
+
+    system_names = args.systems.split(',') if args.systems else None
+    run_pipeline(system_names, incremental=not args.full)
+
+
+if __name__ == "__main__":
+    main()
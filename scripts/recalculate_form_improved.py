@@ -55,20 +55,15 @@ with db.get_cursor() as cursor:
                 pr.player_id,
                 pr.date,
                 pr.match_id,
-                pr.elo_rating as player_elo,
+                pr.elo_pre_match as player_elo,
                 CASE WHEN m.winner_id = pr.player_id THEN 1.0 ELSE 0.0 END as won,
-                -- Get opponent's ELO
-                CASE 
-                    WHEN m.player1_id = pr.player_id THEN pr2.elo_rating
-                    ELSE pr1.elo_rating
-                END as opponent_elo,
+                -- Opponent's ELO going into the match (stored on this row)
+                pr.opponent_elo_pre_match as opponent_elo,
                 m.tournament_tier,
                 ROW_NUMBER() OVER (PARTITION BY pr.player_id ORDER BY pr.date, pr.match_id) as match_num,
                 COUNT(*) OVER (PARTITION BY pr.player_id) as total_matches
             FROM player_ratings pr
             JOIN matches m ON pr.match_id = m.match_id
-            LEFT JOIN player_ratings pr1 ON m.match_id = pr1.match_id AND m.player1_id = pr1.player_id
-            LEFT JOIN player_ratings pr2 ON m.match_id = pr2.match_id AND m.player2_id = pr2.player_id
             WHERE pr.tsr_rating IS NOT NULL
         ),
         recent_matches AS (
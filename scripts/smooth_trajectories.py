@@ -10,14 +10,17 @@ This script creates smoothed TSR curves for cleaner visualizations by:
 Smoothed curves are essential for professional-looking career progression charts.
 """
 
+import argparse
 import logging
 from datetime import datetime
 import numpy as np
 from scipy.interpolate import UnivariateSpline
 from scipy.ndimage import uniform_filter1d
 import sys
-sys.path.insert(0, '/Users/razaool/tennis-career-tracker')
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 from database.db_manager import DatabaseManager
+from scripts.player_shards import default_workers, run_sharded, shard_filter, group_bounds
 
 # Configure logging
 logging.basicConfig(
@@ -104,6 +107,8 @@ def calculate_smoothed_trajectories():
     
     processed_players = 0
     total_updates = 0
+    updates = []
+    batch_size = 100000
     
     for player_id in player_ids:
         # Get all ratings for this player in chronological order
@@ -111,6 +116,7 @@ def calculate_smoothed_trajectories():
             cursor.execute("""
                 SELECT 
                     rating_id,
+                    date,
                     tsr_rating,
                     career_match_number
                 FROM player_ratings
@@ -126,23 +132,25 @@ def calculate_smoothed_trajectories():
         
         # Extract TSR values
         rating_ids = [r['rating_id'] for r in ratings]
+        dates = [r['date'] for r in ratings]
         tsr_values = np.array([r['tsr_rating'] for r in ratings], dtype=float)
         
         # Smooth the trajectory
         smoothed_values = smooth_player_trajectory(tsr_values)
         
-        # Update database
-        updates = []
-        for rating_id, smoothed_tsr in zip(rating_ids, smoothed_values):
+        # Queue updates
+        for rating_id, match_date, smoothed_tsr in zip(rating_ids, dates, smoothed_values):
             updates.append({
                 'rating_id': rating_id,
+                'date': match_date,
                 'tsr_smoothed': float(smoothed_tsr)
             })
         
-        # Batch update
-        if updates:
+        # Batch update across players
+        if len(updates) >= batch_size:
             _update_database_batch(db, updates)
             total_updates += len(updates)
+            updates = []
         
         processed_players += 1
         
@@ -151,6 +159,11 @@ def calculate_smoothed_trajectories():
             progress = processed_players / total_players * 100
             logger.info(f"Processed {processed_players:,} / {total_players:,} players ({progress:.1f}%)")
     
+    # Final batch
+    if updates:
+        _update_database_batch(db, updates)
+        total_updates += len(updates)
+    
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
     
@@ -161,22 +174,84 @@ def calculate_smoothed_trajectories():
     logger.info(f"Calculation took {duration:.1f} seconds ({duration/60:.1f} minutes)")
     logger.info("="*70)
     
+    db.refresh_latest_ratings()
+    db.bump_data_version()
+    
     # Show sample smoothed trajectories
     _show_smoothing_examples(db)
 
 
+def _smooth_shard(shard: int, n_shards: int) -> int:
+    """
+    Worker: smooth every trajectory in one shard of players.
+    
+    Returns:
+        Number of rows written
+    """
+    db = DatabaseManager()
+    with db.get_cursor(dict_cursor=False) as cursor:
+        cursor.execute(f"""
+            SELECT rating_id, date, player_id, tsr_rating
+            FROM player_ratings
+            WHERE tsr_rating IS NOT NULL
+              AND {shard_filter()}
+            ORDER BY player_id, date, match_id
+        """, (n_shards, shard))
+        rows = cursor.fetchall()
+    
+    if not rows:
+        return 0
+    
+    rating_ids, dates, player_ids, tsr_values = zip(*rows)
+    player_ids = np.array(player_ids, dtype=np.int64)
+    tsr_values = np.array(tsr_values, dtype=float)
+    
+    bounds = group_bounds(player_ids)
+    smoothed = np.empty_like(tsr_values)
+    for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        smoothed[start:end] = smooth_player_trajectory(tsr_values[start:end])
+    
+    return db.bulk_update(
+        'player_ratings', ('rating_id', 'date'), ('tsr_smoothed',),
+        zip(rating_ids, dates, smoothed.tolist())
+    )
+
+
+def calculate_smoothed_trajectories_parallel(workers: int):
+    """
+    Smooth all trajectories with players sharded across a process pool.
+    
+    Args:
+        workers: Number of worker processes
+    """
+    logger.info("="*70)
+    logger.info(f"SMOOTHING CAREER TRAJECTORIES - PARALLEL ({workers} workers)")
+    logger.info("="*70)
+    
+    db = DatabaseManager()
+    start_time = datetime.now()
+    
+    total_updates = sum(run_sharded(_smooth_shard, workers))
+    
+    duration = (datetime.now() - start_time).total_seconds()
+    
+    logger.info("="*70)
+    logger.info(f"✅ Trajectory smoothing complete!")
+    logger.info(f"✅ Updated {total_updates:,} rating records")
+    logger.info(f"Calculation took {duration:.1f} seconds ({duration/60:.1f} minutes)")
+    logger.info("="*70)
+    
+    db.refresh_latest_ratings()
+    db.bump_data_version()
+    _show_smoothing_examples(db)
+
+
 def _update_database_batch(db: DatabaseManager, updates: list):
-    """Update smoothed TSR values in database."""
-    with db.get_cursor() as cursor:
-        for update in updates:
-            cursor.execute("""
-                UPDATE player_ratings
-                SET tsr_smoothed = %s
-                WHERE rating_id = %s
-            """, (
-                update['tsr_smoothed'],
-                update['rating_id']
-            ))
+    """Update smoothed TSR values in database (one bulk COPY + UPDATE)."""
+    db.bulk_update(
+        'player_ratings', ('rating_id', 'date'), ('tsr_smoothed',),
+        ((update['rating_id'], update['date'], update['tsr_smoothed']) for update in updates)
+    )
 
 
 def _show_smoothing_examples(db: DatabaseManager):
@@ -244,7 +319,17 @@ def _show_smoothing_examples(db: DatabaseManager):
 
 
 if __name__ == '__main__':
-    calculate_smoothed_trajectories()
+    parser = argparse.ArgumentParser(description='Smooth TSR career trajectories')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Process players in parallel on this many processes, sharded by player '
+                             '(-1: one per core)')
+    args = parser.parse_args()
+    
+    workers = default_workers() if args.workers < 0 else args.workers
+    if workers > 0:
+        calculate_smoothed_trajectories_parallel(workers)
+    else:
+        calculate_smoothed_trajectories()
     
     logger.info("\n" + "="*70)
     logger.info("✅ SCRIPT 3 COMPLETE - Career trajectories smoothed!")
@@ -164,26 +164,26 @@ def update_database_with_new_data(year=2025):
 
 
 def recalculate_elo_ratings():
-    """Recalculate ELO ratings after adding new matches"""
-    logger.info("\n🔄 Recalculating ELO ratings...")
+    """Recalculate all ratings (ELO, Glicko-2, TSR, form) after adding new matches"""
+    logger.info("\n🔄 Recalculating ratings...")
     
     try:
         result = subprocess.run(
-            ['python3', 'scripts/calculate_elo.py'],
+            ['python3', 'scripts/rating_pipeline.py'],
             capture_output=True,
             text=True,
             cwd=Path(__file__).parent.parent
         )
         
         if result.returncode == 0:
-            logger.info("✅ ELO ratings recalculated successfully")
+            logger.info("✅ Ratings recalculated successfully")
             return True
         else:
-            logger.error(f"❌ Error recalculating ELO: {result.stderr}")
+            logger.error(f"❌ Error recalculating ratings: {result.stderr}")
             return False
     
     except Exception as e:
-        logger.error(f"❌ Error running ELO calculation: {e}")
+        logger.error(f"❌ Error running rating pipeline: {e}")
         return False
 
 